@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import typing
+
+import pytest
+from aiohttp import web
+
+class Site:
+    """
+    Local web server for crawl tests, running on its own event loop in a background thread.
+
+    `pages` maps a path to a dict with "body" (str or bytes) and optionally "status", "content_type",
+    "headers", "etag" (answered with 304 when the request matches it), "chunked" (streamed without a
+    Content-Length) and "failures" (answered with 503 that many times first). Every request is recorded
+    in `requests` as (method, path) and the client port it came from in `connections`. Requests for a
+    path in `blocked` wait until it is removed; `in_flight` and `max_in_flight` count open requests.
+    """
+    def __init__(self, pages: typing.Dict[str, dict]):
+        self.pages = pages
+        self.requests: typing.List[typing.Tuple[str, str]] = []
+        self.blocked: typing.Set[str] = set()
+        self.connections: typing.Set[int] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop = asyncio.new_event_loop()
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{self.port}"
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    async def _handle(self, request: web.Request) -> web.StreamResponse:
+        self.requests.append((request.method, request.path))
+        self.connections.add(request.transport.get_extra_info('peername')[1])
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            while request.path in self.blocked:
+                await asyncio.sleep(0.01)
+            return await self._respond(request)
+        finally:
+            self.in_flight -= 1
+
+    async def _respond(self, request: web.Request) -> web.StreamResponse:
+        page = self.pages.get(request.path)
+        if page is None:
+            return web.Response(status=404)
+        if page.get('failures'):
+            page['failures'] -= 1
+            return web.Response(status=503)
+        headers = dict(page.get('headers', {}))
+        if 'etag' in page:
+            headers['ETag'] = page['etag']
+            if request.headers.get('If-None-Match') == page['etag']:
+                return web.Response(status=304, headers=headers)
+        body = page['body'].encode() if isinstance(page['body'], str) else page['body']
+        if page.get('chunked'):
+            response = web.StreamResponse(status=page.get('status', 200), headers=headers)
+            response.content_type = page.get('content_type', 'text/html')
+            response.enable_chunked_encoding()
+            await response.prepare(request)
+            for start in range(0, len(body), 1024):
+                await response.write(body[start:start + 1024])
+            await response.write_eof()
+            return response
+        return web.Response(body=body, status=page.get('status', 200), content_type=page.get('content_type', 'text/html'), headers=headers)
+
+    def paths(self, method: str = 'GET') -> typing.List[str]:
+        return [path for request_method, path in self.requests if request_method == method]
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+@pytest.fixture
+def site():
+    """Factory for `Site`s, closed at the end of the test."""
+    sites = []
+
+    def start(pages: typing.Dict[str, dict]) -> Site:
+        sites.append(Site(pages))
+        return sites[-1]
+
+    yield start
+    for started in sites:
+        started.close()
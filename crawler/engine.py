@@ -0,0 +1,296 @@
+"""
+Concurrent crawl engine behind `find_text_files`.
+
+Pages are fetched by a pool of asyncio workers sharing one aiohttp session. Its connector keeps
+connections alive between requests and caps how many are open in total and per host, so a crawl is
+bounded by those limits rather than by the latency of one request after another. URLs are queued
+through a `frontier.Frontier`, which normalizes them and hands out each page once.
+
+Bodies are never read whole: a response is only read if its headers announce HTML within the size
+limit, and its links are pulled out by a `links.LinkExtractor` chunk by chunk as it downloads.
+
+With a `state.CrawlState` database the crawl is checkpointed as it goes and resumes after an
+interruption, and pages are revalidated with conditional requests on later crawls.
+"""
+import asyncio
+import posixpath
+import typing
+from urllib.parse import urlsplit
+import aiohttp
+from frontier import BloomFilter, Frontier, HashedSet, normalize_url
+from links import LinkExtractor
+from state import CrawlState
+
+CONCURRENCY = 16  # Pages fetched at once
+PER_HOST = 8  # Open connections per host
+TIMEOUT = 10.0  # Seconds per request, including reading the body
+RETRIES = 2  # Extra attempts after a connection error, timeout or retryable status
+BACKOFF = 0.5  # Seconds before the first retry, doubled for every further one
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+MAX_PAGE_BYTES = 5 << 20  # Pages announced as larger are skipped, others are cut off here
+CHUNK_SIZE = 64 << 10
+CHECKPOINT_INTERVAL = 5.0  # Seconds between writes of the crawl state
+HTML_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+# Links that are never HTML, so they are not requested at all
+SKIP_EXTENSIONS = frozenset({
+    '.7z', '.avi', '.bin', '.bz2', '.css', '.csv', '.dmg', '.doc', '.docx', '.exe', '.flac', '.gif', '.gz',
+    '.ico', '.iso', '.jar', '.jpeg', '.jpg', '.js', '.json', '.mkv', '.mov', '.mp3', '.mp4', '.ogg', '.pdf',
+    '.png', '.ppt', '.pptx', '.rar', '.svg', '.tar', '.tgz', '.wav', '.webm', '.webp', '.woff', '.woff2',
+    '.xls', '.xlsx', '.xz', '.zip',
+})
+
+class Crawler:
+    """
+    Crawls the pages under `seed_url` breadth first, collecting links to .txt files.
+
+    Links ending in .txt are collected without being fetched and every other link starting with
+    `seed_url` is crawled, as in the original serial crawler. The crawl stops once `max_links` .txt
+    links are found or no pages are left. All links are compared in their `normalize_url` form.
+
+    By default every URL seen is remembered exactly (as a 64-bit hash); `seen_capacity` switches to a
+    Bloom filter of fixed size for that many URLs at `error_rate`. `max_queued` bounds the frontier and
+    `host_priority` orders it by host, see `Frontier`.
+
+    Responses that are not HTML, or announce more than `max_page_bytes`, are dropped after their
+    headers; longer HTML pages are read up to `max_page_bytes`. With `verify_txt`, .txt links are only
+    reported once a HEAD request shows they exist.
+
+    With `state_path` the crawl is recorded in a SQLite `CrawlState` every `checkpoint_interval` seconds.
+    Running the same seed against it again resumes an unfinished crawl, with the same .txt links found
+    so far; a finished crawl starts over, but pages cached with an ETag or Last-Modified header are
+    requested conditionally and their stored links reused when the server answers 304.
+    """
+    def __init__(
+        self,
+        seed_url: str,
+        max_links: int = 50,
+        concurrency: int = CONCURRENCY,
+        per_host: int = PER_HOST,
+        timeout: float = TIMEOUT,
+        retries: int = RETRIES,
+        backoff: float = BACKOFF,
+        host_priority: typing.Optional[typing.Callable[[str], float]] = None,
+        seen_capacity: int = 0,
+        error_rate: float = 0.001,
+        max_queued: int = 0,
+        max_page_bytes: int = MAX_PAGE_BYTES,
+        verify_txt: bool = False,
+        state_path: typing.Optional[str] = None,
+        checkpoint_interval: float = CHECKPOINT_INTERVAL,
+        verbose: bool = True,
+    ):
+        self.seed_url = normalize_url(seed_url)
+        if self.seed_url is None:
+            raise ValueError(f"Not an http(s) URL: {seed_url}")
+        # Normalizing drops the trailing slash, which would widen the crawl from "/docs/" to "/docs-old"
+        self.scope = self.seed_url + '/' if seed_url.endswith('/') and not self.seed_url.endswith('/') else self.seed_url
+        self.max_links = max_links
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_page_bytes = max_page_bytes
+        self.verify_txt = verify_txt
+        self.state_path = state_path
+        self.checkpoint_interval = checkpoint_interval
+        self.verbose = verbose
+
+        self.txt_links: typing.List[str] = []
+        seen = BloomFilter(seen_capacity, error_rate) if seen_capacity else HashedSet()
+        self.frontier = Frontier(seen, host_priority, max_queued)
+        self.fetched = 0
+        self.failed = 0
+        self.skipped = 0  # Responses dropped for their content type or size
+        self.not_modified = 0  # Pages answered from the cache after a 304
+
+        self._state: typing.Optional[CrawlState] = None
+
+        self._session: typing.Optional[aiohttp.ClientSession] = None
+        self._active = 0  # Pages being visited, which may still queue more
+        self._wakeup: typing.Optional[asyncio.Event] = None
+        self._done: typing.Optional[asyncio.Event] = None
+
+    async def run(self) -> typing.List[str]:
+        """Crawl until done and return the .txt links found, in the order they were found."""
+        self._wakeup = asyncio.Event()
+        self._done = asyncio.Event()
+        if self.state_path is not None:
+            self._state = CrawlState(self.state_path)
+            self._restore()
+        else:
+            self.frontier.push(self.seed_url)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host)
+        try:
+            async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+                self._session = session
+                tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+                if self._state is not None:
+                    tasks.append(asyncio.create_task(self._checkpoint()))
+                try:
+                    if self.frontier and len(self.txt_links) < self.max_links:
+                        await self._done.wait()
+                finally:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+            if self._state is not None:
+                self._state.complete()
+        finally:
+            if self._state is not None:
+                self._state.close()  # Also reached on errors and cancellation, keeping what was done
+        return self.txt_links[:self.max_links]
+
+    def _restore(self):
+        """Rebuild the frontier and results from the crawl state, or start a new crawl in it."""
+        resumed = self._state.resume(self.seed_url)
+        if resumed is None:
+            self.frontier.push(self.seed_url)
+            self._state.queued(self.seed_url)
+            return
+        queued, visited, found = resumed
+        for url in visited:
+            self.frontier.add_seen(url)
+        for url in queued:
+            self.frontier.push(url)
+        for url in found:
+            self.frontier.add_seen(url)
+            self.txt_links.append(url)
+        if self.verbose:
+            print(f"Resuming crawl: {len(visited)} pages visited, {len(queued)} queued, {len(found)} text files found")
+
+    async def _checkpoint(self):
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            self._state.flush()
+
+    async def fetch_links(self, url: str) -> typing.Tuple[str, typing.List[str]]:
+        """
+        GET a page and return its final URL after redirects and the hrefs on it, retrying connection
+        errors, timeouts and `RETRY_STATUSES` with exponential backoff. Raises aiohttp.ClientError or
+        asyncio.TimeoutError once retries run out.
+        """
+        cached = self._state.cached(url) if self._state is not None else None
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers[aiohttp.hdrs.IF_NONE_MATCH] = cached.etag
+            if cached.last_modified:
+                headers[aiohttp.hdrs.IF_MODIFIED_SINCE] = cached.last_modified
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            try:
+                async with self._session.get(url, headers=headers) as response:
+                    if response.status == 304 and cached is not None:
+                        self.not_modified += 1
+                        return cached.final_url, cached.links
+                    if response.status not in RETRY_STATUSES or last:
+                        response.raise_for_status()
+                        final_url, links = str(response.url), await self._read_links(response)
+                        etag, last_modified = response.headers.get(aiohttp.hdrs.ETAG), response.headers.get(aiohttp.hdrs.LAST_MODIFIED)
+                        # Pages cut short by the end of the crawl would be cached with links missing
+                        if self._state is not None and (etag or last_modified) and not self._done.is_set():
+                            self._state.cache(url, etag, last_modified, final_url, links)
+                        return final_url, links
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError):
+                if last:
+                    raise
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def _read_links(self, response: aiohttp.ClientResponse) -> typing.List[str]:
+        """Stream the body through a `LinkExtractor`, or skip it by its headers."""
+        content_length = response.content_length
+        # A response without a Content-Type is given a chance, as browsers would sniff it
+        typed = aiohttp.hdrs.CONTENT_TYPE in response.headers
+        if typed and response.content_type not in HTML_TYPES or (content_length or 0) > self.max_page_bytes:
+            self.skipped += 1
+            return []
+        extractor = LinkExtractor(response.charset)
+        links = []
+        remaining = self.max_page_bytes
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            links += extractor.feed(chunk[:remaining])
+            remaining -= len(chunk)
+            if remaining <= 0 or self._done.is_set():
+                break  # The rest of the body is discarded with the connection
+        return links + extractor.close()
+
+    async def _worker(self):
+        while True:
+            if not self.frontier:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            self._active += 1
+            try:
+                await self._visit(self.frontier.pop())
+            finally:
+                self._active -= 1
+                if not self.frontier and not self._active:
+                    self._done.set()  # Nothing queued and nothing left that could queue more
+
+    async def _visit(self, url: str):
+        if self.verbose:
+            print(f"Visiting: {url}")
+        try:
+            final_url, hrefs = await self.fetch_links(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.failed += 1
+            if self.verbose:
+                print(f"Failed to fetch {url}: {e}")
+            if self._state is not None:
+                self._state.visited(url)
+            return
+        self.fetched += 1
+
+        # Relative links resolve against where the page really is, which normalizing may have changed
+        unverified = []
+        for href in hrefs:
+            link = normalize_url(href, final_url)
+            if link is None:
+                continue
+            if link.endswith('.txt'):
+                if self.frontier.add_seen(link):
+                    if self.verify_txt:
+                        unverified.append(link)
+                    else:
+                        self._found(link)
+            elif link.startswith(self.scope) and not _skipped_extension(link) and self.frontier.push(link):
+                self._wakeup.set()
+                if self._state is not None:
+                    self._state.queued(link)
+            if self._done.is_set():
+                return
+        if unverified:
+            await asyncio.gather(*[self._verify(link) for link in unverified])
+        # Only now, so an interrupted visit is repeated on resume and finds its links again
+        if self._state is not None:
+            self._state.visited(url)
+
+    async def _verify(self, link: str):
+        """Report a .txt link if a HEAD request finds it. Servers that do not allow HEAD get the benefit of the doubt."""
+        try:
+            async with self._session.head(link, allow_redirects=True) as response:
+                exists = response.status < 400 or response.status in (405, 501)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            exists = False
+        if exists and not self._done.is_set():
+            self._found(link)
+
+    def _found(self, link: str):
+        self.txt_links.append(link)
+        if self._state is not None:
+            self._state.found(link)
+        if self.verbose:
+            print(f"Found text file: {link}")
+        if len(self.txt_links) >= self.max_links:
+            self._done.set()
+
+def _skipped_extension(url: str) -> bool:
+    return posixpath.splitext(urlsplit(url).path)[1].lower() in SKIP_EXTENSIONS
+
+def crawl(seed_url: str, max_links: int = 50, **options) -> typing.List[str]:
+    """Run a `Crawler` to completion; `options` are its keyword arguments."""
+    return asyncio.run(Crawler(seed_url, max_links, **options).run())
@@ -0,0 +1,197 @@
+"""
+Crawl frontier: the queue of URLs still to visit and the record of every URL already seen.
+
+URLs are normalized before they are queued, so spellings of the same page (fragments, default ports,
+letter case in the scheme and host, dot segments, trailing slashes) are fetched once. Queueing and
+popping are O(1), or O(log hosts) with per-host priorities, and the seen set stores fixed-size hashes
+rather than URLs, or a Bloom filter of fixed size for crawls too large to remember exactly.
+"""
+import collections
+import hashlib
+import heapq
+import math
+import posixpath
+import typing
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def normalize_url(url: str, base: typing.Optional[str] = None) -> typing.Optional[str]:
+    """
+    Canonical form of an http(s) URL, resolved against `base` if given, or None for other schemes
+    and malformed URLs.
+
+    The scheme and host are lowercased, default ports and the fragment are dropped, dot segments and
+    repeated slashes are collapsed and a trailing slash is removed from every path but the root.
+    The query is kept as is, since parameter order can matter to the server.
+    """
+    if base is not None:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname
+    if ':' in host:
+        host = f'[{host}]'  # IPv6 literal
+    if port is not None and port != DEFAULT_PORTS[scheme]:
+        host = f'{host}:{port}'
+    userinfo, at, _ = parts.netloc.rpartition('@')
+
+    path = posixpath.normpath('/' + parts.path.lstrip('/')) if parts.path else '/'
+    if path.startswith('//'):
+        path = '/' + path.lstrip('/')  # normpath keeps a leading double slash
+    return urlunsplit((scheme, userinfo + at + host, path, parts.query, ''))
+
+def url_host(url: str) -> str:
+    return urlsplit(url).netloc
+
+def _url_hash(url: str) -> int:
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+class HashedSet:
+    """
+    Exact set of URLs that keeps 64-bit hashes instead of the strings.
+
+    Distinct URLs collide with probability around n**2 / 2**65, about one in 36,000 for a million URLs.
+    """
+    def __init__(self):
+        self._hashes: typing.Set[int] = set()
+
+    def add(self, url: str) -> bool:
+        """Add `url`, returning False if it was already present."""
+        value = _url_hash(url)
+        if value in self._hashes:
+            return False
+        self._hashes.add(value)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return _url_hash(url) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+class BloomFilter:
+    """
+    Probabilistic set of URLs in a fixed amount of memory.
+
+    Sized for `capacity` URLs at a false positive rate of `error_rate`. A false positive makes the
+    crawler skip a URL it has never seen. Past capacity the rate rises, but memory does not grow.
+    Costs about 1.8 bytes per URL at 0.1%.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate between 0 and 1")
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, url: str) -> range:
+        # Double hashing: k positions h1 + i * h2 from two independent 64-bit hashes, taken mod size by the caller
+        digest = hashlib.blake2b(url.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return range(h1, h1 + self.hashes * h2, h2)
+
+    def add(self, url: str) -> bool:
+        """Add `url`, returning False if it was (probably) already present."""
+        bits, size = self._bits, self.size
+        new = False
+        for position in self._positions(url):
+            position %= size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                new = True
+        self.count += new
+        return new
+
+    def __contains__(self, url: str) -> bool:
+        bits, size = self._bits, self.size
+        for position in self._positions(url):
+            position %= size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+class Frontier:
+    """
+    Queue of normalized URLs to visit, each accepted at most once.
+
+    Without `host_priority` URLs come out in the order they were pushed (breadth first). With it, every
+    host gets its own queue and `pop` takes from the host with the lowest `host_priority(host)`, in
+    push order within a host and among hosts of equal priority.
+
+    `max_size` bounds the number of queued URLs; pushes beyond it are dropped and counted in `dropped`.
+    """
+    def __init__(
+        self,
+        seen: typing.Optional[typing.Union[HashedSet, BloomFilter]] = None,
+        host_priority: typing.Optional[typing.Callable[[str], float]] = None,
+        max_size: int = 0,
+    ):
+        self.seen = seen if seen is not None else HashedSet()
+        self.host_priority = host_priority
+        self.max_size = max_size
+        self.dropped = 0
+
+        self._queue: typing.Deque[str] = collections.deque()
+        self._hosts: typing.Dict[str, typing.Deque[str]] = {}
+        self._heap: typing.List[typing.Tuple[float, int, str]] = []
+        self._order = 0
+        self._size = 0
+
+    def add_seen(self, url: str) -> bool:
+        """Record `url` as seen without queueing it. Returns False if it had been seen already."""
+        return self.seen.add(url)
+
+    def push(self, url: str) -> bool:
+        """Queue a normalized URL unless it was seen before or the frontier is full."""
+        if self.max_size and self._size >= self.max_size:
+            if url not in self.seen:
+                self.dropped += 1  # Not marked as seen, so it can still be queued once there is room
+            return False
+        if not self.seen.add(url):
+            return False
+        self._size += 1
+        if self.host_priority is None:
+            self._queue.append(url)
+            return True
+
+        host = url_host(url)
+        queue = self._hosts.get(host)
+        if queue is None:
+            queue = self._hosts[host] = collections.deque()
+            heapq.heappush(self._heap, (self.host_priority(host), self._order, host))
+            self._order += 1
+        queue.append(url)
+        return True
+
+    def pop(self) -> str:
+        """The next URL to visit. Raises IndexError when the frontier is empty."""
+        if not self._size:
+            raise IndexError("pop from an empty frontier")
+        self._size -= 1
+        if self.host_priority is None:
+            return self._queue.popleft()
+
+        _, _, host = self._heap[0]
+        queue = self._hosts[host]
+        url = queue.popleft()
+        if not queue:
+            heapq.heappop(self._heap)
+            del self._hosts[host]
+        return url
+
+    def __len__(self) -> int:
+        return self._size
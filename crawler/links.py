@@ -0,0 +1,62 @@
+"""
+Streaming link extraction.
+
+`LinkExtractor` pulls `<a href>` values out of HTML as it arrives, chunk by chunk, with one regular
+expression instead of a parsed document. Only an unfinished tag at the end of a chunk is kept between
+chunks, so memory stays small however large the page is.
+
+Being a lexer rather than a parser, it also finds anchors inside comments and scripts, and an attribute
+value containing ">" ends the tag early. Neither matters for discovering links.
+"""
+import codecs
+import html
+import re
+import typing
+
+# An <a> tag up to its href value, which may be double, single or unquoted
+_ANCHOR = re.compile(
+    r'''<a\s[^>]*?(?<![\w-])href\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))''',
+    re.IGNORECASE,
+)
+MAX_CARRY = 16 << 10  # Longest unfinished tag kept between chunks; longer ones are dropped
+
+class LinkExtractor:
+    """Incremental href extractor: `feed` bytes as they arrive and collect the links it returns."""
+    def __init__(self, encoding: typing.Optional[str] = None):
+        try:
+            decoder = codecs.getincrementaldecoder(encoding or 'utf-8')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')
+        self._decoder = decoder(errors='replace')
+        self._carry = ''
+
+    def feed(self, data: bytes) -> typing.List[str]:
+        """Hrefs of the anchors completed by `data`, entity-decoded and stripped."""
+        text = self._carry + self._decoder.decode(data)
+        # Hold back a tag that has not been closed yet, in case its href continues in the next chunk
+        cut = text.rfind('<')
+        if cut != -1 and text.find('>', cut) == -1:
+            self._carry = text[cut:] if len(text) - cut <= MAX_CARRY else ''
+            text = text[:cut]
+        else:
+            self._carry = ''
+        return self._links(text)
+
+    def close(self) -> typing.List[str]:
+        """Hrefs left in an unfinished tag at the end of the document."""
+        text = self._carry + self._decoder.decode(b'', final=True)
+        self._carry = ''
+        return self._links(text)
+
+    @staticmethod
+    def _links(text: str) -> typing.List[str]:
+        links = []
+        for match in _ANCHOR.finditer(text):
+            href = match.group(1) if match.group(1) is not None else match.group(2) if match.group(2) is not None else match.group(3)
+            links.append(html.unescape(href).strip() if '&' in href else href.strip())
+        return links
+
+def extract_links(document: bytes, encoding: typing.Optional[str] = None) -> typing.List[str]:
+    """Hrefs of every anchor in a complete document."""
+    extractor = LinkExtractor(encoding)
+    return extractor.feed(document) + extractor.close()
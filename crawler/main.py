@@ -1,49 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from engine import crawl
 
-def find_text_files(seed_url, max_links=50):
+def find_text_files(seed_url, max_links=50, **options):
     """
-    Recursively crawls a website starting from the seed URL to find .txt files.
+    Crawls a website starting from the seed URL to find .txt files.
+
+    Pages are fetched concurrently by `engine.Crawler`; see it for the concurrency, timeout and retry options.
 
     :param seed_url: The starting URL for the crawler.
     :param max_links: Maximum number of .txt file links to find.
+    :param options: Keyword arguments for `engine.Crawler`, e.g. concurrency=32, per_host=8.
     :return: List of found .txt file URLs.
     """
-    visited = set()
-    txt_links = []
-    urls_to_visit = [seed_url]
-
-    while urls_to_visit and len(txt_links) < max_links:
-        current_url = urls_to_visit.pop(0)
-
-        if current_url in visited:
-            continue
-
-        try:
-            print(f"Visiting: {current_url}")
-            response = requests.get(current_url, timeout=10)
-            response.raise_for_status()
-
-            visited.add(current_url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find all links on the current page
-            for a_tag in soup.find_all('a', href=True):
-                link = urljoin(current_url, a_tag['href'])
-                if link not in visited and link not in urls_to_visit:
-                    if link.endswith('.txt'):
-                        txt_links.append(link)
-                        print(f"Found text file: {link}")
-                        if len(txt_links) >= max_links:
-                            break
-                    elif link.startswith(seed_url):
-                        urls_to_visit.append(link)
-
-        except requests.RequestException as e:
-            print(f"Failed to fetch {current_url}: {e}")
-
-    return txt_links
+    return crawl(seed_url, max_links, **options)
 
 if __name__ == "__main__":
     seed_url = "https://wa.me"  # Replace with the starting URL
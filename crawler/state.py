@@ -0,0 +1,110 @@
+"""
+On-disk crawl state and HTTP cache.
+
+A `CrawlState` keeps one SQLite database per crawl target. It records every URL the current crawl has
+seen, which of them are still queued, and the .txt links found, so an interrupted crawl resumes where it
+stopped instead of starting over from the seed. It also keeps the ETag/Last-Modified validators and the
+links of every page fetched, which outlive the crawl: the next crawl of the site sends conditional
+requests and reuses the stored links of pages that answer 304 Not Modified.
+
+Changes are buffered in memory and written in one transaction per `flush`, so the database costs a
+few milliseconds per checkpoint rather than a write per URL.
+"""
+import json
+import sqlite3
+import typing
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS seen (url TEXT PRIMARY KEY, queued INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS found (url TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS cache (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    final_url TEXT NOT NULL,
+    links TEXT NOT NULL
+);
+'''
+
+class CachedPage(typing.NamedTuple):
+    etag: typing.Optional[str]
+    last_modified: typing.Optional[str]
+    final_url: str
+    links: typing.List[str]
+
+class CrawlState:
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(SCHEMA)
+
+        self._queued: typing.List[str] = []
+        self._visited: typing.List[str] = []
+        self._found: typing.List[str] = []
+        self._cached: typing.List[tuple] = []
+
+    def resume(self, seed_url: str) -> typing.Optional[typing.Tuple[typing.List[str], typing.List[str], typing.List[str]]]:
+        """
+        The (queued, visited, found) URLs of an unfinished crawl from `seed_url`, in the order they were
+        recorded, or None after clearing the crawl tables if there is nothing to resume. The cache is kept.
+        """
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'seed_url'").fetchone()
+        complete = self._db.execute("SELECT value FROM meta WHERE key = 'complete'").fetchone()
+        if row is None or row[0] != seed_url or complete is None or complete[0] != '0':
+            with self._db:
+                self._db.execute('DELETE FROM seen')
+                self._db.execute('DELETE FROM found')
+                self._db.executemany('INSERT OR REPLACE INTO meta VALUES (?, ?)', [('seed_url', seed_url), ('complete', '0')])
+            return None
+
+        queued, visited = [], []
+        for url, is_queued in self._db.execute('SELECT url, queued FROM seen ORDER BY rowid'):
+            (queued if is_queued else visited).append(url)
+        found = [url for url, in self._db.execute('SELECT url FROM found ORDER BY rowid')]
+        return queued, visited, found
+
+    def queued(self, url: str):
+        self._queued.append(url)
+
+    def visited(self, url: str):
+        """Mark a page as done, failed or not, so a resumed crawl does not fetch it again."""
+        self._visited.append(url)
+
+    def found(self, url: str):
+        self._found.append(url)
+
+    def cached(self, url: str) -> typing.Optional[CachedPage]:
+        """The cached response for `url`, if it had an ETag or Last-Modified header."""
+        row = self._db.execute('SELECT etag, last_modified, final_url, links FROM cache WHERE url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, final_url, links = row
+        return CachedPage(etag, last_modified, final_url, json.loads(links))
+
+    def cache(self, url: str, etag: typing.Optional[str], last_modified: typing.Optional[str], final_url: str, links: typing.List[str]):
+        self._cached.append((url, etag, last_modified, final_url, json.dumps(links)))
+
+    def flush(self):
+        """Write everything recorded since the last flush in one transaction."""
+        with self._db:
+            self._db.executemany('INSERT OR IGNORE INTO seen VALUES (?, 1)', ((url,) for url in self._queued))
+            self._db.executemany('INSERT INTO seen VALUES (?, 0) ON CONFLICT (url) DO UPDATE SET queued = 0', ((url,) for url in self._visited))
+            self._db.executemany('INSERT OR IGNORE INTO found VALUES (?)', ((url,) for url in self._found))
+            self._db.executemany('INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)', self._cached)
+        self._queued.clear()
+        self._visited.clear()
+        self._found.clear()
+        self._cached.clear()
+
+    def complete(self):
+        """Flush and mark the crawl finished, so the next one starts from the seed again."""
+        self.flush()
+        with self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('complete', '1')")
+
+    def close(self):
+        self.flush()
+        self._db.close()
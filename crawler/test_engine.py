@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from engine import Crawler, crawl
+
+def fan_out(pages: int, files: int = 1) -> dict:
+    """A root page linking to /p0 ... /p{pages-1}, each linking to `files` .txt files and back to the root."""
+    site = {'/': {'body': ' '.join(f'<a href="/p{i}">{i}</a>' for i in range(pages))}}
+    for i in range(pages):
+        site[f'/p{i}'] = {'body': '<a href="/">home</a> ' + ' '.join(f'<a href="/p{i}/{j}.txt">f</a>' for j in range(files))}
+    return site
+
+def test_retryable_statuses_are_retried_with_backoff(site):
+    server = site({'/': {'body': '<a href="/flaky">f</a> <a href="/down">d</a>'},
+                   '/flaky': {'body': '<a href="/flaky.txt">t</a>', 'failures': 2},
+                   '/down': {'body': '<a href="/down.txt">t</a>', 'failures': 10}})
+    crawler = Crawler(server.url + '/', 10, retries=2, backoff=0.05, verbose=False)
+    start = time.monotonic()
+    links = asyncio.run(crawler.run())
+    assert time.monotonic() - start >= 0.05 + 0.1  # Two backoffs, doubling
+    assert links == [server.url + '/flaky.txt']
+    assert server.paths().count('/flaky') == 3
+    assert server.paths().count('/down') == 3  # Given up after the retries
+    assert (crawler.fetched, crawler.failed) == (2, 1)
+
+def test_crawl_stops_at_max_links(site):
+    server = site(fan_out(20, files=5))
+    links = crawl(server.url + '/', 7, concurrency=1, verbose=False)
+    assert len(links) == 7
+    assert len(set(links)) == 7
+    assert len(server.paths()) < 5  # The root and the two pages holding the first 7 links, at most one more
+
+@pytest.mark.parametrize('concurrency, per_host, limit', [(8, 3, 3), (2, 8, 2)])
+def test_requests_in_flight_are_capped(site, concurrency, per_host, limit):
+    server = site(fan_out(20))
+    server.blocked.update(f'/p{i}' for i in range(20))
+
+    async def run():
+        task = asyncio.create_task(Crawler(server.url + '/', 100, concurrency=concurrency, per_host=per_host, verbose=False).run())
+        await asyncio.sleep(0.3)
+        in_flight = server.in_flight
+        server.blocked.clear()
+        return in_flight, await task
+
+    in_flight, links = asyncio.run(run())
+    assert in_flight == limit
+    assert server.max_in_flight == limit
+    assert len(links) == 20
+    assert len(server.connections) <= limit  # Connections are kept alive and reused
+
+def serial_find_text_files(seed_url, max_links=50):
+    """The serial crawler `engine.Crawler` replaced, kept as the reference for what a crawl should find."""
+    requests = pytest.importorskip('requests')
+    bs4 = pytest.importorskip('bs4')
+    from urllib.parse import urljoin
+
+    visited = set()
+    txt_links = []
+    urls_to_visit = [seed_url]
+    while urls_to_visit and len(txt_links) < max_links:
+        current_url = urls_to_visit.pop(0)
+        if current_url in visited:
+            continue
+        try:
+            response = requests.get(current_url, timeout=10)
+            response.raise_for_status()
+            visited.add(current_url)
+            soup = bs4.BeautifulSoup(response.text, 'html.parser')
+            for a_tag in soup.find_all('a', href=True):
+                link = urljoin(current_url, a_tag['href'])
+                if link not in visited and link not in urls_to_visit:
+                    if link.endswith('.txt'):
+                        txt_links.append(link)
+                        if len(txt_links) >= max_links:
+                            break
+                    elif link.startswith(seed_url):
+                        urls_to_visit.append(link)
+        except requests.RequestException:
+            pass
+    return txt_links
+
+def test_finds_the_same_text_files_as_the_serial_crawler(site):
+    pages = fan_out(12, files=3)
+    pages['/p3']['body'] += ' <a href="/p3/sub">sub</a> <a href="/missing">404</a> <a href="https://elsewhere.org/x">out</a>'
+    pages['/p3/sub'] = {'body': '<a href="deep.txt">deep</a> <a href="/p0/0.txt">again</a> <a href="../p5">up</a>'}
+    pages['/p7']['failures'] = 5
+    server = site(pages)
+
+    expected = serial_find_text_files(server.url + '/', 1000)
+    pages['/p7']['failures'] = 5
+    found = crawl(server.url + '/', 1000, retries=0, verbose=False)
+    assert sorted(found) == sorted(set(expected))
+    assert len(found) == len(set(found))
+    assert server.url + '/p3/deep.txt' in found
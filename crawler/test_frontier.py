@@ -0,0 +1,95 @@
+import math
+
+import pytest
+
+from frontier import BloomFilter, Frontier, HashedSet, normalize_url
+
+@pytest.mark.parametrize('url, expected', [
+    ('http://example.com', 'http://example.com/'),
+    ('HTTP://Example.COM/Path', 'http://example.com/Path'),
+    ('http://example.com/page#section', 'http://example.com/page'),
+    ('http://example.com:80/a', 'http://example.com/a'),
+    ('https://example.com:443/a', 'https://example.com/a'),
+    ('https://example.com:8443/a', 'https://example.com:8443/a'),
+    ('http://example.com/a/./b/../c', 'http://example.com/a/c'),
+    ('http://example.com//a///b', 'http://example.com/a/b'),
+    ('http://example.com/a/', 'http://example.com/a'),
+    ('http://example.com/', 'http://example.com/'),
+    ('http://example.com/a?b=2&a=1#x', 'http://example.com/a?b=2&a=1'),
+    ('http://user@example.com/a', 'http://user@example.com/a'),
+    ('http://[::1]:8080/a', 'http://[::1]:8080/a'),
+    ('http://[2001:DB8::1]/', 'http://[2001:db8::1]/'),
+    ('  http://example.com/a  ', 'http://example.com/a'),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
+
+@pytest.mark.parametrize('url', ['mailto:a@example.com', 'ftp://example.com/a', 'javascript:void(0)', 'http://', 'http://example.com:notaport/', '/relative'])
+def test_normalize_url_rejects(url):
+    assert normalize_url(url) is None
+
+def test_normalize_url_resolves_against_base():
+    assert normalize_url('../b', 'http://example.com/a/c/') == 'http://example.com/a/b'
+    assert normalize_url('//other.org/x', 'https://example.com/') == 'https://other.org/x'
+    assert normalize_url('#top', 'http://example.com/page') == 'http://example.com/page'
+
+def test_frontier_deduplicates_and_keeps_push_order():
+    frontier = Frontier()
+    urls = ['http://a.com/1', 'http://b.com/1', 'http://a.com/2']
+    for url in urls + urls:
+        frontier.push(url)
+    assert frontier.add_seen('http://a.com/3')
+    assert not frontier.push('http://a.com/3')  # Seen, though never queued
+    assert [frontier.pop() for _ in range(len(frontier))] == urls
+    assert not frontier.push('http://a.com/1')  # Popped URLs stay seen
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+def test_host_priority_orders_hosts():
+    priority = {'c.com': 0, 'a.com': 1, 'b.com': 1}
+    frontier = Frontier(host_priority=priority.__getitem__)
+    for url in ['http://a.com/1', 'http://b.com/1', 'http://a.com/2', 'http://c.com/1', 'http://b.com/2']:
+        frontier.push(url)
+    # Lowest priority first, then hosts of equal priority in the order they first appeared
+    assert [frontier.pop() for _ in range(len(frontier))] == [
+        'http://c.com/1', 'http://a.com/1', 'http://a.com/2', 'http://b.com/1', 'http://b.com/2',
+    ]
+    frontier.push('http://a.com/3')
+    assert frontier.pop() == 'http://a.com/3'
+
+def test_full_frontier_drops_without_marking_seen():
+    frontier = Frontier(max_size=2)
+    assert frontier.push('http://a.com/1')
+    assert frontier.push('http://a.com/2')
+    assert not frontier.push('http://a.com/3')
+    assert not frontier.push('http://a.com/1')  # Already seen, so not a drop
+    assert frontier.dropped == 1
+    assert 'http://a.com/3' not in frontier.seen
+    frontier.pop()
+    assert frontier.push('http://a.com/3')
+
+@pytest.mark.parametrize('seen', [HashedSet, lambda: BloomFilter(1000)])
+def test_seen_sets(seen):
+    urls = [f'http://example.com/{i}' for i in range(1000)]
+    seen = seen()
+    assert all(seen.add(url) for url in urls)
+    assert not any(seen.add(url) for url in urls)
+    assert all(url in seen for url in urls)
+    assert len(seen) == 1000
+
+@pytest.mark.parametrize('error_rate', [0.01, 0.001])
+def test_bloom_filter_false_positive_rate_at_capacity(error_rate):
+    capacity = 20_000
+    bloom = BloomFilter(capacity, error_rate)
+    for i in range(capacity):
+        bloom.add(f'http://example.com/seen/{i}')
+    trials = 100_000
+    false_positives = sum(f'http://example.com/unseen/{i}' in bloom for i in range(trials))
+    assert false_positives / trials < error_rate * 1.5
+    assert len(bloom._bits) == math.ceil(capacity * math.log2(1 / error_rate) / math.log(2) / 8)  # Optimal size
+
+def test_bloom_filter_rejects_bad_sizes():
+    with pytest.raises(ValueError):
+        BloomFilter(0)
+    with pytest.raises(ValueError):
+        BloomFilter(100, 1.0)
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from engine import Crawler
+from links import MAX_CARRY, LinkExtractor, extract_links
+
+DOCUMENT = b'''<html><head><a-b href="/not-an-anchor"><link href="/style.css"></head><body>
+<a href="/double">one</a> <A HREF='/single'>two</A> <a class=x href=/unquoted>three</a>
+<a data-href="/data" title="t">no href</a><a
+   href = " /spaced " >four</a> <a href="/q?a=1&amp;b=2">five</a> <abbr href="/abbr">six</abbr>
+</body></html>'''
+LINKS = ['/double', '/single', '/unquoted', '/spaced', '/q?a=1&b=2']
+
+def test_extract_links():
+    assert extract_links(DOCUMENT) == LINKS
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 7, 64])
+def test_links_split_across_chunks(chunk_size):
+    extractor = LinkExtractor()
+    links = []
+    for start in range(0, len(DOCUMENT), chunk_size):
+        links += extractor.feed(DOCUMENT[start:start + chunk_size])
+    assert links + extractor.close() == LINKS
+
+def test_charset_and_multibyte_characters_split_across_chunks():
+    document = '<a href="/café">x</a><a href="/日本">y</a>'
+    encoded = document.encode('utf-8')
+    extractor = LinkExtractor('utf-8')
+    links = [link for byte in range(len(encoded)) for link in extractor.feed(encoded[byte:byte + 1])]
+    assert links + extractor.close() == ['/café', '/日本']
+    assert extract_links(document.encode('latin-1', 'replace'), 'latin-1')[0] == '/café'
+    assert extract_links(b'<a href="/x">', 'no-such-codec') == ['/x']
+
+def test_overlong_unfinished_tag_is_dropped():
+    extractor = LinkExtractor()
+    assert extractor.feed(b'<a title="' + b'x' * (MAX_CARRY + 1)) == []
+    assert extractor.feed(b'" href="/lost"><a href="/kept">') == ['/kept']
+
+def test_responses_are_gated_by_headers(site):
+    padding = 'x' * 3000
+    server = site({
+        '/': {'body': '<a href="/page.html">p</a> <a href="/archive.zip">z</a> <a href="/image">i</a> '
+                      '<a href="/big">b</a> <a href="/stream">s</a> '
+                      '<a href="/exists.txt">e</a> <a href="/missing.txt">m</a>'},
+        '/page.html': {'body': '<a href="/page.txt">t</a>'},
+        '/image': {'body': '<a href="/from-image.txt">hidden</a>', 'content_type': 'image/png'},
+        '/big': {'body': '<a href="/from-big.txt">big</a>' + padding},
+        '/stream': {'body': '<a href="/early.txt">e</a>' + padding + '<a href="/late.txt">l</a>', 'chunked': True},
+        '/page.txt': {'body': 'text', 'content_type': 'text/plain'},
+        '/early.txt': {'body': 'text', 'content_type': 'text/plain'},
+        '/exists.txt': {'body': 'text', 'content_type': 'text/plain'},
+    })
+    crawler = Crawler(server.url + '/', max_links=10, max_page_bytes=2000, verify_txt=True, verbose=False)
+    links = asyncio.run(crawler.run())
+    assert sorted(links) == sorted(server.url + path for path in ['/page.txt', '/early.txt', '/exists.txt'])
+    assert '/archive.zip' not in server.paths()
+    assert crawler.skipped == 2  # /image by its type, /big by its length
+    assert sorted(server.paths('HEAD')) == ['/early.txt', '/exists.txt', '/missing.txt', '/page.txt']
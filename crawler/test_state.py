@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from engine import Crawler
+from state import CachedPage, CrawlState
+
+def chain(length: int, etags: bool = False) -> dict:
+    """A root page linking to /p0 -> /p1 -> ..., each page linking to the next and to one .txt file."""
+    pages = {'/': {'body': '<a href="/p0">start</a>'}}
+    for i in range(length):
+        pages[f'/p{i}'] = {'body': f'<a href="/p{i + 1}">next</a> <a href="/f{i}.txt">file</a>'}
+        if etags:
+            pages[f'/p{i}']['etag'] = f'"v{i}"'
+    if etags:
+        pages['/']['etag'] = '"root"'
+    return pages
+
+def test_state_resumes_until_complete(tmp_path):
+    path = str(tmp_path / 'crawl.db')
+    state = CrawlState(path)
+    assert state.resume('http://a') is None
+    state.queued('http://a')
+    state.queued('http://a/x')
+    state.visited('http://a')
+    state.found('http://a/f.txt')
+    state.cache('http://a', '"e"', None, 'http://a/', ['/x'])
+    state.close()
+
+    state = CrawlState(path)
+    assert state.resume('http://a') == (['http://a/x'], ['http://a'], ['http://a/f.txt'])
+    assert state.cached('http://a') == CachedPage('"e"', None, 'http://a/', ['/x'])
+    state.complete()
+    state.close()
+
+    state = CrawlState(path)
+    assert state.resume('http://a') is None  # Finished, so the next crawl starts over
+    assert state.cached('http://a') is not None  # but keeps the cache
+    state.close()
+
+def test_other_seed_starts_over(tmp_path):
+    path = str(tmp_path / 'crawl.db')
+    state = CrawlState(path)
+    state.resume('http://a')
+    state.queued('http://a/x')
+    state.close()
+
+    state = CrawlState(path)
+    assert state.resume('http://b') is None
+    state.close()
+    state = CrawlState(path)
+    assert state.resume('http://b') == ([], [], [])
+    state.close()
+
+def test_interrupted_crawl_resumes(site, tmp_path):
+    server = site(chain(20))
+    server.blocked.add('/p10')
+    path = str(tmp_path / 'crawl.db')
+
+    async def interrupted():
+        task = asyncio.create_task(Crawler(server.url + '/', 100, state_path=path, verbose=False).run())
+        while ('GET', '/p10') not in server.requests:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(interrupted())
+    assert server.paths() == ['/'] + [f'/p{i}' for i in range(11)]
+
+    server.blocked.clear()
+    server.requests.clear()
+    crawler = Crawler(server.url + '/', 100, state_path=path, verbose=False)
+    links = asyncio.run(crawler.run())
+    assert server.paths() == [f'/p{i}' for i in range(10, 21)]  # /p20 does not exist
+    assert links == [server.url + f'/f{i}.txt' for i in range(20)]
+
+def test_unchanged_pages_are_revalidated(site, tmp_path):
+    server = site(chain(10, etags=True))
+    path = str(tmp_path / 'crawl.db')
+    first = asyncio.run(Crawler(server.url + '/', 100, state_path=path, verbose=False).run())
+
+    server.pages['/p5']['body'] = '<a href="/p6">next</a> <a href="/changed.txt">file</a>'
+    server.pages['/p5']['etag'] = '"changed"'
+    crawler = Crawler(server.url + '/', 100, state_path=path, verbose=False)
+    second = asyncio.run(crawler.run())
+    assert crawler.not_modified == 10  # The root and every page but /p5
+    assert crawler.fetched == 11
+    assert second == [link.replace('/f5.txt', '/changed.txt') for link in first]
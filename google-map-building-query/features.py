@@ -0,0 +1,118 @@
+import hashlib
+import json
+import math
+import os
+
+import geopandas as gpd
+
+# Where features are stored unless told otherwise; dumps/ is kept out of git
+STORE_DIRECTORY = os.path.join("dumps", "features")
+POLYGONS = ("Polygon",)
+
+
+class FeatureStore:
+    """
+    Local store of OSM features as GeoParquet files.
+
+    Each dataset is keyed by place name, tag set, geometry types, CRS and source and holds the features
+    already filtered and reprojected, so a repeated run reads one columnar file instead of querying
+    Overpass and parsing the response again. Files are written with a bounding box covering column,
+    which lets `load` skip row groups outside `bbox` and read only the `columns` asked for.
+    """
+
+    def __init__(self, directory=STORE_DIRECTORY):
+        self.directory = directory
+
+    def load(self, place_name, tags, crs=None, geometry_types=POLYGONS, columns=None, bbox=None, source=None, refresh=False):
+        """
+        Load features, fetching and storing them first if this dataset is not on disk yet.
+        :param place_name: Place to query, e.g. "Gjerdrum, Norway". With `source` it only names the dataset.
+        :param tags: OSM tag filter, as for `ox.features_from_place`.
+        :param crs: CRS to reproject to before storing, e.g. 32633. None keeps EPSG:4326.
+        :param geometry_types: Geometry types to keep, e.g. ("Polygon",). None keeps all.
+        :param columns: Columns to read besides the geometry. None reads all.
+        :param bbox: (minx, miny, maxx, maxy) in the stored CRS; only features intersecting it are read.
+        :param source: Local .osm or .pbf extract to read instead of querying the network.
+        :param refresh: Fetch and store again even if the dataset is on disk.
+        :return: GeoDataFrame indexed like `ox.features_from_place`.
+        """
+        if source is not None:
+            source = os.path.abspath(source)
+        path = self.path(place_name, tags, crs, geometry_types, source)
+        if refresh or not os.path.exists(path):
+            gdf = fetch_features(place_name, tags, source)
+            if geometry_types is not None:
+                gdf = gdf[gdf.geometry.geom_type.isin(geometry_types)]
+            if crs is not None:
+                gdf = gdf.to_crs(crs)
+            self.save(gdf, path, {"place_name": place_name, "tags": tags, "crs": crs, "geometry_types": geometry_types, "source": source})
+
+        if columns is not None:
+            columns = [column for column in columns if column != "geometry"] + ["geometry"]
+        return gpd.read_parquet(path, columns=columns, bbox=bbox)
+
+    def path(self, place_name, tags, crs=None, geometry_types=POLYGONS, source=None):
+        """
+        File of a dataset: a readable place prefix and a hash of everything that defines it, including
+        the extract it was read from, so Overpass and local data are never served for each other.
+        """
+        key = json.dumps([place_name, tags, crs, sorted(geometry_types) if geometry_types else None, source], sort_keys=True)
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        prefix = "_".join("".join(c if c.isalnum() else " " for c in place_name.lower()).split())
+        return os.path.join(self.directory, f"{prefix}-{digest}.parquet")
+
+    def save(self, gdf, path, description):
+        """Write a GeoDataFrame atomically, with a JSON file next to it describing the dataset."""
+        os.makedirs(self.directory, exist_ok=True)
+        gdf = _parquet_compatible(gdf)
+        # Written to a temporary name first, so an interrupted run never leaves a truncated dataset
+        temporary = path + ".tmp"
+        gdf.to_parquet(temporary, write_covering_bbox=True)
+        os.replace(temporary, path)
+        with open(os.path.splitext(path)[0] + ".json", "w") as f:
+            json.dump({**description, "features": len(gdf)}, f, indent=2)
+
+
+def fetch_features(place_name, tags, source=None):
+    """
+    Fetch OSM features from the network, or from a local extract when `source` is given.
+    .osm (XML) extracts are read with osmnx; .pbf extracts need pyrosm.
+    """
+    import osmnx as ox
+
+    if source is None:
+        return ox.features_from_place(place_name, tags=tags)
+    if source.endswith(".pbf"):
+        return _features_from_pbf(source, tags)
+    return ox.features_from_xml(source, tags=tags)
+
+
+def _features_from_pbf(source, tags):
+    try:
+        from pyrosm import OSM
+    except ImportError as e:
+        raise ImportError("Reading .pbf extracts requires pyrosm (pip install pyrosm)") from e
+
+    # pyrosm takes lists of accepted values, or True for any value, like osmnx
+    custom_filter = {key: value if value is True else [value] if isinstance(value, str) else list(value) for key, value in tags.items()}
+    gdf = OSM(source).get_data_by_custom_criteria(custom_filter=custom_filter, keep_nodes=True, keep_ways=True, keep_relations=True)
+    if gdf is None:
+        return gpd.GeoDataFrame(geometry=[], crs="EPSG:4326")
+    # Index like osmnx: (element, id)
+    return gdf.set_index(["osm_type", "id"]).rename_axis(["element", "id"])
+
+
+def _parquet_compatible(gdf):
+    """OSM attribute columns can mix strings, numbers and lists, which Parquet cannot store; store those as strings."""
+    gdf = gdf.copy()
+    for column in gdf.columns:
+        if column == gdf.geometry.name or gdf[column].dtype != object:
+            continue
+        values = gdf[column]
+        if not values.map(_is_plain).all():
+            gdf[column] = values.map(lambda value: value if _is_plain(value) else str(value))
+    return gdf
+
+
+def _is_plain(value):
+    return value is None or isinstance(value, str) or (isinstance(value, float) and math.isnan(value))
@@ -1,23 +1,18 @@
-import osmnx as ox
-from shapely.geometry import Polygon
-from rtree import index
-import geopandas as gpd
+import shapely
 import json
+from features import FeatureStore
+from proximity import close_pairs
 
 # Define location and tags
 place_name = "Gjerdrum, Norway"
 tags = {"building": True}
+source = None  # Path to a local .osm/.pbf extract, to run without network access
 
-# Load and filter building data
-gdf_buildings = ox.features_from_place(place_name, tags=tags)
-gdf_buildings = gdf_buildings[gdf_buildings.geometry.apply(lambda x: isinstance(x, Polygon))]
-gdf_buildings_wgs84 = gdf_buildings.to_crs(epsg=4326)
+# Load polygon building data in a projected CRS (e.g., UTM), from the local feature store after the first run
+gdf_buildings_projected = FeatureStore().load(place_name, tags, crs=32633, source=source)  # Replace 32633 with the appropriate EPSG code for your area
 
 # Reset index to ensure it is an integer
-gdf_buildings_wgs84 = gdf_buildings_wgs84.reset_index(drop=True)
-
-# Re-project geometries to a projected CRS (e.g., UTM)
-gdf_buildings_projected = gdf_buildings_wgs84.to_crs(epsg=32633)  # Replace 32633 with the appropriate EPSG code for your area
+gdf_buildings_projected = gdf_buildings_projected.reset_index(drop=True)
 
 # Buffer buildings slightly
 buffered_buildings = gdf_buildings_projected.copy()
@@ -26,50 +21,33 @@ buffered_buildings['geometry'] = gdf_buildings_projected.geometry.buffer(0.5)  #
 # Re-project back to WGS84 if needed
 buffered_buildings = buffered_buildings.to_crs(epsg=4326)
 
-# Create spatial index for efficient searching
-spatial_index = index.Index()
+# Find each pair of buildings whose buffers intersect once, in bulk on the projected geometries
+pairs = close_pairs(gdf_buildings_projected, buffer=0.5)
+close_buildings = list(zip(pairs["first"], pairs["second"]))
 
-# Insert geometries into the spatial index
-for idx, row in buffered_buildings.iterrows():
-    print(idx, row.geometry.bounds)
-    spatial_index.insert(idx, row.geometry.bounds)
+# Centroids and bounds of the buffered buildings, for every building at once
+centroids = shapely.centroid(buffered_buildings.geometry.values)
+centroid_lon, centroid_lat = shapely.get_x(centroids), shapely.get_y(centroids)
+bounds = buffered_buildings.geometry.bounds.to_numpy()  # minx, miny, maxx, maxy
 
-# Data storage
-close_buildings = []
 building_coordinates = []
-
-# Vectorized pair checking
-for idx, building1 in buffered_buildings.iterrows():
-    possible_matches_idx = list(spatial_index.intersection(building1.geometry.bounds))
-    possible_matches = buffered_buildings.iloc[possible_matches_idx]
-
-    # Filter out self and check for intersections
-    for idx2, building2 in possible_matches.iterrows():
-        if idx != idx2 and building1.geometry.intersects(building2.geometry):
-            # Avoid redundant computations
-            centroid1 = building1.geometry.centroid
-            bounds1 = building1.geometry.bounds
-            centroid2 = building2.geometry.centroid
-            bounds2 = building2.geometry.bounds
-
-            building_coordinates.append({
-                "building1_id": idx,
-                "building1_centroid_lat": centroid1.y,
-                "building1_centroid_lon": centroid1.x,
-                "building1_min_lat": bounds1[1],
-                "building1_min_lon": bounds1[0],
-                "building1_max_lat": bounds1[3],
-                "building1_max_lon": bounds1[2],
-                "building2_id": idx2,
-                "building2_centroid_lat": centroid2.y,
-                "building2_centroid_lon": centroid2.x,
-                "building2_min_lat": bounds2[1],
-                "building2_min_lon": bounds2[0],
-                "building2_max_lat": bounds2[3],
-                "building2_max_lon": bounds2[2],
-            })
-
-            close_buildings.append((idx, idx2))
+for idx, idx2 in close_buildings:
+    building_coordinates.append({
+        "building1_id": int(idx),
+        "building1_centroid_lat": centroid_lat[idx],
+        "building1_centroid_lon": centroid_lon[idx],
+        "building1_min_lat": bounds[idx, 1],
+        "building1_min_lon": bounds[idx, 0],
+        "building1_max_lat": bounds[idx, 3],
+        "building1_max_lon": bounds[idx, 2],
+        "building2_id": int(idx2),
+        "building2_centroid_lat": centroid_lat[idx2],
+        "building2_centroid_lon": centroid_lon[idx2],
+        "building2_min_lat": bounds[idx2, 1],
+        "building2_min_lon": bounds[idx2, 0],
+        "building2_max_lat": bounds[idx2, 3],
+        "building2_max_lon": bounds[idx2, 2],
+    })
 
 # Convert the building coordinates to a JSON format suitable for Google Maps
 geojson = {
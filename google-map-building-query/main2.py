@@ -1,80 +1,82 @@
-import osmnx as ox
-from shapely.geometry import Polygon
-from rtree import index
 import json
-import random
+import shapely
+from features import FeatureStore
+from proximity import tiled_near_pairs
 
 place_name = "Gjerdrum, Norway"
 building_tags = {"building": True}
 field_tags = {"landuse": "meadow", "natural": "grassland"}
+source = None  # Path to a local .osm/.pbf extract, to run without network access
+tile_size = 5000  # Side of a processing tile in meters
+workers = None  # Worker processes; None uses every core
 
-gdf_buildings = ox.features_from_place(place_name, tags=building_tags)
-gdf_buildings = gdf_buildings[gdf_buildings.geometry.apply(lambda x: isinstance(x, Polygon))]
-gdf_buildings_wgs84 = gdf_buildings.to_crs(epsg=4326)
 
-gdf_fields = ox.features_from_place(place_name, tags=field_tags)
-gdf_fields = gdf_fields[gdf_fields.geometry.apply(lambda x: isinstance(x, Polygon))]
-gdf_fields_wgs84 = gdf_fields.to_crs(epsg=4326)
+def main():
+    # Polygons in UTM, queried from OSM on the first run and read from the local feature store afterwards
+    store = FeatureStore()
+    gdf_buildings_projected = store.load(place_name, building_tags, crs=32633, source=source)
+    gdf_fields_projected = store.load(place_name, field_tags, crs=32633, source=source)
 
-gdf_buildings_projected = gdf_buildings_wgs84.to_crs(epsg=32633)
-gdf_fields_projected = gdf_fields_wgs84.to_crs(epsg=32633)
+    # Skip invalid or empty field geometries
+    gdf_fields_projected = gdf_fields_projected[gdf_fields_projected.geometry.is_valid & ~gdf_fields_projected.geometry.is_empty]
 
-buffered_fields = gdf_fields_projected.copy()
-buffered_fields["geometry"] = gdf_fields_projected.geometry.buffer(10)  # Buffer by 10 meters
+    # A building is near a field when it is within 10 meters of the field buffered by 10 meters,
+    # which is the same as being within 20 meters of the field itself
+    field_buffer = 10  # Buffer by 10 meters
+    near_distance = 10
 
-field_index = index.Index()
-for idx, row in buffered_fields.iterrows():
-    print(f"Processing field {idx}")
-    if row.geometry.is_valid and not row.geometry.is_empty:  # Check for valid and non-empty geometries
-        bounds = tuple(map(float, row.geometry.bounds))  # Convert all elements to native float
-        if len(bounds) == 4:
-            building_id = idx[1]
-            field_index.insert(int(building_id), bounds)  # Ensure building_id is an integer
-        else:
-            print(f"Invalid bounds for geometry at index {idx}: {bounds}")
-    else:
-        print(f"Invalid or empty geometry at index {idx}")
+    # Tiled over the region and spread over every core; positions index the GeoDataFrames, never OSM ids
+    pairs = tiled_near_pairs(
+        gdf_buildings_projected.geometry.values,
+        gdf_fields_projected.geometry.values,
+        field_buffer + near_distance,
+        tile_size=tile_size,
+        workers=workers,
+    )
 
-print(buffered_fields)
+    # Keep the nearest field of each building
+    nearest = pairs.sort_values(["left", "distance"]).drop_duplicates("left")
+    building_ids = gdf_buildings_projected.index.take(nearest["left"].to_numpy()).tolist()
+    field_ids = gdf_fields_projected.index.take(nearest["right"].to_numpy()).tolist()
+    centroids = shapely.centroid(gdf_buildings_projected.geometry.values[nearest["left"].to_numpy()])
+    field_bounds = gdf_fields_projected.geometry.bounds.to_numpy()[nearest["right"].to_numpy()] + [-field_buffer, -field_buffer, field_buffer, field_buffer]
 
-near_field_buildings = []
-for idx, building in gdf_buildings_projected.iterrows():
-    possible_field_matches_idx = list(field_index.intersection(building.geometry.bounds))
-    print(f"Possible field matches for building {idx}: {possible_field_matches_idx}")
-    print(f"Building bounds: {building.geometry.bounds}")
+    near_field_buildings = []
+    for building_id, field_id, centroid, bounds in zip(building_ids, field_ids, centroids, field_bounds):
+        near_field_buildings.append({
+            "building_id": building_id,
+            "field_id": field_id,
+            "building_centroid_lat": centroid.y,
+            "building_centroid_lon": centroid.x,
+            "field_bounds": tuple(bounds),
+        })
 
-    possible_fields = buffered_fields.iloc[possible_field_matches_idx]
+    geojson = {
+        "type": "FeatureCollection",
+        "features": []
+    }
 
-    for _, field in possible_fields.iterrows():
-        if building.geometry.intersects(field.geometry) or building.geometry.distance(field.geometry) <= 10:
-            near_field_buildings.append({
-                "building_id": idx,
-                "building_centroid_lat": building.geometry.centroid.y,
-                "building_centroid_lon": building.geometry.centroid.x,
-                "field_bounds": field.geometry.bounds
-            })
-            break
+    for entry in near_field_buildings:
+        feature = {
+            "type": "Feature",
+            "geometry": {
+                "type": "Point",
+                "coordinates": [entry["building_centroid_lon"], entry["building_centroid_lat"]]
+            },
+            "properties": {
+                "id": entry["building_id"],
+                "field_id": entry["field_id"],
+                "field_bounds": entry["field_bounds"]
+            }
+        }
+        geojson["features"].append(feature)
 
-geojson = {
-    "type": "FeatureCollection",
-    "features": []
-}
+    with open("buildings_near_fields.json", "w") as f:
+        json.dump(geojson, f)
 
-for entry in near_field_buildings:
-    feature = {
-        "type": "Feature",
-        "geometry": {
-            "type": "Point",
-            "coordinates": [entry["building_centroid_lon"], entry["building_centroid_lat"]]
-        },
-        "properties": {
-            "id": entry["building_id"],
-            "field_bounds": entry["field_bounds"]
-        }
-    }
-    geojson["features"].append(feature)
+    print(f"Number of buildings near fields: {len(near_field_buildings)}")
 
-with open("buildings_near_fields.json", "w") as f:
-    json.dump(geojson, f)
 
-print(f"Number of buildings near fields: {len(near_field_buildings)}")
+if __name__ == "__main__":
+    # Guarded because the tile workers may start by importing this module
+    main()
@@ -6,18 +6,20 @@ import geopandas as gpd
 import matplotlib.pyplot as plt
 from shapely.geometry import box
 import pandas as pd
+from features import FeatureStore
 
 
-def get_osm_terrain_data(place_name, elevation_threshold=500):
+def get_osm_terrain_data(place_name, elevation_threshold=500, source=None):
     """
     Fetch OSM data for the specified area and filter mountainous regions.
     :param place_name: Name of the area to search (e.g., "Alps, Austria").
     :param elevation_threshold: Elevation threshold for mountainous regions (in meters).
+    :param source: Local .osm/.pbf extract to read instead of querying OSM.
     :return: GeoDataFrame containing mountainous areas.
     """
     print(f"Fetching terrain data for {place_name}...")
-    # Fetch OSM data
-    gdf = ox.features_from_place(place_name, tags={"natural": "peak"})
+    # Fetch OSM data, or read it from the local feature store after the first run
+    gdf = FeatureStore().load(place_name, {"natural": "peak"}, geometry_types=None, source=source)
 
     # Filter by elevation if available
     if "ele" in gdf.columns:
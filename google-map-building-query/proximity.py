@@ -0,0 +1,148 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import shapely
+
+# Geometries queried against the tree at once; bounds the size of the candidate arrays
+QUERY_CHUNK_SIZE = 100_000
+# Side of a square tile for `tiled_near_pairs`, in CRS units
+TILE_SIZE = 5_000
+
+
+def proximity_pairs(geometries, distance, chunk_size=QUERY_CHUNK_SIZE):
+    """
+    Find every unordered pair of geometries within a distance of each other.
+
+    All geometries are bulk-loaded into one STRtree and queried in chunks with the exact "dwithin"
+    predicate, so the candidate search and the distance test both run in GEOS over whole arrays.
+    Two geometries each buffered by `b` intersect exactly when they are within `2 * b` of each other,
+    so this answers the buffer-and-intersect question without building any buffer polygons.
+    :param geometries: Array-like of shapely geometries in a projected CRS.
+    :param distance: Maximum distance between two geometries, in CRS units.
+    :param chunk_size: Number of geometries queried against the tree at once.
+    :return: (n, 2) int array of positions (i, j) with i < j, sorted by i then j.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    tree = shapely.STRtree(geometries)
+    chunks = []
+    for start in range(0, len(geometries), chunk_size):
+        left, right = tree.query(geometries[start:start + chunk_size], predicate="dwithin", distance=distance)
+        left += start
+        keep = left < right  # Drops self matches and the mirrored copy of every pair
+        chunks.append(np.column_stack([left[keep], right[keep]]))
+    if not chunks:
+        return np.empty((0, 2), dtype=np.intp)
+    pairs = np.concatenate(chunks)
+    return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+
+def close_pairs(gdf, buffer):
+    """
+    Find the pairs of features whose geometries, each buffered by `buffer`, intersect.
+    :param gdf: GeoDataFrame in a projected CRS.
+    :param buffer: Buffer around each geometry, in CRS units (meters for UTM).
+    :return: DataFrame with the index labels of each pair in "first" and "second", one row per pair.
+    """
+    pairs = proximity_pairs(gdf.geometry.values, 2 * buffer)
+    index = gdf.index.to_flat_index()
+    return pd.DataFrame({"first": index.take(pairs[:, 0]), "second": index.take(pairs[:, 1])})
+
+
+def near_pairs(left, right, distance, chunk_size=QUERY_CHUNK_SIZE):
+    """
+    Find every pair of a left and a right geometry within a distance of each other.
+    :param left: Array-like of shapely geometries, e.g. buildings.
+    :param right: Array-like of shapely geometries in the same CRS, e.g. fields.
+    :param distance: Maximum distance, in CRS units.
+    :param chunk_size: Number of left geometries queried against the tree at once.
+    :return: (n, 2) int array of (left position, right position) and the (n,) distances of those pairs.
+    """
+    left = np.asarray(left, dtype=object)
+    right = np.asarray(right, dtype=object)
+    tree = shapely.STRtree(right)
+    chunks = []
+    for start in range(0, len(left), chunk_size):
+        left_positions, right_positions = tree.query(left[start:start + chunk_size], predicate="dwithin", distance=distance)
+        chunks.append(np.column_stack([left_positions + start, right_positions]))
+    pairs = np.concatenate(chunks) if chunks else np.empty((0, 2), dtype=np.intp)
+    return pairs, shapely.distance(left[pairs[:, 0]], right[pairs[:, 1]])
+
+
+def tiled_near_pairs(left, right, distance, tile_size=TILE_SIZE, workers=None):
+    """
+    `near_pairs` over a large region, split into square tiles processed on a process pool.
+
+    Each tile takes the left geometries whose bounding box touches it and the right geometries within
+    `distance` of it, so a pair is found in every tile containing a point of the left geometry within
+    `distance` of the right one, and always in at least one. Tile results are merged and duplicates
+    dropped. Positions refer to the full input arrays, never to a tile.
+    :param left: Array-like of shapely geometries in a projected CRS, e.g. buildings.
+    :param right: Array-like of shapely geometries in the same CRS, e.g. fields.
+    :param distance: Maximum distance, in CRS units; also the overlap margin of the tiles.
+    :param tile_size: Side of a tile, in CRS units.
+    :param workers: Number of worker processes; None uses every core and 1 runs in this process.
+    :return: DataFrame with "left" and "right" positions and their "distance", sorted by left then right.
+    """
+    left = np.asarray(left, dtype=object)
+    right = np.asarray(right, dtype=object)
+    tiles = _tiles(left, tile_size)
+    # (tile, geometry) memberships: left by bounding box, right by bounding box within the margin
+    left_tile, left_member = shapely.STRtree(left).query(tiles)
+    right_tile, right_member = shapely.STRtree(right).query(tiles, predicate="dwithin", distance=distance)
+    left_groups = _group(left_tile, left_member, len(tiles))
+    right_groups = _group(right_tile, right_member, len(tiles))
+    jobs = [(left_groups[t], right_groups[t]) for t in range(len(tiles)) if len(left_groups[t]) and len(right_groups[t])]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 1:
+        # Workers receive the full arrays once, when they start, and then only tile positions per job
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_set_tile_inputs, initargs=(left, right, distance)) as pool:
+            results = list(pool.map(_near_pairs_in_tile, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        _set_tile_inputs(left, right, distance)
+        results = [_near_pairs_in_tile(job) for job in jobs]
+        _set_tile_inputs(None, None, None)
+
+    if not results:
+        return pd.DataFrame({"left": np.empty(0, dtype=np.intp), "right": np.empty(0, dtype=np.intp), "distance": np.empty(0)})
+    pairs = np.concatenate([pairs for pairs, _ in results])
+    distances = np.concatenate([distances for _, distances in results])
+    # Pairs found in several overlapping tiles are kept once
+    pairs, first = np.unique(pairs, axis=0, return_index=True)
+    return pd.DataFrame({"left": pairs[:, 0], "right": pairs[:, 1], "distance": distances[first]})
+
+
+def _tiles(geometries, tile_size):
+    """Square tiles covering the bounding box of `geometries`."""
+    if not len(geometries):
+        return np.empty(0, dtype=object)
+    minx, miny, maxx, maxy = shapely.total_bounds(geometries)
+    xs = np.arange(minx, maxx + tile_size, tile_size)[:max(1, int(np.ceil((maxx - minx) / tile_size)))]
+    ys = np.arange(miny, maxy + tile_size, tile_size)[:max(1, int(np.ceil((maxy - miny) / tile_size)))]
+    x, y = np.meshgrid(xs, ys, indexing="ij")
+    return shapely.box(x.ravel(), y.ravel(), x.ravel() + tile_size, y.ravel() + tile_size)
+
+
+def _group(tile, member, tile_count):
+    """Split (tile, member) pairs into one array of members per tile."""
+    order = np.argsort(tile, kind="stable")
+    return np.split(member[order], np.searchsorted(tile[order], np.arange(1, tile_count)))
+
+
+# Inputs of the tile query in this process, set by `_set_tile_inputs`
+_tile_inputs = (None, None, None)
+
+
+def _set_tile_inputs(left, right, distance):
+    global _tile_inputs
+    _tile_inputs = (left, right, distance)
+
+
+def _near_pairs_in_tile(job):
+    left_positions, right_positions = job
+    left, right, distance = _tile_inputs
+    pairs, distances = near_pairs(left[left_positions], right[right_positions], distance)
+    # Back from positions within the tile to positions in the full arrays
+    return np.column_stack([left_positions[pairs[:, 0]], right_positions[pairs[:, 1]]]), distances
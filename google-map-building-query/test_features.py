@@ -0,0 +1,86 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+import features
+from features import FeatureStore
+
+TAGS = {"building": True}
+
+def fake_features(count=20):
+    """Features indexed like osmnx, in EPSG:4326, with polygons, a point and mixed-type attributes."""
+    x = 10.0 + np.arange(count) * 0.01
+    geometry = list(shapely.box(x, 60.0, x + 0.001, 60.001)) + [shapely.Point(10.0, 60.0)]
+    index = pd.MultiIndex.from_tuples([("way", i) for i in range(count)] + [("node", 0)], names=["element", "id"])
+    return gpd.GeoDataFrame({
+        "building": ["yes"] * (count + 1),
+        "levels": ["2", 3, None, ["a", "b"]] + [np.nan] * (count - 3),
+    }, geometry=geometry, index=index, crs="EPSG:4326")
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Calls of `fetch_features`, answered with `fake_features`."""
+    calls = []
+
+    def fetch(place_name, tags, source=None):
+        calls.append(source)
+        return fake_features()
+
+    monkeypatch.setattr(features, "fetch_features", fetch)
+    return calls
+
+def test_load_stores_and_reuses_filtered_reprojected_features(tmp_path, fetches):
+    store = FeatureStore(str(tmp_path))
+    first = store.load("Test, Norway", TAGS, crs=32633)
+    assert len(fetches) == 1
+    assert len(first) == 20  # The point is dropped
+    assert first.crs.to_epsg() == 32633
+    assert list(first.index.names) == ["element", "id"]
+    levels = first["levels"].tolist()
+    assert levels[:2] + levels[3:4] == ["2", "3", "['a', 'b']"]  # Numbers and lists stored as strings
+    assert pd.isna(levels[2])
+
+    second = store.load("Test, Norway", TAGS, crs=32633)
+    assert len(fetches) == 1
+    assert second.geometry.geom_equals_exact(first.geometry, 1e-6).all()
+
+    store.load("Test, Norway", TAGS, crs=32633, refresh=True)
+    assert len(fetches) == 2
+
+def test_columns_and_bbox_are_pushed_down(tmp_path, fetches):
+    store = FeatureStore(str(tmp_path))
+    everything = store.load("Test, Norway", TAGS, crs=32633)
+    minx, miny, maxx, maxy = everything.geometry.iloc[:5].total_bounds
+    subset = store.load("Test, Norway", TAGS, crs=32633, columns=["building"], bbox=(minx, miny, maxx, maxy))
+    assert list(subset.columns) == ["building", "geometry"]
+    assert subset.index.get_level_values("id").tolist() == [0, 1, 2, 3, 4]
+
+def test_datasets_are_keyed_by_source(tmp_path, fetches):
+    store = FeatureStore(str(tmp_path))
+    store.load("Test, Norway", TAGS)
+    store.load("Test, Norway", TAGS, source="extract.osm")
+    store.load("Test, Norway", TAGS, source="extract.pbf")
+    store.load("Test, Norway", TAGS, source="extract.osm")
+    store.load("Test, Norway", TAGS)
+    assert len(fetches) == 3
+    assert fetches[0] is None
+    assert fetches[1].endswith("extract.osm")
+    assert store.path("Test, Norway", TAGS) != store.path("Test, Norway", TAGS, source="extract.osm")
+    assert store.path("Test, Norway", TAGS, crs=32633) != store.path("Test, Norway", TAGS)
+    assert store.path("Test, Norway", TAGS, geometry_types=None) != store.path("Test, Norway", TAGS)
+
+def test_osm_extract_is_read_without_network(tmp_path):
+    pytest.importorskip("osmnx")
+    extract = tmp_path / "extract.osm"
+    extract.write_text(
+        '<?xml version="1.0" encoding="UTF-8"?><osm version="0.6">'
+        '<node id="1" lat="60.000" lon="10.000"/><node id="2" lat="60.000" lon="10.001"/>'
+        '<node id="3" lat="60.001" lon="10.001"/><node id="4" lat="60.001" lon="10.000"/>'
+        '<way id="10"><nd ref="1"/><nd ref="2"/><nd ref="3"/><nd ref="4"/><nd ref="1"/><tag k="building" v="yes"/></way>'
+        '</osm>'
+    )
+    gdf = FeatureStore(str(tmp_path / "store")).load("Extract", TAGS, crs=32633, source=str(extract))
+    assert gdf.index.tolist() == [("way", 10)]
+    assert gdf.geometry.iloc[0].area == pytest.approx(111 * 56, rel=0.05)
@@ -0,0 +1,77 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from proximity import close_pairs, near_pairs, proximity_pairs, tiled_near_pairs
+
+def random_boxes(count, extent, seed):
+    rng = np.random.default_rng(seed)
+    x, y = rng.uniform(0, extent, (2, count))
+    size = rng.uniform(5, 20, (2, count))
+    return shapely.box(x, y, x + size[0], y + size[1])
+
+def brute_force_pairs(geometries, distance):
+    """Pairs (i, j), i < j, whose geometries are within `distance`, by comparing every pair."""
+    i, j = np.triu_indices(len(geometries), k=1)
+    keep = shapely.distance(geometries[i], geometries[j]) <= distance
+    return np.column_stack([i[keep], j[keep]])
+
+@pytest.mark.parametrize("chunk_size", [7, 100_000])
+def test_proximity_pairs_match_brute_force(chunk_size):
+    geometries = random_boxes(400, 1000, seed=1)
+    pairs = proximity_pairs(geometries, 10, chunk_size=chunk_size)
+    np.testing.assert_array_equal(pairs, brute_force_pairs(geometries, 10))
+    assert len(pairs) > 0
+
+def test_proximity_pairs_match_buffer_and_intersect():
+    geometries = random_boxes(300, 800, seed=2)
+    buffered = shapely.buffer(geometries, 5)
+    i, j = np.triu_indices(len(geometries), k=1)
+    keep = shapely.intersects(buffered[i], buffered[j])
+    expected = {pair for pair in zip(i[keep], j[keep])}
+    assert {tuple(pair) for pair in proximity_pairs(geometries, 10)} == expected
+
+def test_proximity_pairs_of_nothing():
+    assert proximity_pairs([], 10).shape == (0, 2)
+    assert proximity_pairs(random_boxes(1, 10, seed=0), 10).shape == (0, 2)
+
+def test_close_pairs_returns_index_labels():
+    gdf = gpd.GeoDataFrame(
+        geometry=[shapely.box(0, 0, 1, 1), shapely.box(3, 0, 4, 1), shapely.box(100, 0, 101, 1)],
+        index=pd.MultiIndex.from_tuples([("way", 10), ("way", 20), ("relation", 30)], names=["element", "id"]),
+        crs=32633,
+    )
+    pairs = close_pairs(gdf, buffer=1)
+    assert pairs.to_dict("records") == [{"first": ("way", 10), "second": ("way", 20)}]
+    assert close_pairs(gdf, buffer=0.9).empty
+
+def brute_force_near(left, right, distance):
+    i, j = np.meshgrid(np.arange(len(left)), np.arange(len(right)), indexing="ij")
+    i, j = i.ravel(), j.ravel()
+    distances = shapely.distance(left[i], right[j])
+    keep = distances <= distance
+    return pd.DataFrame({"left": i[keep], "right": j[keep], "distance": distances[keep]})
+
+def test_near_pairs_match_brute_force():
+    left, right = random_boxes(200, 1000, seed=3), random_boxes(150, 1000, seed=4)
+    pairs, distances = near_pairs(left, right, 20, chunk_size=16)
+    found = pd.DataFrame({"left": pairs[:, 0], "right": pairs[:, 1], "distance": distances}).sort_values(["left", "right"], ignore_index=True)
+    pd.testing.assert_frame_equal(found, brute_force_near(left, right, 20), check_dtype=False)
+
+@pytest.mark.parametrize("tile_size, workers", [(10_000, 1), (100, 1), (37, 1), (100, 2)])
+def test_tiled_near_pairs_match_brute_force(tile_size, workers):
+    # Large geometries crossing many tiles, and pairs straddling tile edges
+    left = np.concatenate([random_boxes(300, 1000, seed=5), [shapely.box(0, 0, 900, 30), shapely.LineString([(0, 1000), (1000, 0)])]])
+    right = random_boxes(200, 1000, seed=6)
+    found = tiled_near_pairs(left, right, 15, tile_size=tile_size, workers=workers)
+    pd.testing.assert_frame_equal(found, brute_force_near(left, right, 15), check_dtype=False)
+
+def test_tiled_near_pairs_of_nothing():
+    boxes = random_boxes(5, 100, seed=7)
+    assert tiled_near_pairs([], boxes, 10).empty
+    assert tiled_near_pairs(boxes, [], 10).empty
+    far = tiled_near_pairs(boxes, shapely.transform(boxes, lambda coords: coords + 10_000), 10)
+    assert far.empty
+    assert list(far.columns) == ["left", "right", "distance"]
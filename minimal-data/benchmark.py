@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import time
+import timeit
+import typing
+import numpy as np
+from client import AsyncPipelinedClient, PipelinedClient
+from util import ALPHABET, decode_text, encode_text, frame, pack_text, unpack_text
+
+HOST = '127.0.0.1'
+PORT = 5300
+SIZES = [8, 64, 512, 4096]  # Message lengths in characters
+CONCURRENCY = [1, 16, 256]
+MESSAGES = 5000  # Requests per load-test run
+CODEC_SIZES = [8, 64, 512, 4096, 32768]
+SERVER_START_TIMEOUT = 10.0
+
+def random_text(length: int, rng: random.Random) -> str:
+    """A message of `length` characters drawn from the protocol alphabet, words separated by spaces."""
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+def start_server(mode: str, host: str, port: int, workers: int) -> subprocess.Popen:
+    """Start `server.py` in a child process and wait until it answers requests."""
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server.py'),
+               '--mode', mode, '--host', host, '--port', str(port)]
+    if mode == 'reuseport':
+        command += ['--workers', str(workers)]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    with PipelinedClient(host, port, timeout=0.1, retries=0) as client:
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited with code {process.returncode}")
+            try:
+                client.request("ping")
+                return process
+            except (TimeoutError, ConnectionRefusedError):
+                time.sleep(0.05)  # Not listening yet
+    stop_server(process)
+    raise RuntimeError("Server did not start in time")
+
+def stop_server(process: subprocess.Popen):
+    # SIGINT rather than SIGTERM, so the reuseport server terminates its worker processes too
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def percentiles(latencies: typing.List[float]) -> typing.Dict[str, typing.Optional[float]]:
+    """p50/p99/p999 of round-trip times in milliseconds."""
+    if not latencies:
+        return {'p50_ms': None, 'p99_ms': None, 'p999_ms': None}
+    p50, p99, p999 = np.percentile(np.array(latencies) * 1000, [50, 99, 99.9])
+    return {'p50_ms': float(p50), 'p99_ms': float(p99), 'p999_ms': float(p999)}
+
+async def load_test(host: str, port: int, size: int, concurrency: int, messages: int, timeout: float, retries: int, seed: int = 0) -> dict:
+    """
+    Drive the server with `concurrency` closed-loop senders sharing one pipelined client.
+
+    Each sender waits for the response to its previous message before sending the next, so
+    `concurrency` is the number of requests in flight. Latency is measured per request and includes any
+    retransmits; requests that exhaust their retries count as lost.
+    """
+    rng = random.Random(seed)
+    texts = [random_text(size, rng) for _ in range(min(messages, 64))]
+    request_bytes = [len(frame(0, pack_text(text))) for text in texts]
+    response_bytes = [len(frame(0, pack_text(text.split(' ', 1)[-1]))) for text in texts]
+
+    latencies: typing.List[float] = []
+    lost = 0
+    transferred = 0
+    next_message = 0
+
+    async def sender(client: AsyncPipelinedClient):
+        nonlocal lost, transferred, next_message
+        while next_message < messages:
+            i = next_message % len(texts)
+            next_message += 1
+            start = time.perf_counter()
+            try:
+                await client.request(texts[i])
+            except TimeoutError:
+                lost += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            transferred += request_bytes[i] + response_bytes[i]
+
+    async with AsyncPipelinedClient(host, port, timeout=timeout, retries=retries, max_in_flight=concurrency) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[sender(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+        retransmits = client.retransmits
+
+    return {
+        'size': size,
+        'concurrency': concurrency,
+        'messages': messages,
+        'seconds': elapsed,
+        'messages_per_second': len(latencies) / elapsed,
+        'bytes_per_second': transferred / elapsed,
+        **percentiles(latencies),
+        'loss_rate': lost / messages,
+        'retransmits': retransmits,
+    }
+
+def _time_call(function: typing.Callable, argument, min_seconds: float) -> float:
+    """Seconds per call of `function(argument)`, repeated until a run takes at least `min_seconds`."""
+    timer = timeit.Timer(lambda: function(argument))
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_seconds:
+            break
+        number *= 10 if elapsed < min_seconds / 10 else 2
+    # Best of three runs, the least disturbed by the rest of the system
+    return min([elapsed] + timer.repeat(2, number)) / number
+
+def codec_benchmark(sizes: typing.List[int], min_seconds: float = 0.2, seed: int = 0) -> typing.List[dict]:
+    """Time `encode_text`/`decode_text` and the wire format `pack_text`/`unpack_text` across message sizes."""
+    rng = random.Random(seed)
+    results = []
+    for size in sizes:
+        text = random_text(size, rng)
+        calls = [
+            ('encode_text', encode_text, text),
+            ('decode_text', decode_text, encode_text(text)),
+            ('pack_text', pack_text, text),
+            ('unpack_text', unpack_text, pack_text(text)),
+        ]
+        for name, function, argument in calls:
+            seconds = _time_call(function, argument, min_seconds)
+            results.append({
+                'function': name,
+                'size': size,
+                'us_per_call': seconds * 1e6,
+                'chars_per_second': size / seconds,
+            })
+    return results
+
+def run(args: argparse.Namespace) -> dict:
+    results: dict = {
+        'python': sys.version.split()[0],
+        'cpus': os.cpu_count(),
+        'server_mode': args.mode if args.port is None else None,
+    }
+    if not args.skip_codec:
+        results['codec'] = codec_benchmark(args.codec_sizes, args.min_seconds)
+
+    if not args.skip_load:
+        process = None
+        port = args.port
+        if port is None:
+            port = PORT
+            process = start_server(args.mode, args.host, port, args.workers)
+        try:
+            results['load'] = [
+                asyncio.run(load_test(args.host, port, size, concurrency, args.messages, args.timeout, args.retries))
+                for size in args.sizes
+                for concurrency in args.concurrency
+            ]
+        finally:
+            if process is not None:
+                stop_server(process)
+    return results
+
+def compare(results: dict, baseline: dict) -> typing.List[str]:
+    """Lines describing how `results` differ from `baseline`, matched by function/size and size/concurrency."""
+    lines = []
+    old_codec = {(r['function'], r['size']): r for r in baseline.get('codec', [])}
+    for r in results.get('codec', []):
+        old = old_codec.get((r['function'], r['size']))
+        if old:
+            lines.append(f"{r['function']:<12} {r['size']:>6} chars  {old['us_per_call']:10.2f} -> {r['us_per_call']:10.2f} us  "
+                         f"({old['us_per_call'] / r['us_per_call']:.2f}x)")
+    old_load = {(r['size'], r['concurrency']): r for r in baseline.get('load', [])}
+    for r in results.get('load', []):
+        old = old_load.get((r['size'], r['concurrency']))
+        if old:
+            lines.append(f"load {r['size']:>6} chars x{r['concurrency']:<4}  {old['messages_per_second']:10.0f} -> "
+                         f"{r['messages_per_second']:10.0f} msg/s  p99 {old['p99_ms']} -> {r['p99_ms']} ms  "
+                         f"loss {old['loss_rate']:.4f} -> {r['loss_rate']:.4f}")
+    return lines
+
+def print_results(results: dict):
+    for r in results.get('codec', []):
+        print(f"{r['function']:<12} {r['size']:>6} chars  {r['us_per_call']:10.2f} us  {r['chars_per_second'] / 1e6:8.2f} Mchar/s")
+    for r in results.get('load', []):
+        print(f"load {r['size']:>6} chars x{r['concurrency']:<4}  {r['messages_per_second']:10.0f} msg/s  "
+              f"{r['bytes_per_second'] / 1e6:7.2f} MB/s  p50 {r['p50_ms'] or 0:7.3f}  p99 {r['p99_ms'] or 0:7.3f}  "
+              f"p999 {r['p999_ms'] or 0:7.3f} ms  loss {r['loss_rate']:.4f}  retransmits {r['retransmits']}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the minimal-data codec and UDP server")
+    parser.add_argument('--mode', choices=['simple', 'asyncio', 'reuseport'], default='reuseport',
+                        help="server mode to start (default: reuseport)")
+    parser.add_argument('--workers', type=int, default=0, help="reuseport worker processes (default: one per CPU)")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, help="benchmark an already running server instead of starting one")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="message lengths in characters")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=CONCURRENCY, help="requests in flight")
+    parser.add_argument('--messages', type=int, default=MESSAGES, help="requests per load-test run")
+    parser.add_argument('--timeout', type=float, default=0.5, help="seconds before a request is retransmitted")
+    parser.add_argument('--retries', type=int, default=3)
+    parser.add_argument('--codec-sizes', type=int, nargs='+', default=CODEC_SIZES)
+    parser.add_argument('--min-seconds', type=float, default=0.2, help="minimum time per codec measurement")
+    parser.add_argument('--skip-codec', action='store_true')
+    parser.add_argument('--skip-load', action='store_true')
+    parser.add_argument('--json', help="write the results to this file ('-' for stdout)")
+    parser.add_argument('--compare', help="print the change from a previous --json file")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json == '-':
+        print(json.dumps(results, indent=2))
+    else:
+        print_results(results)
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            for line in compare(results, json.load(f)):
+                print(line)
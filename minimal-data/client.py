@@ -1,5 +1,215 @@
+import asyncio
+import select
 import socket
-from util import encode_text, encoded_to_bytes, decode_text, bytes_to_encoded
+import time
+import typing
+from util import encode_text, encoded_to_bytes, decode_text, bytes_to_encoded, frame, pack_text, unframe, unpack_text
+
+HOST = 'localhost'
+PORT = 5000
+MAX_DATAGRAM = 65507
+TIMEOUT = 0.5  # Seconds to wait for a response before retransmitting
+RETRIES = 3  # Retransmits before a request is given up
+MAX_IN_FLIGHT = 1024
+RECEIVE_BUFFER = 4 << 20  # Room for a full window of responses while the client is busy
+
+class PipelinedClient:
+    """
+    Reusable UDP client that keeps many requests in flight on one socket.
+
+    Every request is tagged with a sequence ID that the server echoes back, so responses are matched
+    to requests in whatever order they arrive. Requests without a response after `timeout` seconds are
+    retransmitted up to `retries` times; duplicate responses to retransmitted requests are ignored.
+    """
+    def __init__(self, host: str = HOST, port: int = PORT, timeout: float = TIMEOUT, retries: int = RETRIES, max_in_flight: int = MAX_IN_FLIGHT):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max_in_flight
+
+        self.sent = 0
+        self.retransmits = 0
+        self.timeouts = 0
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        self._socket.connect((host, port))
+        self._socket.setblocking(False)
+        self._buffer = bytearray(MAX_DATAGRAM)
+        self._sequence = 0
+
+    def request(self, text: str) -> str:
+        """Send one message and wait for its response. Raises TimeoutError if every attempt is lost."""
+        response, = self.request_many([text])
+        if response is None:
+            raise TimeoutError("No response from the server")
+        return response
+
+    def request_many(self, texts: typing.Iterable[str]) -> typing.List[typing.Optional[str]]:
+        """Send all messages pipelined, at most `max_in_flight` at a time. Lost messages come back as None."""
+        payloads = [pack_text(text) for text in texts]
+        responses: typing.List[typing.Optional[str]] = [None] * len(payloads)
+        pending: typing.Dict[int, typing.List] = {}  # Sequence ID -> [index, datagram, deadline, attempts]
+        next_index = 0
+        while next_index < len(payloads) or pending:
+            # Top up the window
+            while next_index < len(payloads) and len(pending) < self.max_in_flight:
+                datagram = frame(self._next_sequence(), payloads[next_index])
+                if not self._send(datagram):
+                    break
+                pending[self._sequence] = [next_index, datagram, time.monotonic() + self.timeout, 0]
+                next_index += 1
+
+            # Wait for responses until the earliest deadline
+            wait = min(entry[2] for entry in pending.values()) - time.monotonic() if pending else 0
+            if select.select([self._socket], [], [], max(wait, 0))[0]:
+                self._receive(pending, responses)
+
+            now = time.monotonic()
+            for sequence, entry in list(pending.items()):
+                if entry[2] > now:
+                    continue
+                if entry[3] >= self.retries:
+                    del pending[sequence]
+                    self.timeouts += 1
+                elif self._send(entry[1]):
+                    entry[2] = now + self.timeout
+                    entry[3] += 1
+                    self.retransmits += 1
+        return responses
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self) -> 'PipelinedClient':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_sequence(self) -> int:
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+        return self._sequence
+
+    def _send(self, datagram: bytes) -> bool:
+        try:
+            self._socket.send(datagram)
+        except BlockingIOError:
+            return False  # Send buffer full; try again after reading some responses
+        except ConnectionRefusedError:
+            pass  # ICMP port unreachable from an earlier send; counts as lost and times out like any other
+        self.sent += 1
+        return True
+
+    def _receive(self, pending: typing.Dict[int, typing.List], responses: typing.List[typing.Optional[str]]):
+        """Read every response currently queued on the socket."""
+        while True:
+            try:
+                size = self._socket.recv_into(self._buffer)
+            except (BlockingIOError, ConnectionRefusedError):
+                return
+            try:
+                sequence, payload = unframe(memoryview(self._buffer)[:size])
+                entry = pending.pop(sequence, None)
+                if entry is not None:
+                    responses[entry[0]] = unpack_text(payload)
+            except ValueError:
+                continue  # Malformed datagram
+
+class _ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, client: 'AsyncPipelinedClient'):
+        self.client = client
+
+    def datagram_received(self, data: bytes, addr):
+        self.client._response_received(data)
+
+    def error_received(self, exc: Exception):
+        pass  # e.g. ICMP port unreachable; the request times out and is retransmitted
+
+class AsyncPipelinedClient:
+    """asyncio version of `PipelinedClient`: every `request` is awaitable and any number may run concurrently."""
+    def __init__(self, host: str = HOST, port: int = PORT, timeout: float = TIMEOUT, retries: int = RETRIES, max_in_flight: int = MAX_IN_FLIGHT):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.max_in_flight = max_in_flight
+
+        self.sent = 0
+        self.retransmits = 0
+        self.timeouts = 0
+
+        self._transport = None
+        self._pending: typing.Dict[int, asyncio.Future] = {}
+        self._timers: typing.Dict[int, asyncio.TimerHandle] = {}
+        self._sequence = 0
+        self._window: typing.Optional[asyncio.Semaphore] = None
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: _ClientProtocol(self), remote_addr=(self.host, self.port))
+        self._transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        self._window = asyncio.Semaphore(self.max_in_flight)
+
+    async def request(self, text: str) -> str:
+        """Send a message and wait for its response, retransmitting on timeout. Raises TimeoutError if all attempts are lost."""
+        async with self._window:
+            self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+            sequence = self._sequence
+            future = asyncio.get_running_loop().create_future()
+            self._pending[sequence] = future
+            self._attempt(sequence, frame(sequence, pack_text(text)), 0)
+            try:
+                return await future
+            finally:
+                self._pending.pop(sequence, None)
+                timer = self._timers.pop(sequence, None)
+                if timer is not None:
+                    timer.cancel()
+
+    async def request_many(self, texts: typing.Iterable[str]) -> typing.List[typing.Optional[str]]:
+        """Send all messages concurrently. Lost messages come back as None; any other error is raised."""
+        results = await asyncio.gather(*[self.request(text) for text in texts], return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, TimeoutError):
+                raise result
+        return [None if isinstance(result, TimeoutError) else result for result in results]
+
+    async def close(self):
+        if self._transport is not None:
+            self._transport.close()
+
+    async def __aenter__(self) -> 'AsyncPipelinedClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _attempt(self, sequence: int, datagram: bytes, attempt: int):
+        """Send a request and schedule its retransmission, using one timer per request rather than a task."""
+        self._transport.sendto(datagram)
+        self.sent += 1
+        self._timers[sequence] = asyncio.get_running_loop().call_later(self.timeout, self._expired, sequence, datagram, attempt)
+
+    def _expired(self, sequence: int, datagram: bytes, attempt: int):
+        future = self._pending.get(sequence)
+        if future is None or future.done():
+            return
+        if attempt >= self.retries:
+            self.timeouts += 1
+            future.set_exception(TimeoutError("No response from the server"))
+        else:
+            self.retransmits += 1
+            self._attempt(sequence, datagram, attempt + 1)
+
+    def _response_received(self, data: bytes):
+        try:
+            sequence, payload = unframe(data)
+            future = self._pending.get(sequence)
+            if future is not None and not future.done():
+                future.set_result(unpack_text(payload))
+        except ValueError:
+            pass  # Malformed datagram
 
 def send_udp_data():
     # Create a UDP socket
@@ -8,19 +218,20 @@ def send_udp_data():
     # Encode "Hello World" into binary
     text = "Hello World"
     encoded = encode_text(text)
-    data = encoded_to_bytes(encoded)
+    data = frame(0, encoded_to_bytes(encoded))
     print(f"Original text: {text}")
     print(f"Encoded data: {data}")
 
     # Send data to the server
-    client_socket.sendto(data, ('localhost', 5000))
+    client_socket.sendto(data, (HOST, PORT))
 
-    # Receive response (max 1024 bytes)
-    response, _ = client_socket.recvfrom(1024)
+    # Receive response
+    response, _ = client_socket.recvfrom(MAX_DATAGRAM)
     print(f"Received raw response: {response}")
 
-    # Convert bytes to encoded list
-    encoded_response = bytes_to_encoded(response)
+    # Strip the sequence ID and convert the payload to an encoded list
+    _, payload = unframe(response)
+    encoded_response = bytes_to_encoded(payload)
 
     # Decode the response into text
     response_text = decode_text(encoded_response)
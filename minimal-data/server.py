@@ -1,19 +1,167 @@
+import argparse
+import asyncio
+import multiprocessing
+import select
 import socket
-from util import decode_text, encoded_to_bytes, bytes_to_encoded, encode_text
+import time
+from util import decode_text, encoded_to_bytes, bytes_to_encoded, encode_text, frame, pack_text, unframe, unpack_text
 
-def start_udp_server():
+HOST = '0.0.0.0'
+PORT = 5000
+MAX_DATAGRAM = 65507  # Largest UDP payload over IPv4
+BATCH_SIZE = 64  # Datagrams drained from a socket before the responses are sent
+RECEIVE_BUFFER = 4 << 20  # Kernel receive buffer, so bursts queue up instead of being dropped
+
+def respond(data: bytes) -> bytes:
+    """Decode a request, remove its first word and encode the rest as the response, under the same sequence ID."""
+    sequence, payload = unframe(data)
+    text = unpack_text(payload)
+    return frame(sequence, pack_text(text.split(' ', 1)[-1]))
+
+class RateLimitedLog:
+    """Prints at most `per_second` lines per second and reports how many were suppressed. 0 disables logging."""
+    def __init__(self, per_second: float = 0):
+        self.per_second = per_second
+        self.suppressed = 0
+        self._window = 0.0
+        self._count = 0
+
+    def allow(self) -> bool:
+        """Whether a line may be printed now. Callers check this before formatting anything."""
+        if not self.per_second:
+            return False
+        now = time.monotonic()
+        if now - self._window >= 1.0:
+            if self.suppressed:
+                print(f"({self.suppressed} log lines suppressed)")
+            self._window, self._count, self.suppressed = now, 0, 0
+        if self._count < self.per_second:
+            self._count += 1
+            return True
+        self.suppressed += 1
+        return False
+
+class UDPServerProtocol(asyncio.DatagramProtocol):
+    """Answers every datagram from the event loop's read callback, without a per-packet task."""
+    def __init__(self, log: RateLimitedLog):
+        self.log = log
+        self.transport = None
+        self.received = 0
+        self.errors = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data: bytes, addr):
+        self.received += 1
+        try:
+            response = respond(data)
+        except ValueError as e:
+            self.errors += 1
+            if self.log.allow():
+                print(f"Dropped malformed datagram from {addr}: {e}")
+            return
+        if self.log.allow():
+            print(f"{addr}: {len(data)} bytes in, {len(response)} bytes out")
+        self.transport.sendto(response, addr)
+
+async def serve_asyncio(host: str = HOST, port: int = PORT, log_rate: float = 0):
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(lambda: UDPServerProtocol(RateLimitedLog(log_rate)), local_addr=(host, port))
+    transport.get_extra_info('socket').setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    print(f"UDP server (asyncio) listening on port {port}...")
+    try:
+        await asyncio.Future()  # Serve until cancelled
+    finally:
+        transport.close()
+
+def reuseport_socket(host: str, port: int) -> socket.socket:
+    """A non-blocking UDP socket bound with SO_REUSEPORT, so several processes can share the port."""
+    if not hasattr(socket, 'SO_REUSEPORT'):
+        raise OSError("SO_REUSEPORT is not supported on this platform")
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+    sock.bind((host, port))
+    sock.setblocking(False)
+    return sock
+
+def serve_batched(sock: socket.socket, log_rate: float = 0, batch_size: int = BATCH_SIZE):
+    """
+    Serve datagrams from a non-blocking socket in batches.
+
+    Each batch drains up to `batch_size` datagrams into preallocated buffers with `recvfrom_into`, then
+    answers them all, so the only per-datagram work is one receive, one decode and one send. The socket
+    is only polled once it has been drained.
+    """
+    log = RateLimitedLog(log_rate)
+    buffers = [bytearray(MAX_DATAGRAM) for _ in range(batch_size)]
+    views = [memoryview(buffer) for buffer in buffers]
+    received = [(0, None)] * batch_size
+    while True:
+        count = 0
+        try:
+            while count < batch_size:
+                received[count] = sock.recvfrom_into(buffers[count])
+                count += 1
+        except BlockingIOError:
+            pass
+
+        for i in range(count):
+            size, addr = received[i]
+            try:
+                response = respond(views[i][:size])
+            except ValueError as e:
+                if log.allow():
+                    print(f"Dropped malformed datagram from {addr}: {e}")
+                continue
+            if log.allow():
+                print(f"{addr}: {size} bytes in, {len(response)} bytes out")
+            try:
+                sock.sendto(response, addr)
+            except BlockingIOError:
+                pass  # Send buffer full; UDP may drop, so does the server
+
+        if count < batch_size:
+            select.select([sock], [], [])
+
+def _reuseport_worker(host: str, port: int, log_rate: float, batch_size: int):
+    try:
+        serve_batched(reuseport_socket(host, port), log_rate, batch_size)
+    except KeyboardInterrupt:
+        pass
+
+def start_reuseport_server(host: str = HOST, port: int = PORT, workers: int = 0, log_rate: float = 0, batch_size: int = BATCH_SIZE):
+    """Run `workers` processes (default: one per CPU) that each serve their own SO_REUSEPORT socket."""
+    workers = workers or multiprocessing.cpu_count()
+    processes = [
+        multiprocessing.Process(target=_reuseport_worker, args=(host, port, log_rate, batch_size), daemon=True)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    print(f"UDP server ({workers} SO_REUSEPORT workers) listening on port {port}...")
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+def start_udp_server(host: str = HOST, port: int = PORT):
     # Create a UDP socket
     server_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    server_socket.bind(('0.0.0.0', 5000))
-    print("UDP server listening on port 5000...")
+    server_socket.bind((host, port))
+    print(f"UDP server listening on port {port}...")
 
     while True:
-        # Receive data (max 1024 bytes)
-        data, addr = server_socket.recvfrom(1024)
+        # Receive data
+        data, addr = server_socket.recvfrom(MAX_DATAGRAM)
         print(f"Received raw data from {addr}: {data}")
 
-        # Convert bytes to encoded list
-        encoded = bytes_to_encoded(data)
+        # Split off the sequence ID and convert the payload to an encoded list
+        sequence, payload = unframe(data)
+        encoded = bytes_to_encoded(payload)
 
         # Decode the encoded list into text
         text = decode_text(encoded)
@@ -24,10 +172,32 @@ def start_udp_server():
         print(f"Response text: {response_text}")
 
         # Encode the response text into binary
-        response_data = encoded_to_bytes(encode_text(response_text))
+        response_data = frame(sequence, encoded_to_bytes(encode_text(response_text)))
 
         # Send response back
         server_socket.sendto(response_data, addr)
 
 if __name__ == '__main__':
-    start_udp_server()
+    parser = argparse.ArgumentParser(description="minimal-data UDP server")
+    parser.add_argument('--mode', choices=['simple', 'asyncio', 'reuseport'], default='simple',
+                        help="simple: one datagram at a time with verbose output (default); "
+                             "asyncio: DatagramProtocol on an event loop; reuseport: batched SO_REUSEPORT worker processes")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int, default=0, help="reuseport worker processes (default: one per CPU)")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--log-rate', type=float, default=0, help="log at most this many lines per second (default: off)")
+    args = parser.parse_args()
+
+    if args.mode == 'asyncio':
+        try:
+            asyncio.run(serve_asyncio(args.host, args.port, args.log_rate))
+        except KeyboardInterrupt:
+            pass
+    elif args.mode == 'reuseport':
+        start_reuseport_server(args.host, args.port, args.workers, args.log_rate, args.batch_size)
+    else:
+        try:
+            start_udp_server(args.host, args.port)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,117 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from client import AsyncPipelinedClient, PipelinedClient
+from server import respond
+from util import unframe
+
+TEXTS = [f"message {word}" for word in ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet']]
+EXPECTED = [text.split(' ', 1)[-1] for text in TEXTS]
+
+class LoopbackServer:
+    """
+    UDP server on a free localhost port that answers through `respond`.
+
+    Responses are held back and sent in reverse order `reorder` at a time, so they arrive out of order.
+    With `drop_first` the first copy of every sequence ID is ignored, so only retransmits are answered.
+    With `silent` nothing is answered at all.
+    """
+    def __init__(self, reorder: int = 1, drop_first: bool = False, silent: bool = False):
+        self.reorder = reorder
+        self.drop_first = drop_first
+        self.silent = silent
+        self.received = 0
+        self._seen = set()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.settimeout(0.02)
+        self.port = self._socket.getsockname()[1]
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        held = []
+        while not self._stopped:
+            try:
+                data, addr = self._socket.recvfrom(65507)
+            except socket.timeout:
+                for response, addr in reversed(held):
+                    self._socket.sendto(response, addr)
+                held = []
+                continue
+            self.received += 1
+            sequence, _ = unframe(data)
+            if self.silent or (self.drop_first and sequence not in self._seen):
+                self._seen.add(sequence)
+                continue
+            held.append((respond(data), addr))
+            if len(held) >= self.reorder:
+                for response, addr in reversed(held):
+                    self._socket.sendto(response, addr)
+                held = []
+
+    def close(self):
+        self._stopped = True
+        self._thread.join()
+        self._socket.close()
+
+@pytest.fixture
+def server(request):
+    server = LoopbackServer(**getattr(request, 'param', {}))
+    yield server
+    server.close()
+
+@pytest.mark.parametrize('server', [{'reorder': 4}], indirect=True)
+def test_out_of_order_responses_are_matched_by_sequence(server):
+    with PipelinedClient('127.0.0.1', server.port, timeout=1.0) as client:
+        assert client.request_many(TEXTS) == EXPECTED
+        assert client.retransmits == 0
+
+@pytest.mark.parametrize('server', [{'drop_first': True}], indirect=True)
+def test_lost_requests_are_retransmitted(server):
+    with PipelinedClient('127.0.0.1', server.port, timeout=0.05, retries=2) as client:
+        assert client.request_many(TEXTS) == EXPECTED
+        assert client.retransmits == len(TEXTS)
+        assert client.timeouts == 0
+
+@pytest.mark.parametrize('server', [{'silent': True}], indirect=True)
+def test_unanswered_requests_time_out(server):
+    with PipelinedClient('127.0.0.1', server.port, timeout=0.02, retries=1) as client:
+        assert client.request_many(TEXTS[:3]) == [None] * 3
+        assert client.timeouts == 3
+        with pytest.raises(TimeoutError):
+            client.request(TEXTS[0])
+    assert server.received == 8
+
+@pytest.mark.parametrize('server', [{'reorder': 4, 'drop_first': True}], indirect=True)
+def test_async_client_matches_and_retransmits(server):
+    async def run():
+        async with AsyncPipelinedClient('127.0.0.1', server.port, timeout=0.05, retries=2) as client:
+            return await client.request_many(TEXTS), client.retransmits
+
+    responses, retransmits = asyncio.run(run())
+    assert responses == EXPECTED
+    assert retransmits == len(TEXTS)
+
+@pytest.mark.parametrize('server', [{'silent': True}], indirect=True)
+def test_async_client_returns_none_only_for_timeouts(server):
+    async def run(texts):
+        async with AsyncPipelinedClient('127.0.0.1', server.port, timeout=0.02, retries=0) as client:
+            return await client.request_many(texts)
+
+    assert asyncio.run(run(TEXTS[:3])) == [None] * 3
+    with pytest.raises(AttributeError):
+        asyncio.run(run([TEXTS[0], None]))  # Not a string; must be raised, not returned as a result
+
+def test_closed_port_loses_requests_without_raising():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    # Every send after the first ICMP port unreachable is refused by the socket
+    with PipelinedClient('127.0.0.1', port, timeout=0.02, retries=2) as client:
+        assert client.request_many(['a b', 'c d', 'e f']) == [None, None, None]
+        assert client.timeouts == 3
@@ -0,0 +1,74 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from server import respond, reuseport_socket, serve_asyncio, serve_batched, start_udp_server
+from util import frame, pack_text, unframe, unpack_text
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+SERVERS = {
+    'simple': lambda port: start_udp_server('127.0.0.1', port),
+    'asyncio': lambda port: asyncio.run(serve_asyncio('127.0.0.1', port)),
+    'reuseport': lambda port: serve_batched(reuseport_socket('127.0.0.1', port)),
+}
+
+@pytest.fixture(params=sorted(SERVERS))
+def server(request):
+    """Port of a server of each mode, running on a daemon thread for the rest of the session."""
+    port = free_port()
+    threading.Thread(target=SERVERS[request.param], args=(port,), daemon=True).start()
+    client = connect(port)
+    deadline = time.monotonic() + 5
+    while True:
+        try:
+            client.send(frame(0, pack_text('ping')))
+            client.recv(65507)
+            break
+        except (socket.timeout, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise
+    client.close()
+    return request.param, port
+
+def connect(port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.settimeout(0.2)
+    sock.connect(('127.0.0.1', port))
+    return sock
+
+def test_respond_keeps_sequence_and_drops_first_word():
+    sequence, payload = unframe(respond(frame(0xDEADBEEF, pack_text('hello big world'))))
+    assert sequence == 0xDEADBEEF
+    assert unpack_text(payload) == 'big world'
+    with pytest.raises(ValueError):
+        respond(b'\x00\x01')
+
+def test_responses_echo_sequence_ids(server):
+    _, port = server
+    client = connect(port)
+    texts = {sequence: f"word number {'x' * sequence}" for sequence in range(1, 21)}
+    for sequence, text in texts.items():
+        client.send(frame(sequence, pack_text(text)))
+    responses = dict(unframe(client.recv(65507)) for _ in texts)
+    client.close()
+    assert {sequence: unpack_text(payload) for sequence, payload in responses.items()} == {
+        sequence: text.split(' ', 1)[-1] for sequence, text in texts.items()
+    }
+
+def test_malformed_datagrams_are_dropped(server):
+    mode, port = server
+    if mode == 'simple':
+        pytest.skip("the simple server handles one well-formed datagram at a time")
+    client = connect(port)
+    client.send(b'\x00')
+    client.send(frame(7, b'\x80'))
+    client.send(frame(8, pack_text('still serving')))
+    assert unframe(client.recv(65507)) == (8, pack_text('serving'))
+    client.close()
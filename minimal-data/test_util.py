@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from util import ALPHABET, NUMPY_MIN_SYMBOLS, bytes_to_encoded, decode_text, encode_text, encoded_to_bytes, frame, pack_symbols, pack_text, unframe, unpack_symbols, unpack_text
+
+def random_text(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+@pytest.mark.parametrize('length', [0, 1, 7, 8, 9, NUMPY_MIN_SYMBOLS - 1, NUMPY_MIN_SYMBOLS, 127, 128, 1000, 16383, 16384, 70000])
+def test_round_trip(length):
+    text = random_text(length, length)
+    packed = pack_text(text)
+    assert unpack_text(packed) == text
+    assert decode_text(bytes_to_encoded(encoded_to_bytes(encode_text(text)))) == text
+
+@pytest.mark.parametrize('length, header', [(0, 1), (127, 1), (128, 2), (16383, 2), (16384, 3)])
+def test_packed_size(length, header):
+    assert len(pack_text('a' * length)) == header + -(-length * 5 // 8)
+
+def test_numpy_and_integer_paths_agree():
+    symbols = bytes(random.Random(1).randrange(32) for _ in range(NUMPY_MIN_SYMBOLS * 3))
+    for count in range(NUMPY_MIN_SYMBOLS - 8, NUMPY_MIN_SYMBOLS + 9):
+        packed = pack_symbols(symbols[:count])
+        assert unpack_symbols(packed) == symbols[:count]
+    # The same prefix packs to the same bits on both sides of the threshold
+    short, long = pack_symbols(symbols[:NUMPY_MIN_SYMBOLS - 1]), pack_symbols(symbols[:NUMPY_MIN_SYMBOLS])
+    assert long[1:len(short) - 1] == short[1:-1]
+
+def test_characters_outside_the_alphabet_are_dropped():
+    assert unpack_text(pack_text("Hello, World! 123 ünïcode")) == "hello world  ncode"
+
+@pytest.mark.parametrize('data', [
+    b'',  # No length header
+    b'\x80',  # Header continues past the end
+    b'\xff' * 11,  # Header longer than any valid length
+    b'\x0a\x00\x00',  # 10 symbols need 7 bytes
+    pack_text('hello') + b'\x00',  # Trailing byte
+    pack_text('x' * 200)[:-1],  # Truncated NumPy-path payload
+])
+def test_malformed_payloads_raise(data):
+    with pytest.raises(ValueError):
+        unpack_text(data)
+
+def test_symbols_outside_the_alphabet_raise():
+    with pytest.raises(ValueError):
+        unpack_text(pack_symbols(bytes([len(ALPHABET)])))
+    with pytest.raises(ValueError):
+        pack_symbols(bytes([32]))
+
+def test_frame_round_trip():
+    payload = pack_text('hello world')
+    for sequence in [0, 1, 0xFFFFFFFF]:
+        assert unframe(frame(sequence, payload)) == (sequence, payload)
+    with pytest.raises(ValueError):
+        unframe(b'\x00\x00\x01')
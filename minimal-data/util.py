@@ -1,22 +1,124 @@
+import struct
 import typing
+import numpy as np
 
 # Extended encoding scheme to include space and uppercase letters
-CHAR_TO_BITS = {chr(i): i - ord('a') for i in range(ord('a'), ord('z') + 1)}
-CHAR_TO_BITS[' '] = 26  # Add space
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz '
+CHAR_TO_BITS = {char: i for i, char in enumerate(ALPHABET)}  # a-z -> 0-25, space -> 26
 BITS_TO_CHAR = {v: k for k, v in CHAR_TO_BITS.items()}
 
+# Every symbol fits in 5 bits, so 8 symbols pack into 5 bytes
+BITS_PER_SYMBOL = 5
+
+# Byte translation tables so whole messages are converted in C instead of character by character
+_ENCODE_TABLE = bytes.maketrans(ALPHABET.encode(), bytes(range(len(ALPHABET))))
+_UNKNOWN_CHARS = bytes(b for b in range(128) if chr(b) not in CHAR_TO_BITS)
+_DECODE_TABLE = bytes.maketrans(bytes(range(len(ALPHABET))), ALPHABET.encode())
+# Translating with these as the delete set leaves only the invalid bytes behind
+_SYMBOLS = bytes(range(len(ALPHABET)))
+_FIVE_BIT_VALUES = bytes(range(1 << 5))
+
+# Every datagram starts with the sequence ID of its request, echoed back in the response
+SEQUENCE = struct.Struct('!I')
+
+# Messages shorter than this are packed with Python integers, which beats NumPy's per-call overhead
+NUMPY_MIN_SYMBOLS = 64
+
+# Bit offsets of the 8 symbols and 5 bytes within a 40-bit group, first symbol and byte highest
+_SYMBOL_SHIFTS = np.arange(35, -1, -BITS_PER_SYMBOL, dtype=np.uint64)
+_BYTE_SHIFTS = np.arange(32, -1, -8, dtype=np.uint64)
+
+def text_to_symbols(text: str) -> bytes:
+    """Symbol codes of `text` as bytes, one per symbol; characters outside the alphabet are dropped."""
+    # Non-ASCII characters are never in the alphabet, so dropping them first is safe
+    return text.lower().encode('ascii', 'ignore').translate(_ENCODE_TABLE, _UNKNOWN_CHARS)
+
+def symbols_to_text(symbols: bytes) -> str:
+    invalid = symbols.translate(None, _SYMBOLS)
+    if invalid:
+        raise ValueError(f"Invalid symbol {invalid[0]}")
+    return symbols.translate(_DECODE_TABLE).decode('ascii')
+
 def encode_text(text: str) -> typing.List[int]:
-    encoded = []
-    for char in text.lower():
-        if char in CHAR_TO_BITS:
-            encoded.append(CHAR_TO_BITS[char])
-    return encoded
+    return list(text_to_symbols(text))
 
 def decode_text(encoded: typing.List[int]) -> str:
-    return ''.join([BITS_TO_CHAR[bits] for bits in encoded])
+    return symbols_to_text(bytes(encoded))
+
+def pack_symbols(symbols: bytes) -> bytes:
+    """
+    Pack symbol codes at 5 bits each behind a varint symbol count.
+
+    Symbols are stored most significant bit first and the last byte is zero padded.
+    """
+    if symbols.translate(None, _FIVE_BIT_VALUES):
+        raise ValueError(f"Symbols must be below {1 << BITS_PER_SYMBOL}")
+    count = len(symbols)
+    size = -(-count * BITS_PER_SYMBOL // 8)
+    if count < NUMPY_MIN_SYMBOLS:
+        value = 0
+        for code in symbols:
+            value = value << BITS_PER_SYMBOL | code
+        return _encode_varint(count) + (value << (size * 8 - count * BITS_PER_SYMBOL)).to_bytes(size, 'big')
+
+    # Each group of 8 symbols becomes one 40-bit integer, which is split into 5 bytes
+    groups = np.zeros(-(-count // 8) * 8, dtype=np.uint64)
+    groups[:count] = np.frombuffer(symbols, dtype=np.uint8)
+    values = (groups.reshape(-1, 8) << _SYMBOL_SHIFTS).sum(axis=1, dtype=np.uint64)
+    packed = (values[:, None] >> _BYTE_SHIFTS).astype(np.uint8).ravel()
+    return _encode_varint(count) + packed[:size].tobytes()
+
+def unpack_symbols(data: bytes) -> bytes:
+    """Inverse of `pack_symbols`."""
+    count, offset = _decode_varint(data)
+    size = -(-count * BITS_PER_SYMBOL // 8)
+    if len(data) - offset != size:
+        raise ValueError(f"Expected {count} packed symbols, got {len(data) - offset} bytes")
+    if count < NUMPY_MIN_SYMBOLS:
+        value = int.from_bytes(data[offset:], 'big') >> (size * 8 - count * BITS_PER_SYMBOL)
+        return bytes((value >> shift) & 0x1F for shift in range((count - 1) * BITS_PER_SYMBOL, -1, -BITS_PER_SYMBOL))
+
+    groups = np.zeros(-(-size // 5) * 5, dtype=np.uint64)
+    groups[:size] = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    values = (groups.reshape(-1, 5) << _BYTE_SHIFTS).sum(axis=1, dtype=np.uint64)
+    codes = ((values[:, None] >> _SYMBOL_SHIFTS) & 0x1F).astype(np.uint8).ravel()
+    return codes[:count].tobytes()
+
+def pack_text(text: str) -> bytes:
+    return pack_symbols(text_to_symbols(text))
+
+def unpack_text(data: bytes) -> str:
+    return symbols_to_text(unpack_symbols(data))
+
+def frame(sequence: int, payload: bytes) -> bytes:
+    return SEQUENCE.pack(sequence) + payload
+
+def unframe(data: bytes) -> typing.Tuple[int, bytes]:
+    """Split a datagram into its sequence ID and payload."""
+    if len(data) < SEQUENCE.size:
+        raise ValueError("Datagram too short for a sequence ID")
+    return SEQUENCE.unpack_from(data)[0], data[SEQUENCE.size:]
 
 def encoded_to_bytes(encoded: typing.List[int]) -> bytes:
-    return bytes(encoded)
+    return pack_symbols(bytes(encoded))
 
 def bytes_to_encoded(data: bytes) -> typing.List[int]:
-    return list(data)
+    return list(unpack_symbols(data))
+
+def _encode_varint(value: int) -> bytes:
+    """Unsigned LEB128: 7 bits per byte, high bit set on every byte but the last."""
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def _decode_varint(data: bytes) -> typing.Tuple[int, int]:
+    """Decode a varint at the start of `data`, returning (value, bytes used)."""
+    value = 0
+    for i, byte in enumerate(data[:10]):
+        value |= (byte & 0x7F) << (7 * i)
+        if not byte & 0x80:
+            return value, i + 1
+    raise ValueError("Truncated or oversized length header")
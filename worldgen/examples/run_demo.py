@@ -1,17 +1,16 @@
+from collections import OrderedDict
 import pygame
-from worldgen.world import World
+from worldgen.world import COLOR_TABLE, World
 from worldgen.chunk import BuildSettings
 
 # Constants
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
-BLOCK_SIZE = 10  # Size of each block in pixels
-COLORS = {
-    0: (0, 0, 255),  # Ocean
-    1: (0, 0, 150),  # River
-    2: (34, 139, 34),  # Grass
-    3: (139, 69, 19),  # Mountain
-}
+BLOCK_SIZE = 10  # Default size of each block in pixels
+MIN_BLOCK_SIZE = 1
+MAX_BLOCK_SIZE = 20
+PREFETCH_RADIUS = 2  # Extra chunks prefetched beyond the edge of the screen
+CHUNK_SURFACE_CACHE_SIZE = 4096  # Pre-rendered chunk surfaces kept around
 
 class Game:
     def __init__(self):
@@ -31,9 +30,13 @@ class Game:
         self.world = World(build_settings=build_settings)
         self.camera_x = 0
         self.camera_y = 0
+        self.block_size = BLOCK_SIZE
         self.dragging = False
         self.last_mouse_pos = (0, 0)
 
+        # Pre-rendered one-pixel-per-block surfaces of chunks, keyed by chunk coordinates
+        self.chunk_surfaces: "OrderedDict[tuple, tuple]" = OrderedDict()
+
     def run(self):
         """Main game loop."""
         running = True
@@ -52,30 +55,65 @@ class Game:
                     if self.dragging:
                         dx = event.pos[0] - self.last_mouse_pos[0]
                         dy = event.pos[1] - self.last_mouse_pos[1]
-                        self.camera_x -= dx // BLOCK_SIZE
-                        self.camera_y -= dy // BLOCK_SIZE
+                        self.camera_x -= dx // self.block_size
+                        self.camera_y -= dy // self.block_size
                         self.last_mouse_pos = event.pos
+                elif event.type == pygame.MOUSEWHEEL:
+                    self.zoom(event.y)
 
             self.screen.fill((0, 0, 0))  # Clear screen
             self.render_world()
             pygame.display.flip()
             self.clock.tick(60)  # Cap at 60 FPS
 
+        self.world.close()
         pygame.quit()
 
+    def zoom(self, steps: int):
+        """Change the block size, keeping the block at the center of the screen in place."""
+        block_size = min(MAX_BLOCK_SIZE, max(MIN_BLOCK_SIZE, self.block_size + steps))
+        center_x = self.camera_x + SCREEN_WIDTH // (2 * self.block_size)
+        center_y = self.camera_y + SCREEN_HEIGHT // (2 * self.block_size)
+        self.block_size = block_size
+        self.camera_x = center_x - SCREEN_WIDTH // (2 * block_size)
+        self.camera_y = center_y - SCREEN_HEIGHT // (2 * block_size)
+
     def render_world(self):
         """Render the world based on the camera position."""
-        for x in range(SCREEN_WIDTH // BLOCK_SIZE):
-            for y in range(SCREEN_HEIGHT // BLOCK_SIZE):
-                world_x = x + self.camera_x
-                world_y = y + self.camera_y
-                block_type = self.world.get_block(world_x, world_y)
-                color = COLORS.get(block_type, (0, 0, 0))  # Default to black if block type is unknown
-                pygame.draw.rect(
-                    self.screen,
-                    color,
-                    (x * BLOCK_SIZE, y * BLOCK_SIZE, BLOCK_SIZE, BLOCK_SIZE),
-                )
+        chunk_size = self.world.chunk_size
+        columns = -(-SCREEN_WIDTH // self.block_size)
+        rows = -(-SCREEN_HEIGHT // self.block_size)
+
+        # Generate the surroundings in the background so panning does not stall on new chunks
+        radius = max(columns, rows) // (2 * chunk_size) + PREFETCH_RADIUS
+        self.world.prefetch([(self.camera_x + columns // 2, self.camera_y + rows // 2)], radius)
+
+        first_x, last_x = self.camera_x // chunk_size, (self.camera_x + columns - 1) // chunk_size
+        first_y, last_y = self.camera_y // chunk_size, (self.camera_y + rows - 1) // chunk_size
+        coords = [(x, y) for x in range(first_x, last_x + 1) for y in range(first_y, last_y + 1)]
+        chunks = self.world.get_chunks(coords)
+
+        # Compose the visible chunks at one pixel per block, then scale the result up in a single blit
+        canvas = pygame.Surface(((last_x - first_x + 1) * chunk_size, (last_y - first_y + 1) * chunk_size))
+        canvas.blits([
+            (self.chunk_surface(coord, chunk), ((coord[0] - first_x) * chunk_size, (coord[1] - first_y) * chunk_size))
+            for coord, chunk in chunks.items()
+        ], doreturn=False)
+        visible = canvas.subsurface((self.camera_x - first_x * chunk_size, self.camera_y - first_y * chunk_size, columns, rows))
+        self.screen.blit(pygame.transform.scale(visible, (columns * self.block_size, rows * self.block_size)), (0, 0))
+
+    def chunk_surface(self, coord: tuple, chunk) -> pygame.Surface:
+        """Get the pre-rendered surface of a chunk, rendering it if the chunk is new or was regenerated."""
+        cached = self.chunk_surfaces.get(coord)
+        if cached is not None and cached[0] is chunk:
+            self.chunk_surfaces.move_to_end(coord)
+            return cached[1]
+
+        surface = pygame.surfarray.make_surface(COLOR_TABLE[chunk.terrain])
+        self.chunk_surfaces[coord] = (chunk, surface)
+        if len(self.chunk_surfaces) > CHUNK_SURFACE_CACHE_SIZE:
+            self.chunk_surfaces.popitem(last=False)
+        return surface
 
 if __name__ == "__main__":
     game = Game()
@@ -0,0 +1,36 @@
+import json
+
+from worldgen.benchmark import WORKLOADS, compare, main, run_benchmarks
+
+def test_every_workload_reports_metrics():
+    results = run_benchmarks(counts={name: 3 for name in WORKLOADS})
+    assert set(results["workloads"]) == set(WORKLOADS)
+    for result in results["workloads"].values():
+        if "skipped" in result:
+            continue
+        assert result["operations"] == 3
+        assert result["operations_per_second"] > 0
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"] <= result["latency_ms"]["max"]
+        assert result["peak_memory_bytes"] > 0
+    json.dumps(results)
+
+def test_compare_reports_throughput_regressions():
+    baseline = {"workloads": {"a": {"operations_per_second": 100.0}, "b": {"operations_per_second": 100.0}}}
+    results = {"workloads": {
+        "a": {"operations_per_second": 95.0, "unit": "chunk"},
+        "b": {"operations_per_second": 50.0, "unit": "chunk"},
+        "c": {"operations_per_second": 1.0, "unit": "chunk"},
+    }}
+    regressions = compare(results, baseline, tolerance=0.1)
+    assert len(regressions) == 1 and regressions[0].startswith("b:")
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["chunk_generate", "--quick", "--output", str(output)]) == 0
+    results = json.loads(output.read_text())
+    assert set(results["workloads"]) == {"chunk_generate"}
+
+    results["workloads"]["chunk_generate"]["operations_per_second"] *= 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(results))
+    assert main(["chunk_generate", "--quick", "--output", str(output), "--compare", str(baseline)]) == 1
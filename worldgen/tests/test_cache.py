@@ -0,0 +1,66 @@
+import pytest
+
+from worldgen.cache import ChunkCache
+from worldgen.chunk import Chunk, DEFAULT_BUILD_SETTINGS
+from worldgen.world import World
+
+def make_chunk(x: int, z: int = 0) -> Chunk:
+    return Chunk(x, z)
+
+def test_lru_evicts_least_recently_used():
+    cache = ChunkCache(max_chunks=2)
+    cache[(0, 0)] = make_chunk(0)
+    cache[(1, 0)] = make_chunk(1)
+    cache.get((0, 0))
+    cache[(2, 0)] = make_chunk(2)
+    assert set(cache) == {(0, 0), (2, 0)}
+    assert cache.evictions == 1
+
+def test_clock_gives_referenced_chunks_a_second_chance():
+    cache = ChunkCache(max_chunks=3, eviction="clock")
+    for x in range(3):
+        cache[(x, 0)] = make_chunk(x)
+    cache.get((0, 0))
+    cache[(3, 0)] = make_chunk(3)
+    assert set(cache) == {(0, 0), (2, 0), (3, 0)}
+
+def test_pinned_chunks_are_never_evicted():
+    cache = ChunkCache(max_chunks=2)
+    cache.pin((0, 0))
+    cache[(0, 0)] = make_chunk(0)
+    cache[(1, 0)] = make_chunk(1)
+    cache[(2, 0)] = make_chunk(2)
+    assert set(cache) == {(0, 0), (2, 0)}
+    assert cache.stats().pinned == 1
+
+    cache.max_chunks = 1
+    cache.unpin((0, 0))
+    assert len(cache) == 1
+
+def test_byte_budget():
+    chunk_bytes = make_chunk(0).nbytes
+    cache = ChunkCache(max_bytes=3 * chunk_bytes)
+    for x in range(5):
+        cache[(x, 0)] = make_chunk(x)
+    assert len(cache) == 3
+    assert cache.nbytes == 3 * chunk_bytes
+    assert cache.stats().evictions == 2
+
+def test_world_records_hits_and_misses():
+    world = World(DEFAULT_BUILD_SETTINGS, cache=ChunkCache(max_chunks=4))
+    for x in range(16):
+        world.get_block(x, 0)
+    world.get_block(40, 0)
+    stats = world.chunks.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (15, 2, 0)
+
+def test_world_region_larger_than_cache():
+    world = World(DEFAULT_BUILD_SETTINGS, cache=ChunkCache(max_chunks=2))
+    region = world.get_region(0, 0, 64, 64)
+    expected = World(DEFAULT_BUILD_SETTINGS).get_region(0, 0, 64, 64)
+    assert (region == expected).all()
+    assert len(world.chunks) == 2
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        ChunkCache(eviction="fifo")
@@ -0,0 +1,141 @@
+import noise
+import numpy as np
+import pytest
+
+from worldgen.chunk import BuildSettings, Chunk, _classify_thresholds, classify, pack_terrain
+from worldgen.perlin import PERM, permutation, pnoise2
+from worldgen.store import settings_key
+
+SETTINGS = [
+    BuildSettings(octaves=6, frequency=24.0, amplitude=28.0, ocean_threshold=0.5, river_threshold=0.05, mountain_threshold=0.7),
+    BuildSettings(octaves=3, frequency=7.5, amplitude=40.0, ocean_threshold=0.45, river_threshold=0.02, mountain_threshold=0.6),
+    BuildSettings(octaves=1, frequency=100.0, amplitude=10.0, ocean_threshold=0.5, river_threshold=0.1, mountain_threshold=0.55),
+]
+
+def reference_terrain(chunk: Chunk) -> np.ndarray:
+    """Per-block reference generation using the scalar `noise.pnoise2`."""
+    terrain = np.zeros((chunk.chunk_size, chunk.chunk_size), dtype=int)
+    for x in range(chunk.chunk_size):
+        for z in range(chunk.chunk_size):
+            world_x = x + chunk.x * chunk.chunk_size
+            world_z = z + chunk.z * chunk.chunk_size
+            height = int(
+                noise.pnoise2(world_x / chunk.frequency, world_z / chunk.frequency, octaves=chunk.octaves)
+                * chunk.amplitude
+                + (chunk.world_height / 2)
+            )
+            if height < chunk.ocean_threshold * chunk.world_height:
+                terrain[x, z] = 0
+            elif abs(height - (chunk.world_height / 2)) < chunk.river_threshold * chunk.world_height:
+                terrain[x, z] = 1
+            elif height > chunk.mountain_threshold * chunk.world_height:
+                terrain[x, z] = 3
+            else:
+                terrain[x, z] = 2
+    return terrain
+
+@pytest.mark.parametrize("octaves", [1, 2, 6])
+@pytest.mark.parametrize("scale", [1.0, 1e3, 1e6])
+def test_pnoise2_matches_scalar(octaves, scale):
+    rng = np.random.default_rng(octaves)
+    xs = rng.uniform(-scale, scale, 2000)
+    ys = rng.uniform(-scale, scale, 2000)
+    expected = [noise.pnoise2(x, y, octaves=octaves) for x, y in zip(xs, ys)]
+    np.testing.assert_array_equal(pnoise2(xs, ys, octaves=octaves).astype(np.float64), expected)
+
+@pytest.mark.parametrize("octaves", [8, 9, 12])
+def test_pnoise2_matches_scalar_per_point_with_many_octaves(octaves):
+    rng = np.random.default_rng(octaves)
+    for x, y in rng.uniform(-1e3, 1e3, (2000, 2)):
+        assert np.float64(pnoise2(x, y, octaves=octaves)) == noise.pnoise2(x, y, octaves=octaves)
+
+def test_pnoise2_matches_scalar_with_odd_repeat():
+    xs = np.linspace(-300.0, 300.0, 1000)
+    ys = np.linspace(250.0, -250.0, 1000)
+    expected = [noise.pnoise2(x, y, octaves=4, repeatx=100, repeaty=37.5) for x, y in zip(xs, ys)]
+    np.testing.assert_array_equal(pnoise2(xs, ys, octaves=4, repeatx=100, repeaty=37.5).astype(np.float64), expected)
+
+@pytest.mark.parametrize("repeat", [1024, 100])
+def test_pnoise2_grid_matches_scalar(repeat):
+    # Axes crossing lattice coordinate 256, where the corner index wraps, at small (cached) and large sizes
+    for size in (16, 300):
+        xs = np.linspace(250.0, 262.0, size, dtype=np.float32)[:, None]
+        ys = np.linspace(-3.0, 9.0, 24, dtype=np.float32)[None, :]
+        expected = [[noise.pnoise2(x, y, octaves=3, repeatx=repeat, repeaty=repeat) for y in ys[0]] for x in xs[:, 0]]
+        for _ in range(2):  # The second call reads cached axis terms
+            np.testing.assert_array_equal(pnoise2(xs, ys, octaves=3, repeatx=repeat, repeaty=repeat).astype(np.float64), expected)
+
+def test_seeded_pnoise2_is_deterministic_per_seed():
+    xs = np.linspace(-50.0, 50.0, 300)[:, None]
+    ys = np.linspace(20.0, -80.0, 200)[None, :]
+    default = pnoise2(xs, ys, octaves=4)
+    np.testing.assert_array_equal(pnoise2(xs, ys, octaves=4, seed=None), default)
+    np.testing.assert_array_equal(pnoise2(xs, ys, octaves=4, seed=7), pnoise2(xs, ys, octaves=4, seed=7))
+    assert not np.array_equal(pnoise2(xs, ys, octaves=4, seed=7), default)
+    assert not np.array_equal(pnoise2(xs, ys, octaves=4, seed=7), pnoise2(xs, ys, octaves=4, seed=8))
+    assert np.abs(pnoise2(xs, ys, octaves=4, seed=7)).max() <= 1.0
+
+def test_seeded_permutation_tables():
+    assert permutation() is PERM
+    table = permutation(42)
+    assert sorted(table[:256]) == list(range(256))
+    np.testing.assert_array_equal(table[:256], table[256:])
+
+def test_seed_changes_chunk_terrain_and_store_key():
+    settings = SETTINGS[0]
+    seeded = settings._replace(seed=3)
+    assert settings.seed is None
+    assert settings_key(settings, 16) != settings_key(seeded, 16)
+
+    plain = Chunk(4, -2, settings=settings)
+    plain.generate()
+    chunk = Chunk(4, -2, settings=seeded)
+    chunk.generate()
+    assert chunk.seed == 3
+    assert not np.array_equal(chunk.terrain, plain.terrain)
+
+def test_pnoise2_rejects_zero_octaves():
+    with pytest.raises(ValueError):
+        pnoise2(0.0, 0.0, octaves=0)
+
+@pytest.mark.parametrize("settings", SETTINGS + [
+    BuildSettings(octaves=1, frequency=1.0, amplitude=1.0, ocean_threshold=0.9, river_threshold=-0.1, mountain_threshold=0.2),
+])
+def test_classify_table_matches_thresholds(settings):
+    heights = np.arange(-200, 200)
+    np.testing.assert_array_equal(classify(heights, settings), _classify_thresholds(heights, settings, 64))
+    np.testing.assert_array_equal(classify(heights, settings, 256), _classify_thresholds(heights, settings, 256))
+
+@pytest.mark.parametrize("settings", SETTINGS)
+@pytest.mark.parametrize("x, z", [(0, 0), (-1, 3), (57, -204), (-1500, -1500)])
+def test_generate_matches_reference(settings, x, z):
+    chunk = Chunk(x, z)
+    chunk.build_settings(settings)
+    chunk.generate()
+    np.testing.assert_array_equal(chunk.terrain, reference_terrain(chunk))
+
+def test_terrain_is_uint8_and_settings_are_shared():
+    settings = SETTINGS[1]
+    chunk = Chunk(2, 5, settings=settings)
+    chunk.generate()
+    assert chunk.terrain.dtype == np.uint8
+    assert chunk.settings is settings
+    assert chunk.frequency == settings.frequency
+    assert not hasattr(chunk, "__dict__")
+
+@pytest.mark.parametrize("chunk_size", [16, 5])
+def test_packed_chunk_round_trips(chunk_size):
+    plain = Chunk(-3, 9, chunk_size)
+    plain.generate()
+    packed = Chunk(-3, 9, chunk_size, packed=True)
+    packed.generate()
+
+    np.testing.assert_array_equal(packed.terrain, plain.terrain)
+    assert packed.nbytes == -(-chunk_size * chunk_size // 4)
+    for x in range(chunk_size):
+        for z in range(chunk_size):
+            assert packed.get_block(x, z) == plain.get_block(x, z)
+
+def test_pack_rejects_wide_biome_ids():
+    with pytest.raises(ValueError):
+        pack_terrain(np.array([[0, 4]]))
@@ -0,0 +1,55 @@
+import struct
+import zlib
+
+import numpy as np
+import pytest
+
+from worldgen.chunk import DEFAULT_BUILD_SETTINGS
+from worldgen.export import RegionReader, export_array, export_tiles
+from worldgen.world import COLOR_TABLE, World
+
+def read_png(path) -> np.ndarray:
+    """Decode the unfiltered RGB PNGs written by `write_png`."""
+    data = open(path, "rb").read()
+    width, height = struct.unpack(">II", data[16:24])
+    idat = data.index(b"IDAT")
+    length = struct.unpack(">I", data[idat - 4:idat])[0]
+    scanlines = np.frombuffer(zlib.decompress(data[idat + 4:idat + 4 + length]), dtype=np.uint8)
+    return scanlines.reshape(height, 1 + width * 3)[:, 1:].reshape(height, width, 3)
+
+@pytest.mark.parametrize("world_x, world_z, size_x, size_z", [(0, 0, 64, 48), (-37, 5, 50, 70)])
+def test_region_reader_matches_world(world_x, world_z, size_x, size_z):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    with RegionReader(world) as reader:
+        np.testing.assert_array_equal(reader.read(world_x, world_z, size_x, size_z), world.get_region(world_x, world_z, size_x, size_z))
+        rows = list(reader.rows(world_x, world_z, size_x, size_z))
+    np.testing.assert_array_equal(np.concatenate(rows), world.get_region(world_x, world_z, size_x, size_z))
+    assert all(len(strip) <= world.chunk_size for strip in rows)
+
+def test_export_npy_and_raw(tmp_path):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    expected = World(DEFAULT_BUILD_SETTINGS).get_region(-20, 30, 70, 45)
+
+    export_array(world, tmp_path / "ids.npy", -20, 30, 70, 45)
+    np.testing.assert_array_equal(np.load(tmp_path / "ids.npy"), expected)
+    assert len(world.chunks) == 0
+
+    export_array(world, tmp_path / "colors.npy", -20, 30, 70, 45, colors=True)
+    np.testing.assert_array_equal(np.load(tmp_path / "colors.npy"), COLOR_TABLE[expected])
+
+    export_array(world, tmp_path / "ids.raw", -20, 30, 70, 45, raw=True)
+    np.testing.assert_array_equal(np.fromfile(tmp_path / "ids.raw", dtype=np.uint8).reshape(70, 45), expected)
+
+def test_export_parallel_matches_serial(tmp_path):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    export_array(world, tmp_path / "serial.npy", 0, 0, 96, 300)
+    export_array(world, tmp_path / "parallel.npy", 0, 0, 96, 300, workers=2)
+    np.testing.assert_array_equal(np.load(tmp_path / "parallel.npy"), np.load(tmp_path / "serial.npy"))
+
+def test_export_tiles(tmp_path):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    paths = export_tiles(world, tmp_path / "tiles", 10, -5, 100, 70, tile_size=64)
+    assert len(paths) == 4
+    expected = COLOR_TABLE[World(DEFAULT_BUILD_SETTINGS).get_region(10, -5, 100, 70)]
+    np.testing.assert_array_equal(read_png(tmp_path / "tiles" / "tile.0.0.png"), expected[:64, :64].transpose(1, 0, 2))
+    np.testing.assert_array_equal(read_png(tmp_path / "tiles" / "tile.1.1.png"), expected[64:, 64:].transpose(1, 0, 2))
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from worldgen.cache import ChunkCache
+from worldgen.chunk import DEFAULT_BUILD_SETTINGS
+from worldgen.index import summarize
+from worldgen.world import BLOCKS, World
+
+def brute_force_nearest(region: np.ndarray, origin_x: int, origin_z: int, biome: int, x: int, z: int):
+    block_x, block_z = np.nonzero(region == biome)
+    if len(block_x) == 0:
+        return None
+    distances = (block_x + origin_x - x) ** 2 + (block_z + origin_z - z) ** 2
+    return distances.min()
+
+def test_summary_counts_and_bounds():
+    terrain = np.full((1, 4, 4), 2, dtype=np.uint8)
+    terrain[0, 1, 2] = 0
+    terrain[0, 3, 0] = 0
+    counts, bounds = summarize(terrain, 4)
+    assert counts.tolist() == [[2, 0, 14, 0]]
+    assert bounds[0, 0].tolist() == [1, 3, 0, 2]
+    assert bounds[0, 1].tolist() == [-1, -1, -1, -1]
+    assert bounds[0, 2].tolist() == [0, 3, 0, 3]
+
+def test_index_follows_generation():
+    world = World(DEFAULT_BUILD_SETTINGS)
+    world.get_region(-40, 10, 64, 48)
+    assert len(world.index) == len(world.chunks)
+    counts, _ = world.index.summary(0, 1)
+    np.testing.assert_array_equal(counts, np.bincount(world.get_chunk(0, 1).terrain.ravel(), minlength=len(BLOCKS)))
+
+@pytest.mark.parametrize("world_x, world_z, size_x, size_z", [
+    (0, 0, 64, 64),
+    (-37, 5, 150, 90),
+    (100, -300, 1, 129),
+])
+def test_biome_counts_match_region(world_x, world_z, size_x, size_z):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    expected = np.bincount(World(DEFAULT_BUILD_SETTINGS).get_region(world_x, world_z, size_x, size_z).ravel(), minlength=len(BLOCKS))
+    np.testing.assert_array_equal(world.biome_counts(world_x, world_z, size_x, size_z), expected)
+
+@pytest.mark.parametrize("biome", sorted(BLOCKS))
+def test_nearest_biome_matches_brute_force(biome):
+    world = World(DEFAULT_BUILD_SETTINGS)
+    region = world.get_region(-200, -200, 400, 400)
+    for x, z in [(0, 0), (-150, 120), (180, -7)]:
+        found = world.nearest_biome(biome, x, z)
+        expected = brute_force_nearest(region, -200, -200, biome, x, z)
+        if expected is None:
+            assert found is None
+            continue
+        assert region[found[0] + 200, found[1] + 200] == biome
+        assert (found[0] - x) ** 2 + (found[1] - z) ** 2 == expected
+
+def test_nearest_biome_respects_max_distance_and_evictions():
+    world = World(DEFAULT_BUILD_SETTINGS, cache=ChunkCache(max_chunks=16))
+    world.get_region(0, 0, 256, 256)
+    assert len(world.index) == 256 and len(world.chunks) == 16
+
+    found = world.nearest_biome(3, 128, 128)
+    reference = World(DEFAULT_BUILD_SETTINGS).get_region(0, 0, 256, 256)
+    assert (found[0] - 128) ** 2 + (found[1] - 128) ** 2 == brute_force_nearest(reference, 0, 0, 3, 128, 128)
+    assert world.nearest_biome(3, 128, 128, max_distance=0.5) in (None, (128, 128))
+    assert world.nearest_biome(3, 10_000, 10_000, max_distance=100) is None
+
+def test_bounded_index_keeps_the_newest_summaries():
+    world = World(DEFAULT_BUILD_SETTINGS, cache=ChunkCache(max_chunks=16), index_chunks=40)
+    world.get_chunk_region(0, 0, 10, 10)
+    assert len(world.index) == 40
+    assert world.index._counts.dtype == np.uint16 and world.index._bounds.dtype == np.uint8
+    assert (0, 0) not in world.index and (9, 9) in world.index
+
+    # Summaries read back the same as freshly computed ones, absent biomes included
+    counts, bounds = world.index.summary(9, 9)
+    expected_counts, expected_bounds = summarize(world.get_chunk(9, 9).terrain[None], len(BLOCKS))
+    np.testing.assert_array_equal(counts, expected_counts[0])
+    np.testing.assert_array_equal(bounds, expected_bounds[0])
+
+    # Regions larger than the index are still counted in full
+    expected = np.bincount(World(DEFAULT_BUILD_SETTINGS).get_region(-5, 3, 150, 120).ravel(), minlength=len(BLOCKS))
+    np.testing.assert_array_equal(world.biome_counts(-5, 3, 150, 120), expected)
+    assert len(world.index) == 40
+    with pytest.raises(ValueError):
+        World(DEFAULT_BUILD_SETTINGS, index_chunks=0)
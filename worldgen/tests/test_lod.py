@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from worldgen.chunk import DEFAULT_BUILD_SETTINGS
+from worldgen.world import World
+
+@pytest.mark.parametrize("level", [1, 3])
+def test_overview_matches_full_resolution_samples(level):
+    step = 1 << level
+    world = World(DEFAULT_BUILD_SETTINGS)
+    overview = world.get_overview(-300, 200, 500, 420, level)
+    assert len(world.chunks) == 0  # Sampled from noise, no chunks generated
+
+    first_x, first_z = -300 // step, 200 // step
+    full = World(DEFAULT_BUILD_SETTINGS).get_region(first_x * step, first_z * step, overview.shape[0] * step, overview.shape[1] * step)
+    np.testing.assert_array_equal(overview, full[::step, ::step])
+
+def test_level_zero_uses_full_chunks():
+    world = World(DEFAULT_BUILD_SETTINGS)
+    world.overview.tile_size = 32
+    np.testing.assert_array_equal(world.get_overview(5, -7, 40, 30, 0), world.get_region(5, -7, 40, 30))
+    assert len(world.chunks) > 0
+
+def test_coarse_tile_downsampled_from_cached_chunks():
+    world = World(DEFAULT_BUILD_SETTINGS)
+    world.overview.tile_size = 16
+    world.get_region(0, 0, 32, 32)
+    sampled = World(DEFAULT_BUILD_SETTINGS)
+    sampled.overview.tile_size = 16
+    np.testing.assert_array_equal(world.overview.get_tile(1, 0, 0), sampled.overview.get_tile(1, 0, 0))
+    assert len(sampled.chunks) == 0
+
+def test_tiles_are_cached_per_level():
+    world = World(DEFAULT_BUILD_SETTINGS)
+    first = world.overview.get_tile(4, 2, -1)
+    assert world.overview.get_tile(4, 2, -1) is first
+    assert (4, 2, -1) in world.overview.tiles
+    assert world.overview.level_for(1) == 0
+    assert world.overview.level_for(5) == 2
@@ -0,0 +1,63 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from worldgen.chunk import DEFAULT_BUILD_SETTINGS
+from worldgen.server import ChunkClient, ChunkServer, ChunkServerError, split_range
+from worldgen.world import World
+
+class CountingWorld(World):
+    """World that records every chunk it generates."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.generated = []
+
+    def generate_chunks(self, coords):
+        generated = super().generate_chunks(coords)
+        self.generated.extend(generated)
+        return generated
+
+def serve(world, coroutine, **kwargs):
+    """Run `coroutine(server, client)` against a server on an ephemeral port."""
+    async def main():
+        async with ChunkServer(world, port=0, **kwargs) as server:
+            async with ChunkClient(port=server.port) as client:
+                return await coroutine(server, client)
+    return asyncio.run(main())
+
+def test_split_range_covers_every_chunk_once():
+    pieces = list(split_range((-3, 5, 20, 7), 8))
+    covered = [(x, z) for cx, cz, nx, nz in pieces for x in range(cx, cx + nx) for z in range(cz, cz + nz)]
+    assert sorted(covered) == [(x, z) for x in range(-3, 17) for z in range(5, 12)]
+    assert all(nx <= 8 and nz <= 8 for _, _, nx, nz in pieces)
+
+def test_region_matches_world():
+    async def run(server, client):
+        return await client.get_region(-5, 3, 7, 4)
+    region = serve(World(DEFAULT_BUILD_SETTINGS), run)
+    np.testing.assert_array_equal(region, World(DEFAULT_BUILD_SETTINGS).get_chunk_region(-5, 3, 7, 4))
+
+def test_large_region_is_streamed_in_pieces():
+    async def run(server, client):
+        return [piece async for piece, _ in client.stream_region(0, 0, 10, 9)]
+    pieces = serve(World(DEFAULT_BUILD_SETTINGS), run, piece_chunks=4)
+    assert pieces == list(split_range((0, 0, 10, 9), 4))
+
+def test_concurrent_requests_generate_each_chunk_once():
+    world = CountingWorld(DEFAULT_BUILD_SETTINGS)
+    async def run(server, client):
+        return await asyncio.gather(*[client.get_region(0, 0, 6, 6) for _ in range(4)], client.get_region(3, 3, 6, 6))
+    regions = serve(world, run)
+    assert len(world.generated) == len(set(world.generated))
+    assert all(np.array_equal(region, regions[0]) for region in regions[1:4])
+    np.testing.assert_array_equal(regions[4][:48, :48], regions[0][48:, 48:])
+
+def test_unpacked_payloads_and_errors():
+    async def run(server, client):
+        region = await client.get_region(2, 2, 2, 3)
+        with pytest.raises(ChunkServerError):
+            await client.get_region(0, 0, 65535, 65535)
+        return region
+    region = serve(World(DEFAULT_BUILD_SETTINGS), run, packed=False)
+    np.testing.assert_array_equal(region, World(DEFAULT_BUILD_SETTINGS).get_chunk_region(2, 2, 2, 3))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from worldgen.chunk import DEFAULT_BUILD_SETTINGS
+from worldgen.store import ChunkStore, settings_key
+from worldgen.world import World
+
+def test_chunks_survive_restart(tmp_path):
+    world = World(DEFAULT_BUILD_SETTINGS, store=ChunkStore(str(tmp_path), DEFAULT_BUILD_SETTINGS, region_size=4))
+    expected = world.get_region(-40, -40, 100, 100)
+    world.store.close()
+
+    store = ChunkStore(str(tmp_path), DEFAULT_BUILD_SETTINGS)
+    assert store.region_size == 4
+    restarted = World(DEFAULT_BUILD_SETTINGS, store=store)
+    np.testing.assert_array_equal(restarted.get_region(-40, -40, 100, 100), expected)
+    assert all(isinstance(chunk.terrain, np.memmap) for chunk in restarted.chunks.values())
+
+def test_loaded_chunks_are_read_only_views(tmp_path):
+    store = ChunkStore(str(tmp_path), DEFAULT_BUILD_SETTINGS)
+    World(DEFAULT_BUILD_SETTINGS, store=store).get_chunk(3, -7)
+    chunk = store.load(3, -7)
+    assert chunk is not None
+    assert not chunk.terrain.flags.writeable
+    assert store.load(3, -8) is None
+    assert store.load(1000, 1000) is None
+
+def test_settings_change_uses_separate_store(tmp_path):
+    other = DEFAULT_BUILD_SETTINGS._replace(frequency=12.0)
+    assert settings_key(other, 16) != settings_key(DEFAULT_BUILD_SETTINGS, 16)
+    assert settings_key(DEFAULT_BUILD_SETTINGS, 8) != settings_key(DEFAULT_BUILD_SETTINGS, 16)
+
+    World(DEFAULT_BUILD_SETTINGS, store=ChunkStore(str(tmp_path), DEFAULT_BUILD_SETTINGS)).get_chunk(0, 0)
+    assert ChunkStore(str(tmp_path), other).load(0, 0) is None
+
+def test_world_rejects_mismatched_store(tmp_path):
+    store = ChunkStore(str(tmp_path), DEFAULT_BUILD_SETTINGS, chunk_size=8)
+    with pytest.raises(ValueError):
+        World(DEFAULT_BUILD_SETTINGS, store=store)
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from worldgen.chunk import BuildSettings, Chunk
+from worldgen.store import ChunkStore
+from worldgen.world import World
+
+SETTINGS = BuildSettings(octaves=6, frequency=24.0, amplitude=28.0, ocean_threshold=0.5, river_threshold=0.05, mountain_threshold=0.7)
+
+def expected_region(world_x: int, world_z: int, size_x: int, size_z: int, chunk_size: int = 16) -> np.ndarray:
+    """Region assembled block by block from individually generated chunks."""
+    reference = World(SETTINGS, chunk_size=chunk_size)
+    return np.array([
+        [reference.get_block(x, z) for z in range(world_z, world_z + size_z)]
+        for x in range(world_x, world_x + size_x)
+    ])
+
+@pytest.mark.parametrize("world_x, world_z, size_x, size_z", [
+    (0, 0, 16, 16),
+    (-37, 5, 50, 70),
+    (100, -300, 1, 129),
+])
+def test_get_region_matches_get_block(world_x, world_z, size_x, size_z):
+    world = World(SETTINGS)
+    np.testing.assert_array_equal(world.get_region(world_x, world_z, size_x, size_z), expected_region(world_x, world_z, size_x, size_z))
+
+def test_get_region_respects_chunk_size():
+    world = World(SETTINGS, chunk_size=8)
+    np.testing.assert_array_equal(world.get_region(-20, -4, 30, 17), expected_region(-20, -4, 30, 17, chunk_size=8))
+    assert all(chunk.terrain.shape == (8, 8) for chunk in world.chunks.values())
+
+def test_generate_chunks_matches_single_chunks():
+    world = World(SETTINGS)
+    coords = [(x, z) for x in range(-3, 2) for z in range(-40, 3)] + [(9, 9)]
+    world.generate_chunks(coords)
+    assert set(world.chunks) == set(coords)
+    for (x, z), chunk in world.chunks.items():
+        single = Chunk(x, z)
+        single.build_settings(SETTINGS)
+        single.generate()
+        np.testing.assert_array_equal(chunk.terrain, single.terrain)
+
+def test_get_region_reuses_generated_chunks():
+    world = World(SETTINGS)
+    first = world.get_chunk(0, 0)
+    world.get_chunk_region(-1, -1, 3, 3)
+    assert world.chunks[(0, 0)] is first
+    assert len(world.chunks) == 9
+
+def test_get_region_rejects_negative_size():
+    with pytest.raises(ValueError):
+        World(SETTINGS).get_region(0, 0, -1, 4)
+
+def test_parallel_generation_matches_serial():
+    serial = World(SETTINGS)
+    parallel = World(SETTINGS, workers=2)
+    try:
+        np.testing.assert_array_equal(parallel.get_chunk_region(-20, -3, 24, 9), serial.get_chunk_region(-20, -3, 24, 9))
+    finally:
+        parallel.close()
+    assert set(parallel.chunks) == set(serial.chunks)
+
+def test_prefetch_generates_nearest_chunks_in_background():
+    world = World(SETTINGS)
+    try:
+        world.prefetch([(8, 8)], radius=2)
+        assert world.prefetcher.wait_idle(timeout=30)
+        expected = {(x, z) for x in range(-2, 3) for z in range(-2, 3) if x * x + z * z <= 4}
+        assert set(world.chunks) == expected
+        assert world.prefetcher.generated == len(expected)
+
+        world.chunks.reset_stats()
+        world.get_region(-16, -16, 48, 48)
+        assert world.chunks.misses == 0
+    finally:
+        world.close()
+
+def test_prefetch_drops_stale_requests():
+    world = World(SETTINGS)
+    try:
+        world.prefetch([(0, 0)], radius=30)
+        world.prefetch([(100000, 100000)], radius=1)
+        assert world.prefetcher.wait_idle(timeout=30)
+        assert (6250, 6250) in world.chunks
+        assert len(world.chunks) < 2821  # Far fewer than the full first disc
+        assert world.prefetcher.cancelled > 0
+    finally:
+        world.close()
+
+def test_prefetch_loads_stored_chunks_instead_of_generating(tmp_path):
+    first = World(SETTINGS, store=ChunkStore(str(tmp_path), SETTINGS))
+    first.get_chunk_region(-2, -2, 5, 5)
+    first.close()
+
+    world = World(SETTINGS, store=ChunkStore(str(tmp_path), SETTINGS))
+    generated = []
+    generate_chunks = world.generate_chunks
+    world.generate_chunks = lambda coords: generated.extend(coords) or generate_chunks(coords)
+    try:
+        world.prefetch([(8, 8)], radius=2)
+        assert world.prefetcher.wait_idle(timeout=30)
+        assert len(world.chunks) == 13
+        assert not generated
+    finally:
+        world.close()
+
+def test_prefetch_survives_failing_batch():
+    world = World(SETTINGS)
+    get_chunks = world.get_chunks
+    calls = []
+
+    def failing_once(coords):
+        calls.append(coords)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+        return get_chunks(coords)
+
+    world.get_chunks = failing_once
+    try:
+        world.prefetch([(0, 0)], radius=1)
+        assert world.prefetcher.wait_idle(timeout=30)
+        assert world.prefetcher.errors == 1
+        assert str(world.prefetcher.error) == "disk full"
+
+        world.prefetch([(1000, 1000)], radius=1)
+        assert world.prefetcher.wait_idle(timeout=30)
+        assert (62, 62) in world.chunks
+    finally:
+        world.close()
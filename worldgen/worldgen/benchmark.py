@@ -0,0 +1,263 @@
+"""
+Benchmark suite for worldgen.
+
+Run with `python -m worldgen.benchmark --output results.json` and compare against an earlier run with
+`--compare baseline.json`. Every workload runs against `BENCHMARK_SETTINGS` with coordinates drawn from
+a seeded generator, so two runs with the same seed do exactly the same work.
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from .cache import ChunkCache
+from .chunk import BuildSettings, Chunk
+from .world import World
+
+BENCHMARK_SETTINGS = BuildSettings(
+    octaves=6,
+    frequency=24.0,
+    amplitude=28.0,
+    ocean_threshold=0.5,
+    river_threshold=0.05,
+    mountain_threshold=0.7,
+)
+DEFAULT_SEED = 1234
+
+# Bump when workloads change in a way that makes results incomparable with older runs
+SCHEMA_VERSION = 1
+
+# Workloads return per-operation latencies in seconds and may add extra fields to the result
+Workload = Callable[[np.random.Generator, int], "WorkloadRun"]
+
+class WorkloadRun:
+    """Latencies of one workload run, plus the unit an operation is counted in and any extra metrics."""
+    def __init__(self, latencies: List[float], unit: str, blocks_per_operation: int = 0, **extra):
+        self.latencies = latencies
+        self.unit = unit
+        self.blocks_per_operation = blocks_per_operation
+        self.extra = extra
+
+def random_coords(rng: np.random.Generator, count: int, extent: int) -> List[tuple]:
+    """`count` integer coordinate pairs uniformly drawn from [-extent, extent)."""
+    return [tuple(map(int, coord)) for coord in rng.integers(-extent, extent, size=(count, 2))]
+
+def chunk_generate(rng: np.random.Generator, count: int) -> WorkloadRun:
+    """Generate single chunks at scattered coordinates."""
+    latencies = []
+    for x, z in random_coords(rng, count, 100_000):
+        start = time.perf_counter()
+        Chunk(x, z, settings=BENCHMARK_SETTINGS).generate()
+        latencies.append(time.perf_counter() - start)
+    return WorkloadRun(latencies, "chunk", blocks_per_operation=16 * 16)
+
+def region_cold(rng: np.random.Generator, count: int, size: int = 256) -> WorkloadRun:
+    """Read a region from an empty world, generating every chunk in it."""
+    latencies = []
+    for x, z in random_coords(rng, count, 1_000_000):
+        world = World(BENCHMARK_SETTINGS)
+        start = time.perf_counter()
+        world.get_region(x, z, size, size)
+        latencies.append(time.perf_counter() - start)
+    return WorkloadRun(latencies, "region", blocks_per_operation=size * size, region_size=size)
+
+def region_warm(rng: np.random.Generator, count: int, size: int = 256) -> WorkloadRun:
+    """Read the same region repeatedly once its chunks are cached."""
+    world = World(BENCHMARK_SETTINGS)
+    (x, z), = random_coords(rng, 1, 1_000_000)
+    world.get_region(x, z, size, size)
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        world.get_region(x, z, size, size)
+        latencies.append(time.perf_counter() - start)
+    return WorkloadRun(latencies, "region", blocks_per_operation=size * size, region_size=size)
+
+def get_block_random(rng: np.random.Generator, count: int, extent: int = 512) -> WorkloadRun:
+    """Look up random blocks of an area whose chunks are already generated."""
+    world = World(BENCHMARK_SETTINGS)
+    world.get_region(-extent, -extent, 2 * extent, 2 * extent)
+    latencies = []
+    for x, z in random_coords(rng, count, extent):
+        start = time.perf_counter()
+        world.get_block(x, z)
+        latencies.append(time.perf_counter() - start)
+    return WorkloadRun(latencies, "block", blocks_per_operation=1)
+
+def cache_churn(rng: np.random.Generator, count: int, max_chunks: int = 256, extent: int = 32) -> WorkloadRun:
+    """Random chunk reads over an area four times larger than the cache, so most reads evict a chunk."""
+    cache = ChunkCache(max_chunks=max_chunks)
+    world = World(BENCHMARK_SETTINGS, cache=cache)
+    latencies = []
+    for x, z in random_coords(rng, count, extent // 2):
+        start = time.perf_counter()
+        world.get_chunk(x, z)
+        latencies.append(time.perf_counter() - start)
+    stats = cache.stats()
+    lookups = stats.hits + stats.misses
+    return WorkloadRun(
+        latencies,
+        "chunk",
+        blocks_per_operation=world.chunk_size ** 2,
+        hit_rate=stats.hits / lookups if lookups else 0.0,
+        evictions=stats.evictions,
+    )
+
+def render_frame(rng: np.random.Generator, count: int, demo_path: Optional[str] = None) -> WorkloadRun:
+    """Render frames of the pygame demo while panning the camera randomly, with a headless video driver."""
+    demo_path = demo_path or os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "run_demo.py")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep stdout clean for the JSON results
+    spec = importlib.util.spec_from_file_location("run_demo", demo_path)
+    demo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(demo)
+
+    game = demo.Game()
+    latencies = []
+    try:
+        (game.camera_x, game.camera_y), = random_coords(rng, 1, 100_000)
+        for dx, dy in random_coords(rng, count, 16):
+            game.camera_x += dx
+            game.camera_y += dy
+            start = time.perf_counter()
+            game.render_world()
+            latencies.append(time.perf_counter() - start)
+    finally:
+        game.world.close()
+        demo.pygame.quit()
+    cells = -(-demo.SCREEN_WIDTH // game.block_size) * -(-demo.SCREEN_HEIGHT // game.block_size)
+    return WorkloadRun(latencies, "frame", blocks_per_operation=cells)
+
+WORKLOADS: Dict[str, Workload] = {
+    "chunk_generate": chunk_generate,
+    "region_cold": region_cold,
+    "region_warm": region_warm,
+    "get_block_random": get_block_random,
+    "cache_churn": cache_churn,
+    "render_frame": render_frame,
+}
+
+# Operations per workload for a full run; `--quick` divides these by 10
+DEFAULT_COUNTS = {
+    "chunk_generate": 2000,
+    "region_cold": 20,
+    "region_warm": 200,
+    "get_block_random": 100_000,
+    "cache_churn": 5000,
+    "render_frame": 200,
+}
+
+def summarize(run: WorkloadRun, peak_memory: int) -> dict:
+    """Throughput, latency percentiles and peak memory of a workload run."""
+    latencies = np.array(run.latencies)
+    total = float(latencies.sum())
+    result = {
+        "operations": len(latencies),
+        "unit": run.unit,
+        "total_seconds": total,
+        "operations_per_second": len(latencies) / total if total else 0.0,
+        "blocks_per_second": len(latencies) * run.blocks_per_operation / total if total else 0.0,
+        "latency_ms": {
+            "mean": float(latencies.mean()) * 1e3,
+            **{f"p{q}": float(np.percentile(latencies, q)) * 1e3 for q in (50, 90, 99)},
+            "max": float(latencies.max()) * 1e3,
+        },
+        "peak_memory_bytes": peak_memory,
+    }
+    result.update(run.extra)
+    return result
+
+def run_workload(workload: Workload, seed: int, count: int) -> dict:
+    """
+    Run a workload twice with the same seed: once timed, and once under tracemalloc for its peak memory,
+    since tracing allocations slows down Python-heavy workloads too much to time them at the same time.
+    """
+    gc.collect()
+    run = workload(np.random.default_rng(seed), count)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        workload(np.random.default_rng(seed), count)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return summarize(run, peak_memory)
+
+def run_benchmarks(
+    names: Optional[Iterable[str]] = None,
+    seed: int = DEFAULT_SEED,
+    counts: Optional[Dict[str, int]] = None,
+    scale: float = 1.0,
+) -> dict:
+    """Run the named workloads (all by default) and return the results as a JSON-serializable dict."""
+    counts = {**DEFAULT_COUNTS, **(counts or {})}
+    results = {}
+    for name in names or WORKLOADS:
+        count = max(1, int(counts[name] * scale))
+        try:
+            results[name] = run_workload(WORKLOADS[name], seed, count)
+        except ImportError as e:
+            results[name] = {"skipped": str(e)}  # e.g. the render workload without pygame
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "seed": seed,
+        "settings": BENCHMARK_SETTINGS._asdict(),
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "workloads": results,
+    }
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.1) -> List[str]:
+    """Describe every workload whose throughput dropped by more than `tolerance` relative to the baseline."""
+    regressions = []
+    for name, result in results["workloads"].items():
+        previous = baseline.get("workloads", {}).get(name)
+        if not previous or "skipped" in result or "skipped" in previous:
+            continue
+        before, after = previous["operations_per_second"], result["operations_per_second"]
+        if before and after < before * (1 - tolerance):
+            regressions.append(f"{name}: {after:.1f} {result['unit']}/s, was {before:.1f} ({after / before - 1:+.1%})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark worldgen workloads and report the results as JSON.")
+    parser.add_argument("workloads", nargs="*", help=f"workloads to run, any of {', '.join(WORKLOADS)} (default: all)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--quick", action="store_true", help="run a tenth of the default operations")
+    parser.add_argument("--output", help="write the results to this file instead of stdout")
+    parser.add_argument("--compare", metavar="BASELINE", help="exit with status 1 if throughput regressed against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed relative throughput drop (default: 0.1)")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"unknown workloads: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.workloads or None, seed=args.seed, scale=0.1 if args.quick else 1.0)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Iterator, NamedTuple, Optional, Set, Tuple
+from .chunk import Chunk
+
+EVICTION_POLICIES = ("lru", "clock")
+
+CacheStats = NamedTuple('CacheStats', [
+    ('chunks', int),
+    ('nbytes', int),
+    ('pinned', int),
+    ('hits', int),
+    ('misses', int),
+    ('evictions', int),
+])
+
+class ChunkCache(MutableMapping):
+    """
+    Mapping of chunk coordinates to chunks, optionally bounded by a chunk count and/or a byte budget.
+
+    When a bound is exceeded, unpinned chunks are evicted either in least-recently-used order ("lru")
+    or with the clock / second-chance algorithm ("clock"), which skips chunks read since the hand last
+    passed them. Only `get`, the lookup used by `World`, refreshes recency and records hits and misses.
+    """
+    def __init__(self, max_chunks: Optional[int] = None, max_bytes: Optional[int] = None, eviction: str = "lru"):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy {eviction!r}, expected one of {EVICTION_POLICIES}")
+        if max_chunks is not None and max_chunks < 0:
+            raise ValueError("max_chunks must not be negative")
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+
+        self.max_chunks = max_chunks
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+        self._chunks: "OrderedDict[Tuple[int, int], Chunk]" = OrderedDict()
+        self._referenced: Set[Tuple[int, int]] = set()  # Clock reference bits that are set
+        self._pinned: Set[Tuple[int, int]] = set()
+
+    def __getitem__(self, key: Tuple[int, int]) -> Chunk:
+        # Plain lookups (also used while iterating) leave recency and counters untouched
+        return self._chunks[key]
+
+    def __setitem__(self, key: Tuple[int, int], chunk: Chunk):
+        if key in self._chunks:
+            self.nbytes -= self._chunks[key].nbytes
+        self._chunks[key] = chunk
+        self._chunks.move_to_end(key)
+        self._referenced.discard(key)
+        self.nbytes += chunk.nbytes
+        self._evict()
+
+    def __delitem__(self, key: Tuple[int, int]):
+        chunk = self._chunks.pop(key)
+        self._referenced.discard(key)
+        self.nbytes -= chunk.nbytes
+
+    def __contains__(self, key) -> bool:
+        return key in self._chunks
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return iter(self._chunks)
+
+    def __len__(self) -> int:
+        return len(self._chunks)
+
+    def get(self, key: Tuple[int, int], default: Optional[Chunk] = None) -> Optional[Chunk]:
+        """Look up a chunk, recording a hit or a miss."""
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(key)
+        return chunk
+
+    def pin(self, key: Tuple[int, int]):
+        """Exempt a chunk from eviction. Chunks may be pinned before they are generated."""
+        self._pinned.add(key)
+
+    def unpin(self, key: Tuple[int, int]):
+        """Make a pinned chunk evictable again, evicting immediately if the cache is over budget."""
+        self._pinned.discard(key)
+        self._evict()
+
+    def is_pinned(self, key: Tuple[int, int]) -> bool:
+        return key in self._pinned
+
+    def stats(self) -> CacheStats:
+        """Snapshot of the cache size and counters."""
+        return CacheStats(
+            chunks=len(self._chunks),
+            nbytes=self.nbytes,
+            pinned=sum(1 for key in self._pinned if key in self._chunks),
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+        )
+
+    def reset_stats(self):
+        """Reset the hit, miss and eviction counters."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _touch(self, key: Tuple[int, int]):
+        if self.eviction == "lru":
+            self._chunks.move_to_end(key)
+        else:
+            self._referenced.add(key)
+
+    def _over_budget(self) -> bool:
+        if self.max_chunks is not None and len(self._chunks) > self.max_chunks:
+            return True
+        return self.max_bytes is not None and self.nbytes > self.max_bytes
+
+    def _evict(self):
+        """Evict unpinned chunks, oldest first, until the cache fits its bounds or only pinned chunks remain."""
+        if not self._over_budget():
+            return
+
+        # Every key is visited at most twice: once to clear its reference bit, once to evict it.
+        for _ in range(2 * len(self._chunks)):
+            if not self._over_budget():
+                return
+            key = next(iter(self._chunks))
+            if key in self._pinned or key in self._referenced:
+                # Pinned chunks and clock second chances go back behind the hand
+                self._referenced.discard(key)
+                self._chunks.move_to_end(key)
+                continue
+            del self[key]
+            self.evictions += 1
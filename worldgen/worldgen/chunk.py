@@ -1,6 +1,9 @@
+import math
 import numpy as np
-import noise
-from typing import NamedTuple
+from functools import lru_cache
+from operator import attrgetter
+from typing import NamedTuple, Optional
+from .perlin import pnoise2
 
 BuildSettings = NamedTuple('BuildSettings', [
     ('octaves', int),
@@ -9,61 +12,182 @@ BuildSettings = NamedTuple('BuildSettings', [
     ('ocean_threshold', float),
     ('river_threshold', float),
     ('mountain_threshold', float),
+    ('seed', Optional[int]),
 ])
+# Worlds without a seed reproduce the terrain of the `noise` package
+BuildSettings.__new__.__defaults__ = (None,)
+
+DEFAULT_BUILD_SETTINGS = BuildSettings(
+    octaves=6,
+    frequency=24.0,
+    amplitude=28.0,
+    ocean_threshold=0.5,
+    river_threshold=0.05,
+    mountain_threshold=0.7,
+)
+
+# Biome ids fit in a byte; 2-bit packing holds the four ids of `world.BLOCKS`
+TERRAIN_DTYPE = np.uint8
+PACKED_MAX_BLOCK = 3
+
+# Row b holds the four 2-bit values packed into byte b, lowest bits first
+_UNPACK_TABLE = ((np.arange(256)[:, None] >> np.array([0, 2, 4, 6])) & 3).astype(TERRAIN_DTYPE)
+
+def pack_terrain(terrain: np.ndarray) -> np.ndarray:
+    """Pack a terrain array of biome ids 0-3 into 2 bits per block, four blocks per byte in C order."""
+    flat = np.asarray(terrain, dtype=TERRAIN_DTYPE).ravel()
+    if flat.size and flat.max() > PACKED_MAX_BLOCK:
+        raise ValueError(f"Packed terrain only supports biome ids up to {PACKED_MAX_BLOCK}")
+    padded = np.zeros(-(-flat.size // 4) * 4, dtype=TERRAIN_DTYPE)
+    padded[:flat.size] = flat
+    quads = padded.reshape(-1, 4)
+    return quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+
+def unpack_terrain(packed, chunk_size: int, size_z: Optional[int] = None) -> np.ndarray:
+    """
+    Inverse of `pack_terrain` for a square chunk, or a (chunk_size, size_z) region when `size_z` is given.
+    Accepts an array or any bytes-like object.
+    """
+    size_z = chunk_size if size_z is None else size_z
+    packed = np.frombuffer(packed, dtype=TERRAIN_DTYPE)
+    return _UNPACK_TABLE[packed].ravel()[:chunk_size * size_z].reshape(chunk_size, size_z)
+
+def height_field(world_x: np.ndarray, world_z: np.ndarray, settings: BuildSettings, world_height: int = 64) -> np.ndarray:
+    """
+    Compute integer terrain heights for arrays of world coordinates (broadcast together).
+
+    Equivalent to `int(noise.pnoise2(x / frequency, z / frequency, octaves=octaves) * amplitude + world_height / 2)`
+    evaluated per block, with the permutation table of `settings.seed` for seeded worlds.
+    """
+    world_x = np.asarray(world_x, dtype=np.float64)
+    world_z = np.asarray(world_z, dtype=np.float64)
+    value = pnoise2(world_x / settings.frequency, world_z / settings.frequency, octaves=settings.octaves, seed=settings.seed)
+    height = np.multiply(value, settings.amplitude, dtype=np.float64)
+    height += world_height / 2
+    return height.astype(np.int64)  # Truncates toward zero, like int()
+
+def classify(height: np.ndarray, settings: BuildSettings, world_height: int = 64) -> np.ndarray:
+    """Map an array of heights to biome ids (0: Ocean, 1: River, 2: Grassland, 3: Mountain)."""
+    height = np.asarray(height)
+    if np.issubdtype(height.dtype, np.integer):
+        lowest, table = _biome_table(settings, world_height)
+        return table.take(height - lowest, mode="clip")
+    return _classify_thresholds(height, settings, world_height)
+
+@lru_cache(maxsize=None)
+def _biome_table(settings: BuildSettings, world_height: int):
+    """
+    Biome ids of the integer heights from the first height returned up to the first height above every
+    threshold. Lower heights are all Ocean and higher ones all Mountain, so clipped lookups are exact.
+    """
+    lowest = math.floor(settings.ocean_threshold * world_height) - 1
+    highest = math.ceil(max(
+        settings.ocean_threshold * world_height,
+        world_height / 2 + settings.river_threshold * world_height,
+        settings.mountain_threshold * world_height,
+    )) + 1
+    return lowest, _classify_thresholds(np.arange(lowest, highest + 1), settings, world_height)
+
+def _classify_thresholds(height: np.ndarray, settings: BuildSettings, world_height: int) -> np.ndarray:
+    """`classify` by comparing every height against the thresholds."""
+    ocean = height < settings.ocean_threshold * world_height
+    river = np.abs(height - (world_height / 2)) < settings.river_threshold * world_height
+    mountain = height > settings.mountain_threshold * world_height
+
+    # Later assignments are overridden by earlier ones, matching the if/elif chain priority.
+    terrain = np.full(height.shape, 2, dtype=TERRAIN_DTYPE)  # Grassland
+    terrain[mountain] = 3  # Mountain
+    terrain[river] = 1  # River
+    terrain[ocean] = 0  # Ocean
+    return terrain
+
+def generate_terrain(
+    origin_x: int,
+    origin_z: int,
+    size_x: int,
+    size_z: int,
+    settings: BuildSettings,
+    world_height: int = 64,
+) -> np.ndarray:
+    """Generate a (size_x, size_z) terrain array whose [0, 0] element is the block at (origin_x, origin_z)."""
+    world_x = np.arange(origin_x, origin_x + size_x)[:, None]
+    world_z = np.arange(origin_z, origin_z + size_z)[None, :]
+    return classify(height_field(world_x, world_z, settings, world_height), settings, world_height)
 
 class Chunk:
-    def __init__(self, x: int, z: int, chunk_size: int = 16, world_height: int = 64):
+    """
+    A square column of terrain, one biome id per block.
+
+    Terrain is stored as a uint8 array, or with `packed=True` as 2-bit biome ids (four blocks per byte)
+    in an immutable bytes object, which `terrain` unpacks on access through a lookup table. Bytes carry
+    far less per-object overhead than a small array. Build settings are shared by reference.
+    """
+    __slots__ = ("x", "z", "chunk_size", "world_height", "settings", "packed", "_terrain")
+
+    # Settings are read through the shared BuildSettings rather than copied onto every chunk
+    octaves = property(attrgetter("settings.octaves"))
+    frequency = property(attrgetter("settings.frequency"))
+    amplitude = property(attrgetter("settings.amplitude"))
+    ocean_threshold = property(attrgetter("settings.ocean_threshold"))
+    river_threshold = property(attrgetter("settings.river_threshold"))
+    mountain_threshold = property(attrgetter("settings.mountain_threshold"))
+    seed = property(attrgetter("settings.seed"))
+
+    def __init__(
+        self,
+        x: int,
+        z: int,
+        chunk_size: int = 16,
+        world_height: int = 64,
+        settings: BuildSettings = DEFAULT_BUILD_SETTINGS,
+        packed: bool = False,
+    ):
         self.x = x
         self.z = z
         self.chunk_size = chunk_size
         self.world_height = world_height
+        self.settings = settings
+        self.packed = packed
 
-        self.octaves = 6
-        self.frequency = 24.0
-        self.amplitude = 28.0
-        self.ocean_threshold = 0.5
-        self.river_threshold = 0.05
-        self.mountain_threshold = 0.7
-
-        self.terrain = np.zeros((chunk_size, chunk_size), dtype=int)
+        self.terrain = np.zeros((chunk_size, chunk_size), dtype=TERRAIN_DTYPE)
 
     def build_settings(self, settings: BuildSettings):
         """Set the build settings for this chunk."""
-        self.octaves = settings.octaves
-        self.frequency = settings.frequency
-        self.amplitude = settings.amplitude
-        self.ocean_threshold = settings.ocean_threshold
-        self.river_threshold = settings.river_threshold
-        self.mountain_threshold = settings.mountain_threshold
+        self.settings = settings
+
+    @property
+    def terrain(self) -> np.ndarray:
+        """The (chunk_size, chunk_size) biome id array, indexed [x, z]."""
+        if self.packed:
+            return unpack_terrain(self._terrain, self.chunk_size)
+        return self._terrain
+
+    @terrain.setter
+    def terrain(self, terrain: np.ndarray):
+        if self.packed:
+            self._terrain = pack_terrain(terrain).tobytes()
+        else:
+            self._terrain = terrain if terrain.dtype == TERRAIN_DTYPE else terrain.astype(TERRAIN_DTYPE)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by this chunk's terrain, in bytes."""
+        return len(self._terrain) if self.packed else self._terrain.nbytes
 
     def generate(self):
         """Generate terrain for this chunk using Perlin noise."""
-        for x in range(self.chunk_size):
-            for z in range(self.chunk_size):
-                world_x = x + self.x * self.chunk_size
-                world_z = z + self.z * self.chunk_size
-
-                # Generate Perlin noise value for this block
-                height = int(
-                    noise.pnoise2(
-                        world_x / self.frequency,
-                        world_z / self.frequency,
-                        octaves=self.octaves,
-                    )
-                    * self.amplitude
-                    + (self.world_height / 2)
-                )
-
-                # Determine biome based on height
-                if height < self.ocean_threshold * self.world_height:
-                    self.terrain[x, z] = 0  # Ocean
-                elif abs(height - (self.world_height / 2)) < self.river_threshold * self.world_height:
-                    self.terrain[x, z] = 1  # River
-                elif height > self.mountain_threshold * self.world_height:
-                    self.terrain[x, z] = 3  # Mountain
-                else:
-                    self.terrain[x, z] = 2  # Grassland
+        self.terrain = generate_terrain(
+            self.x * self.chunk_size,
+            self.z * self.chunk_size,
+            self.chunk_size,
+            self.chunk_size,
+            self.settings,
+            self.world_height,
+        )
 
     def get_block(self, x: int, z: int) -> int:
         """Get the block type at a specific position in the chunk."""
-        return self.terrain[x, z]
+        if self.packed:
+            index = x * self.chunk_size + z
+            return (self._terrain[index >> 2] >> ((index & 3) << 1)) & 3
+        return int(self._terrain[x, z])
@@ -0,0 +1,166 @@
+"""
+Streaming map export.
+
+Exports walk a region one chunk row (or one tile) at a time and write each piece out before generating
+the next, so memory use depends on the width of a row or the tile size but never on the size of the
+region. Terrain is generated straight from the world's build settings without going through its chunk
+cache, which would otherwise grow with the region.
+
+    python -m worldgen.export map.npy --region -50000 -50000 100000 100000 --colors --workers 8
+    python -m worldgen.export tiles/ --region 0 0 8192 8192 --tiles --tile-size 1024
+"""
+import argparse
+import os
+import struct
+import zlib
+from typing import Iterator, List, Optional
+import numpy as np
+from .chunk import DEFAULT_BUILD_SETTINGS, TERRAIN_DTYPE
+from .parallel import GenerationPool, generate_run
+from .world import BATCH_BLOCKS, COLOR_TABLE, World, _runs
+
+class RegionReader:
+    """
+    Generates arbitrary block rectangles of a world without caching them.
+
+    Each rectangle is generated as runs of chunks along z, like `World.generate_chunks`, serially or on a
+    process pool when `workers` is above 1.
+    """
+    def __init__(self, world: World, workers: int = 0):
+        self.settings = world.settings
+        self.chunk_size = world.chunk_size
+        self._pool = GenerationPool(self.settings, self.chunk_size, workers=workers) if workers > 1 else None
+
+    def read(self, world_x: int, world_z: int, size_x: int, size_z: int) -> np.ndarray:
+        """The (size_x, size_z) terrain of a block rectangle, like `World.get_region`."""
+        chunk_size = self.chunk_size
+        first_x, last_x = world_x // chunk_size, (world_x + size_x - 1) // chunk_size
+        first_z, last_z = world_z // chunk_size, (world_z + size_z - 1) // chunk_size
+        coords = [(x, z) for x in range(first_x, last_x + 1) for z in range(first_z, last_z + 1)]
+        runs = list(_runs(coords, max(1, BATCH_BLOCKS // (chunk_size * chunk_size))))
+        if self._pool is not None and len(runs) > 1:
+            results = self._pool.map(runs)
+        else:
+            results = ((run, generate_run(run, self.settings, chunk_size)) for run in runs)
+
+        covered = np.empty(((last_x - first_x + 1) * chunk_size, (last_z - first_z + 1) * chunk_size), dtype=TERRAIN_DTYPE)
+        for (chunk_x, start_z, count), terrain in results:
+            x0 = (chunk_x - first_x) * chunk_size
+            z0 = (start_z - first_z) * chunk_size
+            covered[x0:x0 + chunk_size, z0:z0 + count * chunk_size] = terrain
+        offset_x, offset_z = world_x - first_x * chunk_size, world_z - first_z * chunk_size
+        return covered[offset_x:offset_x + size_x, offset_z:offset_z + size_z]
+
+    def rows(self, world_x: int, world_z: int, size_x: int, size_z: int) -> Iterator[np.ndarray]:
+        """Yield a region in consecutive strips along x, each ending on a chunk boundary."""
+        x = world_x
+        while x < world_x + size_x:
+            end = min(world_x + size_x, (x // self.chunk_size + 1) * self.chunk_size)
+            yield self.read(x, world_z, end - x, size_z)
+            x = end
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+
+    def __enter__(self) -> "RegionReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def export_array(
+    world: World,
+    path: str,
+    world_x: int,
+    world_z: int,
+    size_x: int,
+    size_z: int,
+    colors: bool = False,
+    raw: bool = False,
+    workers: int = 0,
+):
+    """
+    Write a region to a single file, indexed [x, z] like `World.get_region`.
+
+    The file holds biome ids (uint8), or RGB colors from `COLOR_TABLE` with `colors`, and is written as
+    `.npy` unless `raw` asks for bare C-order bytes. Both layouts store x-major rows contiguously, so
+    each chunk row is appended with one sequential write.
+    """
+    if size_x < 0 or size_z < 0:
+        raise ValueError("Region size must not be negative")
+    shape = (size_x, size_z, 3) if colors else (size_x, size_z)
+    with open(path, "wb") as f, RegionReader(world, workers) as reader:
+        if not raw:
+            header = {"descr": np.lib.format.dtype_to_descr(np.dtype(TERRAIN_DTYPE)), "fortran_order": False, "shape": shape}
+            np.lib.format.write_array_header_2_0(f, header)
+        if size_x and size_z:
+            for rows in reader.rows(world_x, world_z, size_x, size_z):
+                f.write((COLOR_TABLE[rows] if colors else rows).tobytes())
+
+def export_tiles(
+    world: World,
+    directory: str,
+    world_x: int,
+    world_z: int,
+    size_x: int,
+    size_z: int,
+    tile_size: int = 1024,
+    workers: int = 0,
+) -> List[str]:
+    """
+    Write a region as PNG tiles of `tile_size` blocks per side named `tile.{i}.{j}.png`, where tile
+    (i, j) starts at block (world_x + i * tile_size, world_z + j * tile_size). Images are oriented like
+    the demo: x runs to the right and z downwards. Edge tiles are cropped to the region. Returns the
+    paths written.
+    """
+    if size_x < 0 or size_z < 0:
+        raise ValueError("Region size must not be negative")
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    with RegionReader(world, workers) as reader:
+        for i, x in enumerate(range(world_x, world_x + size_x, tile_size)):
+            for j, z in enumerate(range(world_z, world_z + size_z, tile_size)):
+                terrain = reader.read(x, z, min(tile_size, world_x + size_x - x), min(tile_size, world_z + size_z - z))
+                path = os.path.join(directory, f"tile.{i}.{j}.png")
+                write_png(path, COLOR_TABLE[terrain.T])
+                paths.append(path)
+    return paths
+
+def write_png(path: str, rgb: np.ndarray):
+    """Write a (height, width, 3) uint8 array as an 8-bit RGB PNG."""
+    height, width, _ = rgb.shape
+    # Every scanline is prefixed with filter type 0 (none)
+    scanlines = np.empty((height, 1 + width * 3), dtype=np.uint8)
+    scanlines[:, 0] = 0
+    scanlines[:, 1:] = rgb.reshape(height, width * 3)
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Export a world region to a .npy/raw file or PNG tiles.")
+    parser.add_argument("output", help="output file, or directory with --tiles")
+    parser.add_argument("--region", nargs=4, type=int, required=True, metavar=("X", "Z", "SIZE_X", "SIZE_Z"))
+    parser.add_argument("--seed", type=int, help="world seed (default: the unseeded world)")
+    parser.add_argument("--colors", action="store_true", help="write RGB colors instead of biome ids")
+    parser.add_argument("--raw", action="store_true", help="write bare bytes without a .npy header")
+    parser.add_argument("--tiles", action="store_true", help="write PNG tiles into the output directory")
+    parser.add_argument("--tile-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=0, help="generate on this many processes")
+    args = parser.parse_args(argv)
+
+    world = World(DEFAULT_BUILD_SETTINGS._replace(seed=args.seed))
+    if args.tiles:
+        export_tiles(world, args.output, *args.region, tile_size=args.tile_size, workers=args.workers)
+    else:
+        export_array(world, args.output, *args.region, colors=args.colors, raw=args.raw, workers=args.workers)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import threading
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+import numpy as np
+from .chunk import Chunk
+
+if TYPE_CHECKING:
+    from .world import World
+
+# Chunk summaries kept by default; about 9 MiB, covering a 4096x4096 block area with 16x16 chunks
+MAX_INDEXED_CHUNKS = 1 << 16
+
+class BiomeIndex:
+    """
+    Per-chunk biome summaries of the chunks a world has generated or loaded most recently.
+
+    For each chunk the index keeps the number of blocks of every biome and, per biome, the bounding box
+    of those blocks within the chunk. Summaries live in flat arrays of the smallest dtypes that fit the
+    chunk size and they outlive cache evictions, so queries can skip whole chunks without touching their
+    terrain: `nearest` only opens chunks whose bounding box could beat the best match so far, and
+    `counts` only reads terrain for border chunks whose boxes straddle the edge of the region.
+
+    Memory grows by about 140 bytes per indexed chunk with the 8 built-in biomes (6 bytes per biome in the
+    summary arrays, the rest is the coordinates and the dict entry) until `max_chunks` chunks are indexed;
+    from then on each new summary overwrites the oldest one. With None the index keeps growing with every
+    chunk ever generated.
+    """
+    def __init__(self, world: "World", biomes: int, max_chunks: Optional[int] = MAX_INDEXED_CHUNKS):
+        if max_chunks is not None and max_chunks <= 0:
+            raise ValueError("max_chunks must be positive")
+        self.world = world
+        self.biomes = biomes
+        self.max_chunks = max_chunks
+
+        chunk_size = world.chunk_size
+        self._rows: Dict[int, int] = {}  # Packed chunk coordinates -> row of the summary arrays
+        self._coords = np.empty((0, 2), dtype=np.int32)
+        self._counts = np.empty((0, biomes), dtype=np.min_scalar_type(chunk_size * chunk_size))
+        # Local (min_x, max_x, min_z, max_z); meaningless where the count is 0
+        self._bounds = np.empty((0, biomes, 4), dtype=np.min_scalar_type(chunk_size - 1))
+        self._next = 0  # Row written next once the index is full
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, coord: Tuple[int, int]) -> bool:
+        return _key(*coord) in self._rows
+
+    def add(self, chunks: Dict[Tuple[int, int], Chunk]):
+        """Summarize chunks that are not indexed yet."""
+        with self._lock:
+            new = [(coord, chunk) for coord, chunk in chunks.items() if _key(*coord) not in self._rows]
+        if not new:
+            return
+        counts, bounds = summarize(np.stack([chunk.terrain for _, chunk in new]), self.biomes)
+        with self._lock:
+            self._store([coord for coord, _ in new], counts, bounds)
+
+    def summary(self, x: int, z: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """The (counts, bounds) summary of an indexed chunk, as returned by `summarize`, or None."""
+        with self._lock:
+            row = self._rows.get(_key(x, z))
+            if row is None:
+                return None
+            counts, bounds = self._counts[row].astype(np.int32), self._bounds[row].astype(np.int64)
+        bounds[counts == 0] = -1
+        return counts, bounds
+
+    def nearest(
+        self,
+        biome: int,
+        world_x: int,
+        world_z: int,
+        max_distance: Optional[float] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """
+        World coordinates of the indexed block of `biome` closest to (world_x, world_z), or None.
+
+        Only chunks that have already been generated are searched; generate an area first (e.g. with
+        `World.get_region`) to search all of it. Distances are Euclidean, in blocks.
+        """
+        with self._lock:
+            n = len(self._rows)
+            coords, counts, bounds = self._coords[:n].astype(np.int64), self._counts[:n, biome].copy(), self._bounds[:n, biome].astype(np.int64)
+        candidates = np.flatnonzero(counts > 0)
+        if len(candidates) == 0:
+            return None
+
+        # Lower bound of the squared distance from the point to each candidate's biome bounding box
+        chunk_size = self.world.chunk_size
+        origin = coords[candidates] * chunk_size
+        box = bounds[candidates]
+        dx = np.maximum(np.maximum(origin[:, 0] + box[:, 0] - world_x, world_x - origin[:, 0] - box[:, 1]), 0)
+        dz = np.maximum(np.maximum(origin[:, 1] + box[:, 2] - world_z, world_z - origin[:, 1] - box[:, 3]), 0)
+        bound = dx * dx + dz * dz
+        if max_distance is not None:
+            keep = bound <= max_distance * max_distance
+            candidates, bound = candidates[keep], bound[keep]
+
+        best, best_distance = None, np.inf if max_distance is None else max_distance * max_distance
+        for i in np.argsort(bound, kind="stable"):
+            if bound[i] > best_distance:
+                break  # Every remaining chunk is at least this far away
+            chunk_x, chunk_z = map(int, coords[candidates[i]])
+            local_x, local_z = np.nonzero(self.world.get_chunk(chunk_x, chunk_z).terrain == biome)
+            block_x = local_x + chunk_x * chunk_size
+            block_z = local_z + chunk_z * chunk_size
+            distances = (block_x - world_x) ** 2 + (block_z - world_z) ** 2
+            j = int(np.argmin(distances))
+            if distances[j] < best_distance or (best is None and distances[j] <= best_distance):
+                best, best_distance = (int(block_x[j]), int(block_z[j])), distances[j]
+        return best
+
+    def counts(self, world_x: int, world_z: int, size_x: int, size_z: int) -> np.ndarray:
+        """
+        Number of blocks of each biome in a rectangular block region, as an array indexed by biome id.
+
+        Chunks of the region that are not indexed yet are generated first. Chunks entirely inside the
+        region are counted from their summaries; border chunks only read terrain when the bounding box of
+        some biome crosses the region's edge.
+        """
+        if size_x < 0 or size_z < 0:
+            raise ValueError("Region size must not be negative")
+        total = np.zeros(self.biomes, dtype=np.int64)
+        if size_x == 0 or size_z == 0:
+            return total
+
+        chunk_size = self.world.chunk_size
+        first_x, last_x = world_x // chunk_size, (world_x + size_x - 1) // chunk_size
+        first_z, last_z = world_z // chunk_size, (world_z + size_z - 1) // chunk_size
+        coords = [(x, z) for x in range(first_x, last_x + 1) for z in range(first_z, last_z + 1)]
+        with self._lock:
+            missing = [coord for coord in coords if _key(*coord) not in self._rows]
+        if missing:
+            self.world.get_chunks(missing)  # Generating or loading them indexes them
+
+        counts = np.empty((len(coords), self.biomes), dtype=np.int64)
+        bounds = np.empty((len(coords), self.biomes, 4), dtype=np.int64)
+        with self._lock:
+            rows = [self._rows.get(_key(*coord), -1) for coord in coords]
+            found = np.flatnonzero(np.array(rows) >= 0)
+            counts[found] = self._counts[[rows[i] for i in found]]
+            bounds[found] = self._bounds[[rows[i] for i in found]]
+        # Chunks that were not indexed, or whose summaries were already overwritten by other chunks of a
+        # region larger than the index, are summarized here
+        unindexed = [i for i, row in enumerate(rows) if row < 0]
+        if unindexed:
+            chunks = self.world.get_chunks([coords[i] for i in unindexed])
+            counts[unindexed], bounds[unindexed] = summarize(np.stack([chunks[coords[i]].terrain for i in unindexed]), self.biomes)
+        chunk_coords = np.array(coords, dtype=np.int64)
+
+        # Region in chunk-local coordinates of every chunk, as inclusive (min_x, max_x, min_z, max_z)
+        origin = chunk_coords * chunk_size
+        x0 = world_x - origin[:, 0]
+        x1 = world_x + size_x - 1 - origin[:, 0]
+        z0 = world_z - origin[:, 1]
+        z1 = world_z + size_z - 1 - origin[:, 1]
+        present = counts > 0
+        inside = (
+            (bounds[..., 0] >= x0[:, None]) & (bounds[..., 1] <= x1[:, None])
+            & (bounds[..., 2] >= z0[:, None]) & (bounds[..., 3] <= z1[:, None])
+        )
+        outside = (
+            (bounds[..., 1] < x0[:, None]) | (bounds[..., 0] > x1[:, None])
+            | (bounds[..., 3] < z0[:, None]) | (bounds[..., 2] > z1[:, None])
+        )
+        # Biomes whose blocks are all inside or all outside the region are counted from the summary
+        total += np.where(present & inside, counts, 0).sum(axis=0)
+
+        straddling = present & ~inside & ~outside
+        border = np.flatnonzero(straddling.any(axis=1))
+        if len(border):
+            # Count the straddling biomes of all border chunks at once, masking out blocks beyond the region
+            border_coords = [coords[i] for i in border]
+            chunks = self.world.get_chunks(border_coords)
+            terrain = np.stack([chunks[coord].terrain for coord in border_coords])
+            local = np.arange(chunk_size)
+            mask = (
+                ((local >= x0[border, None]) & (local <= x1[border, None]))[:, :, None]
+                & ((local >= z0[border, None]) & (local <= z1[border, None]))[:, None, :]
+            )
+            for biome in np.flatnonzero(straddling[border].any(axis=0)):
+                total[biome] += ((terrain == biome) & mask)[straddling[border, biome]].sum()
+        return total
+
+    def _store(self, coords, counts: np.ndarray, bounds: np.ndarray):
+        """Write summaries into free rows, overwriting the oldest ones once `max_chunks` are indexed."""
+        if self.max_chunks is not None and len(coords) > self.max_chunks:
+            coords, counts, bounds = coords[-self.max_chunks:], counts[-self.max_chunks:], bounds[-self.max_chunks:]
+        for coord, count, bound in zip(coords, counts, bounds):
+            key = _key(*coord)
+            if key in self._rows:
+                continue
+            size = len(self._rows)
+            if self.max_chunks is None or size < self.max_chunks:
+                self._reserve(size + 1)
+                row = size
+            else:
+                row = self._next
+                self._next = (row + 1) % self.max_chunks
+                del self._rows[_key(*self._coords[row])]
+            self._coords[row] = coord
+            self._counts[row] = count
+            self._bounds[row] = np.maximum(bound, 0)  # Absent biomes are marked by their zero count
+            self._rows[key] = row
+
+    def _reserve(self, size: int):
+        """Grow the summary arrays geometrically so adding chunks stays amortized O(1)."""
+        capacity = len(self._coords)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 64)
+        if self.max_chunks is not None:
+            capacity = min(capacity, self.max_chunks)
+        for name in ("_coords", "_counts", "_bounds"):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+def _key(x: int, z: int) -> int:
+    """Chunk coordinates packed into one int, a smaller dict key than a tuple."""
+    return (int(x) << 32) ^ (int(z) & 0xFFFFFFFF)
+
+def summarize(terrain: np.ndarray, biomes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Block counts (n, biomes) and local bounding boxes (n, biomes, 4) of a stack of (n, size, size) terrains.
+
+    Boxes are inclusive (min_x, max_x, min_z, max_z) and -1 for biomes a chunk does not contain.
+    """
+    n, size_x, size_z = terrain.shape
+    counts = np.empty((n, biomes), dtype=np.int32)
+    bounds = np.full((n, biomes, 4), -1, dtype=np.int64)
+    for biome in range(biomes):
+        mask = terrain == biome
+        counts[:, biome] = mask.sum(axis=(1, 2))
+        present = counts[:, biome] > 0
+        rows = mask.any(axis=2)  # (n, size_x): which x contain the biome
+        columns = mask.any(axis=1)  # (n, size_z)
+        bounds[present, biome, 0] = rows.argmax(axis=1)[present]
+        bounds[present, biome, 1] = size_x - 1 - rows[:, ::-1].argmax(axis=1)[present]
+        bounds[present, biome, 2] = columns.argmax(axis=1)[present]
+        bounds[present, biome, 3] = size_z - 1 - columns[:, ::-1].argmax(axis=1)[present]
+    return counts, bounds
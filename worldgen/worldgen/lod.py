@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Tuple
+import numpy as np
+from .chunk import TERRAIN_DTYPE, classify, height_field
+
+if TYPE_CHECKING:
+    from .world import World
+
+# Noise samples evaluated per batch when sampling a coarse tile (see `world.BATCH_BLOCKS`)
+SAMPLE_BATCH = 4096
+
+# Coarse tiles are built from cached chunks instead of noise only when they cover at most this many chunks
+MAX_DOWNSAMPLE_CHUNKS = 4096
+
+class OverviewPyramid:
+    """
+    Level-of-detail pyramid of square overview tiles for a world.
+
+    A tile at level L has `tile_size` pixels per side and each pixel is the block at a multiple of 2**L,
+    so it spans `tile_size * 2**L` blocks. Level 0 tiles are read from full chunks through the world;
+    coarser tiles sample the noise field only at their pixel positions, or downsample the world's chunks
+    when all of them are already cached, and never generate chunks. Both ways produce exactly the blocks
+    full-resolution generation would. Tiles of every level share one LRU cache of `max_tiles` tiles.
+    """
+    def __init__(self, world: "World", tile_size: int = 256, max_tiles: int = 256):
+        self.world = world
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles
+        self.tiles: "OrderedDict[Tuple[int, int, int], np.ndarray]" = OrderedDict()
+
+    def tile_span(self, level: int) -> int:
+        """Number of blocks covered by one side of a tile at the given level."""
+        return self.tile_size << level
+
+    def level_for(self, blocks_per_pixel: float) -> int:
+        """Coarsest level whose pixels are no larger than `blocks_per_pixel` blocks."""
+        level = 0
+        while (2 << level) <= blocks_per_pixel:
+            level += 1
+        return level
+
+    def get_tile(self, level: int, tile_x: int, tile_z: int) -> np.ndarray:
+        """Get the (tile_size, tile_size) tile at the given level and tile coordinates."""
+        if level < 0:
+            raise ValueError("Level must not be negative")
+        key = (level, tile_x, tile_z)
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.tiles.move_to_end(key)
+            return tile
+
+        tile = self._build_tile(level, tile_x, tile_z)
+        tile.flags.writeable = False
+        self.tiles[key] = tile
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def get_overview(self, world_x: int, world_z: int, size_x: int, size_z: int, level: int) -> np.ndarray:
+        """
+        Get a region at the given level of detail.
+
+        Pixel [i, j] is the block at ((world_x // step + i) * step, (world_z // step + j) * step) with
+        step = 2**level, and the result covers every block in the requested region.
+        """
+        if size_x < 0 or size_z < 0:
+            raise ValueError("Region size must not be negative")
+        step = 1 << level
+        first_x, first_z = world_x // step, world_z // step
+        pixels_x = -(-(world_x + size_x) // step) - first_x if size_x else 0
+        pixels_z = -(-(world_z + size_z) // step) - first_z if size_z else 0
+
+        overview = np.empty((pixels_x, pixels_z), dtype=TERRAIN_DTYPE)
+        if pixels_x == 0 or pixels_z == 0:
+            return overview
+        for tile_x in range(first_x // self.tile_size, (first_x + pixels_x - 1) // self.tile_size + 1):
+            for tile_z in range(first_z // self.tile_size, (first_z + pixels_z - 1) // self.tile_size + 1):
+                tile = self.get_tile(level, tile_x, tile_z)
+                # Overlap of this tile with the overview, in level pixels
+                x0 = max(first_x, tile_x * self.tile_size)
+                x1 = min(first_x + pixels_x, (tile_x + 1) * self.tile_size)
+                z0 = max(first_z, tile_z * self.tile_size)
+                z1 = min(first_z + pixels_z, (tile_z + 1) * self.tile_size)
+                overview[x0 - first_x:x1 - first_x, z0 - first_z:z1 - first_z] = tile[
+                    x0 - tile_x * self.tile_size:x1 - tile_x * self.tile_size,
+                    z0 - tile_z * self.tile_size:z1 - tile_z * self.tile_size,
+                ]
+        return overview
+
+    def clear(self):
+        self.tiles.clear()
+
+    def _build_tile(self, level: int, tile_x: int, tile_z: int) -> np.ndarray:
+        span = self.tile_span(level)
+        origin_x, origin_z = tile_x * span, tile_z * span
+        if level == 0:
+            return self.world.get_region(origin_x, origin_z, span, span)
+
+        step = 1 << level
+        if self._chunks_cached(origin_x, origin_z, span):
+            return np.ascontiguousarray(self.world.get_region(origin_x, origin_z, span, span)[::step, ::step])
+
+        settings = self.world.settings
+        world_x = origin_x + np.arange(self.tile_size) * step
+        world_z = origin_z + np.arange(self.tile_size) * step
+        tile = np.empty((self.tile_size, self.tile_size), dtype=TERRAIN_DTYPE)
+        rows = max(1, SAMPLE_BATCH // self.tile_size)
+        for start in range(0, self.tile_size, rows):
+            height = height_field(world_x[start:start + rows, None], world_z[None, :], settings)
+            tile[start:start + rows] = classify(height, settings)
+        return tile
+
+    def _chunks_cached(self, origin_x: int, origin_z: int, span: int) -> bool:
+        """Whether every chunk under a tile is already cached, for tiles small enough to check."""
+        chunk_size = self.world.chunk_size
+        xs = range(origin_x // chunk_size, (origin_x + span - 1) // chunk_size + 1)
+        zs = range(origin_z // chunk_size, (origin_z + span - 1) // chunk_size + 1)
+        if len(xs) * len(zs) > MAX_DOWNSAMPLE_CHUNKS:
+            return False
+        chunks = self.world.chunks
+        return all((x, z) in chunks for x in xs for z in zs)
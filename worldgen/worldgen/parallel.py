@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from .chunk import BuildSettings, generate_terrain
+
+# (chunk_x, start_z, count): `count` neighbouring chunks along z starting at (chunk_x, start_z)
+Run = Tuple[int, int, int]
+
+def generate_run(run: Run, settings: BuildSettings, chunk_size: int, world_height: int = 64) -> np.ndarray:
+    """Generate the (chunk_size, count * chunk_size) terrain of a run of chunks with one noise evaluation."""
+    chunk_x, start_z, count = run
+    return generate_terrain(
+        chunk_x * chunk_size,
+        start_z * chunk_size,
+        chunk_size,
+        count * chunk_size,
+        settings,
+        world_height,
+    )
+
+# Per-process generation parameters, set once by the pool initializer
+_worker_args: Optional[Tuple[BuildSettings, int, int]] = None
+
+def _initialize_worker(settings: BuildSettings, chunk_size: int, world_height: int):
+    global _worker_args
+    _worker_args = (settings, chunk_size, world_height)
+
+def _generate_runs(runs: List[Run]) -> List[np.ndarray]:
+    return [generate_run(run, *_worker_args) for run in runs]
+
+class GenerationPool:
+    """
+    Process pool that generates chunk terrain in parallel.
+
+    Each worker receives the build settings once when it starts; tasks only carry run coordinates and
+    results come back as uint8 terrain arrays, never as pickled chunks. Runs are grouped into tasks of
+    `runs_per_task` to amortise inter-process overhead. Generation is a pure function of the settings and
+    coordinates, so the output is identical to serial generation.
+    """
+    def __init__(
+        self,
+        settings: BuildSettings,
+        chunk_size: int = 16,
+        world_height: int = 64,
+        workers: Optional[int] = None,
+        runs_per_task: int = 8,
+    ):
+        self.settings = settings
+        self.chunk_size = chunk_size
+        self.world_height = world_height
+        self.runs_per_task = runs_per_task
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialize_worker,
+            initargs=(settings, chunk_size, world_height),
+        )
+
+    def map(self, runs: Iterable[Run]) -> Iterator[Tuple[Run, np.ndarray]]:
+        """Generate the given runs, yielding (run, terrain) pairs in input order."""
+        runs = list(runs)
+        tasks = [runs[i:i + self.runs_per_task] for i in range(0, len(runs), self.runs_per_task)]
+        for task, results in zip(tasks, self._executor.map(_generate_runs, tasks)):
+            yield from zip(task, results)
+
+    def close(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "GenerationPool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,232 @@
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Gradient and permutation tables, identical to the ones compiled into the
+# `noise` package so that array evaluation reproduces `noise.pnoise2` exactly.
+GRAD3 = np.array([
+    [1, 1, 0], [-1, 1, 0], [1, -1, 0], [-1, -1, 0],
+    [1, 0, 1], [-1, 0, 1], [1, 0, -1], [-1, 0, -1],
+    [0, 1, 1], [0, -1, 1], [0, 1, -1], [0, -1, -1],
+    [1, 0, -1], [-1, 0, -1], [0, -1, 1], [0, 1, 1],
+], dtype=np.float32)
+
+_PERM_256 = [
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225, 140,
+    36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148, 247, 120,
+    234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32, 57, 177, 33,
+    88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175, 74, 165, 71,
+    134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122, 60, 211, 133,
+    230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54, 65, 25, 63, 161,
+    1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169, 200, 196, 135, 130,
+    116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64, 52, 217, 226, 250,
+    124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212, 207, 206, 59, 227,
+    47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213, 119, 248, 152, 2, 44,
+    154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9, 129, 22, 39, 253, 19, 98,
+    108, 110, 79, 113, 224, 232, 178, 185, 112, 104, 218, 246, 97, 228, 251, 34,
+    242, 193, 238, 210, 144, 12, 191, 179, 162, 241, 81, 51, 145, 235, 249, 14,
+    239, 107, 49, 192, 214, 31, 181, 199, 106, 157, 184, 84, 204, 176, 115, 121,
+    50, 45, 127, 4, 150, 254, 138, 236, 205, 93, 222, 114, 67, 29, 24, 72, 243,
+    141, 128, 195, 78, 66, 215, 61, 156, 180,
+]
+PERM = np.array(_PERM_256 * 2, dtype=np.intp)
+
+@lru_cache(maxsize=None)
+def permutation(seed: Optional[int] = None) -> np.ndarray:
+    """
+    The doubled 512-entry permutation table for a seed.
+
+    Without a seed this is `PERM`, the table of the `noise` package; any non-negative integer seed gives
+    a different shuffle of 0..255, and so an entirely different noise field.
+    """
+    if seed is None:
+        return PERM
+    shuffled = np.random.default_rng(seed).permutation(256)
+    return np.concatenate([shuffled, shuffled]).astype(np.intp)
+
+
+# Row stride of the gradient table, which repeats lattice row and column 0 after 255 so that the
+# corners (i + 1, j), (i, j + 1) and (i + 1, j + 1) sit at fixed offsets from corner (i, j)
+STRIDE = 257
+CORNER_OFFSETS = (0, STRIDE, 1, STRIDE + 1)
+
+@lru_cache(maxsize=None)
+def _gradient_tables(base: int, seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Flattened gradient tables for lattice corner (i, j), i.e. GRAD3[PERM[PERM[PERM[i] + j]] & 15], indexed
+    by i * STRIDE + j.
+
+    Folding the chained permutation lookups into one table means each corner costs a single gather
+    per gradient component instead of three dependent lookups.
+    """
+    perm = permutation(seed)
+    corner = np.arange(STRIDE) & 255
+    hashes = perm[perm[perm[corner + base][:, None] + corner[None, :] + base]] & 15
+    return GRAD3[hashes, 0].ravel(), GRAD3[hashes, 1].ravel()
+
+
+@lru_cache(maxsize=None)
+def _octave_parameters(octaves: int, persistence: float, lacunarity: float) -> Tuple[np.ndarray, np.ndarray, np.float32]:
+    """Per-octave frequencies and amplitudes plus their amplitude sum, accumulated in float32 like the C loop."""
+    freq = np.float32(1.0)
+    amp = np.float32(1.0)
+    max_amp = np.float32(0.0)
+    freqs, amps = [], []
+    for _ in range(octaves):
+        freqs.append(freq)
+        amps.append(amp)
+        max_amp = max_amp + amp
+        freq = freq * np.float32(lacunarity)
+        amp = amp * np.float32(persistence)
+    return np.array(freqs, dtype=np.float32), np.array(amps, dtype=np.float32), max_amp
+
+
+def _fade(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def _lerp_into(t: np.ndarray, a: np.ndarray, b: np.ndarray):
+    """a + t * (b - a), written to b."""
+    b -= a
+    b *= t
+    b += a
+
+
+def _lattice(x: np.ndarray, floor_x: np.ndarray, repeat) -> Tuple[np.ndarray, np.ndarray]:
+    """Wrapped lattice coordinates (i & 255, ii & 255) as computed by `noise2` in _perlin.c."""
+    if not np.any(np.fmod(repeat, 256)):
+        # Repeat periods that are multiples of 256 vanish under `& 255`, so the
+        # wrapped coordinates reduce to the plain floor without any fmodf calls.
+        i = floor_x.astype(np.intp)
+        return i & 255, (i + 1) & 255
+    i = np.floor(np.fmod(x, repeat)).astype(np.intp)
+    ii = np.fmod((i + 1).astype(np.float32), repeat).astype(np.intp)
+    return i & 255, ii & 255
+
+
+def _axis_terms(t: np.ndarray, repeat, scale: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    """
+    Per-axis terms of `noise2` in _perlin.c for coordinates `t`: the wrapped lattice coordinates of the
+    lower and upper cell corner stacked on a new first axis (times `scale`), the offsets from those
+    corners stacked the same way, the fade curve of the lower offset, and whether the upper corner is
+    always the lattice neighbour of the lower one (which `STRIDE` makes true across 255 too).
+    """
+    floor_t = np.floor(t)
+    i, ii = _lattice(t, floor_t, repeat)
+    offset = t - floor_t
+    return np.stack([i, ii]) * scale, np.stack([offset, offset - 1]), _fade(offset), np.array_equal(ii, (i + 1) & 255)
+
+
+# Longest coordinate vector whose axis terms are cached, enough for the axes of single chunks
+MAX_CACHED_AXIS = 64
+
+@lru_cache(maxsize=1024)
+def _vector_terms(
+    coords: bytes,
+    shape: Tuple[int, ...],
+    octaves: int,
+    persistence: float,
+    lacunarity: float,
+    repeat: np.float32,
+    scale: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    """`_axis_terms` of every octave of a coordinate vector, cached because neighbouring chunks share their axes."""
+    freqs = _octave_parameters(octaves, persistence, lacunarity)[0].reshape((octaves,) + (1,) * len(shape))
+    terms = _axis_terms(np.frombuffer(coords, dtype=np.float32).reshape(shape) * freqs, repeat * freqs, scale)
+    for term in terms[:3]:
+        term.flags.writeable = False
+    return terms
+
+
+def _octave_terms(t: np.ndarray, octaves: int, persistence: float, lacunarity: float, repeat: np.float32, scale: int):
+    """`_axis_terms` of coordinates `t` scaled to every octave, stacked on the axis after the corner axis."""
+    if t.size == max(t.shape, default=1) and t.size <= MAX_CACHED_AXIS:
+        # Short vectors, such as the axes of a chunk, are cached; a chunk shares them with its row and column
+        return _vector_terms(t.tobytes(), t.shape, octaves, persistence, lacunarity, repeat, scale)
+    freqs = _octave_parameters(octaves, persistence, lacunarity)[0].reshape((octaves,) + (1,) * t.ndim)
+    return _axis_terms(t * freqs, repeat * freqs, scale)
+
+
+def _noise2(x_terms, y_terms, base: int, seed: Optional[int] = None) -> np.ndarray:
+    """
+    2D Perlin noise (mirrors `noise2` in _perlin.c) from the `_axis_terms` of both axes.
+
+    Works in place on preallocated buffers: at batch sizes, allocating a fresh temporary for every
+    step costs about as much as the arithmetic. Sums and products only swap operands, which leaves
+    the float32 results unchanged.
+    """
+    grad_x, grad_y = _gradient_tables(base, seed)
+    (i, ii), (x, x1), fx, x_next = x_terms
+    (j, jj), (y, y1), fy, y_next = y_terms
+    if x_next and y_next:
+        # Without wrapping inside the grid every corner sits at a fixed offset from the lower one, so one
+        # index array serves all four gathers
+        aa = i + j
+        corners = [(aa, offset) for offset in CORNER_OFFSETS]
+    else:
+        corners = [(i + j, 0), (ii + j, 0), (i + jj, 0), (ii + jj, 0)]
+
+    # Gradient dot products of the corners aa, ba, ab and bb, as x * gx + y * gy
+    dots = np.empty((2, 2) + np.broadcast_shapes(x.shape, y.shape), dtype=np.float32)
+    products = np.empty(dots.shape[2:], dtype=np.float32)
+    for dot, (corner, offset), corner_x, corner_y in zip(dots.reshape((4,) + products.shape), corners, (x, x1, x, x1), (y, y, y1, y1)):
+        grad_x[offset:].take(corner, out=dot, mode="clip")
+        dot *= corner_x
+        grad_y[offset:].take(corner, out=products, mode="clip")
+        products *= corner_y
+        dot += products
+
+    # Interpolate along x for both y corners at once, then along y
+    _lerp_into(fx, dots[:, 0], dots[:, 1])
+    _lerp_into(fy, dots[0, 1], dots[1, 1])
+    return dots[1, 1]
+
+
+def pnoise2(
+    x,
+    y,
+    octaves: int = 1,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+    repeatx: float = 1024,
+    repeaty: float = 1024,
+    base: int = 0,
+    seed: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Array version of `noise.pnoise2`.
+
+    Evaluates fractal Perlin noise for every element of `x` and `y` broadcast together, in float32 and
+    following the same operation order as the C implementation, so results are bit-identical to calling
+    `noise.pnoise2` once per point. Passing an outer grid as a column `x` and a row `y` keeps all
+    per-axis work on the short vectors, cached for vectors up to `MAX_CACHED_AXIS` long; only the gradient
+    lookups and interpolation run over the full grid.
+
+    `seed` selects the permutation table (see `permutation`); the default reproduces `noise.pnoise2`.
+    """
+    if octaves < 1:
+        raise ValueError("Expected octaves value > 0")
+
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    ndim = max(x.ndim, y.ndim)
+    x = x.reshape((1,) * (ndim - x.ndim) + x.shape)
+    y = y.reshape((1,) * (ndim - y.ndim) + y.shape)
+
+    # Evaluate every octave in one pass over a stacked (octaves, ...) grid.
+    x_terms = _octave_terms(x, octaves, persistence, lacunarity, np.float32(repeatx), STRIDE)
+    y_terms = _octave_terms(y, octaves, persistence, lacunarity, np.float32(repeaty), 1)
+    layers = _noise2(x_terms, y_terms, base, seed)
+    if octaves == 1:
+        return layers[0].copy()
+    _, amps, max_amp = _octave_parameters(octaves, persistence, lacunarity)
+    layers *= amps.reshape((octaves,) + (1,) * ndim)
+
+    # Add the layers one at a time, in the order of the scalar loop. np.add.reduce switches to pairwise
+    # summation from 8 layers on, which rounds differently.
+    total = layers[0].copy()
+    for layer in layers[1:]:
+        total += layer
+    total /= max_amp
+    return total
@@ -0,0 +1,102 @@
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .world import World
+
+class Prefetcher:
+    """
+    Background thread that loads or generates chunks around focus points before they are read.
+
+    `focus` computes every chunk within `radius` chunks of any focus point, drops those already cached
+    and queues the rest nearest first, replacing whatever was still queued for the previous focus. The
+    worker thread takes `batch_size` chunks at a time and reads them through `World.get_chunks`, the same
+    cache, store, generate path as foreground reads, which only holds the world lock while looking up
+    and inserting, so synchronous reads of cached chunks never wait on prefetch work. A batch that
+    raises is counted in `errors` and kept in `error`, and the thread goes on with the next one.
+    """
+    def __init__(self, world: "World", radius: int = 4, batch_size: int = 16):
+        self.world = world
+        self.radius = radius
+        self.batch_size = batch_size
+
+        self.generated = 0  # Chunks loaded or generated by the prefetch thread
+        self.errors = 0  # Batches that raised
+        self.error: Optional[BaseException] = None  # Most recent exception raised by a batch
+        self.cancelled = 0  # Queued chunks dropped because the focus moved away
+
+        self._queue: Deque[Tuple[int, int]] = deque()
+        self._focus: Optional[Tuple[Tuple[Tuple[int, int], ...], int]] = None
+        self._busy = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="worldgen-prefetch", daemon=True)
+        self._thread.start()
+
+    def focus(self, points: Iterable[Tuple[int, int]], radius: Optional[int] = None):
+        """Prefetch around the given block coordinates, replacing any previous focus."""
+        radius = self.radius if radius is None else radius
+        chunk_size = self.world.chunk_size
+        centers = tuple(sorted({(x // chunk_size, z // chunk_size) for x, z in points}))
+        if (centers, radius) == self._focus:
+            return  # Still focused on the same chunks; the queue is up to date
+
+        # Squared distance from every wanted chunk to its nearest focus chunk
+        distances: Dict[Tuple[int, int], int] = {}
+        for center_x, center_z in centers:
+            for dx in range(-radius, radius + 1):
+                for dz in range(-radius, radius + 1):
+                    distance = dx * dx + dz * dz
+                    if distance > radius * radius:
+                        continue
+                    coord = (center_x + dx, center_z + dz)
+                    if distance < distances.get(coord, distance + 1):
+                        distances[coord] = distance
+
+        wanted = sorted(
+            (distance, coord) for coord, distance in distances.items()
+            if coord not in self.world.chunks
+        )
+        with self._condition:
+            self.cancelled += sum(1 for coord in self._queue if coord not in distances)
+            self._queue = deque(coord for _, coord in wanted)
+            self._focus = (centers, radius)
+            self._condition.notify_all()
+
+    def pending(self) -> int:
+        """Number of chunks still queued."""
+        with self._condition:
+            return len(self._queue)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is drained and no batch is in flight. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self._busy, timeout)
+
+    def close(self):
+        """Drop queued work and stop the worker thread once its current batch is done."""
+        with self._condition:
+            self._closed = True
+            self.cancelled += len(self._queue)
+            self._queue.clear()
+            self._condition.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._closed)
+                if self._closed:
+                    return
+                self._busy = True
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            try:
+                self.generated += len(self.world.get_chunks(batch))
+            except Exception as e:
+                self.errors += 1
+                self.error = e
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
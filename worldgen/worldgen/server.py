@@ -0,0 +1,338 @@
+"""
+Chunk server: one warm `World` answering terrain requests from many local clients.
+
+Protocol (TCP, little endian). Clients send fixed-size region requests and may pipeline any number of
+them on one connection:
+
+    REQUEST   kind u8, request id u32, chunk_x i32, chunk_z i32, count_x u16, count_z u16
+
+The server answers each request with one or more pieces, square tiles of at most `piece_chunks` chunks
+per side, in row-major order. Pieces of concurrent requests may interleave; the last piece of a request
+carries FLAG_LAST.
+
+    PIECE     request id u32, flags u8, chunk_x i32, chunk_z i32, count_x u16, count_z u16,
+              chunk_size u16, payload length u32, payload
+
+The payload is the (count_x * chunk_size, count_z * chunk_size) terrain of the piece, 2-bit packed when
+FLAG_PACKED is set and one byte per block otherwise. An error answers the whole request with a single
+FLAG_ERROR | FLAG_LAST piece whose payload is a UTF-8 message.
+"""
+import argparse
+import asyncio
+import struct
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+from .chunk import PACKED_MAX_BLOCK, TERRAIN_DTYPE, BuildSettings, DEFAULT_BUILD_SETTINGS, pack_terrain, unpack_terrain
+from .store import ChunkStore
+from .world import World
+
+REQUEST = struct.Struct("<BIiiHH")
+PIECE = struct.Struct("<IBiiHHHI")
+
+KIND_REGION = 1
+
+FLAG_LAST = 1
+FLAG_PACKED = 2
+FLAG_ERROR = 4
+
+DEFAULT_PORT = 7878
+MAX_REQUEST_CHUNKS = 1 << 20  # Largest region a single request may ask for
+
+# (chunk_x, chunk_z, count_x, count_z)
+Range = Tuple[int, int, int, int]
+
+def split_range(region: Range, piece_chunks: int) -> Iterator[Range]:
+    """Split a chunk range into square pieces of at most `piece_chunks` chunks per side, row-major."""
+    chunk_x, chunk_z, count_x, count_z = region
+    for x in range(chunk_x, chunk_x + count_x, piece_chunks):
+        for z in range(chunk_z, chunk_z + count_z, piece_chunks):
+            yield x, z, min(piece_chunks, chunk_x + count_x - x), min(piece_chunks, chunk_z + count_z - z)
+
+class ChunkServer:
+    """
+    asyncio TCP server that serves chunk ranges of a shared `World`.
+
+    Chunks come from the world's cache and store, so every client benefits from chunks generated for any
+    other. Generation runs on the default executor, and chunks that are already being generated for one
+    request are awaited by any other request that needs them instead of being generated twice. Large
+    ranges are generated and sent piece by piece, so memory per request stays bounded and the first
+    piece arrives before the last is generated; writes wait for the socket to drain.
+    """
+    def __init__(
+        self,
+        world: World,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_PORT,
+        piece_chunks: int = 16,
+        packed: bool = True,
+    ):
+        self.world = world
+        self.host = host
+        self.port = port
+        self.piece_chunks = piece_chunks
+        self.packed = packed  # 2-bit pack payloads whenever the terrain allows it
+
+        self.requests = 0  # Requests answered
+        self.coalesced = 0  # Chunks a request waited for instead of generating them again
+
+        self._inflight: Dict[Tuple[int, int], asyncio.Future] = {}
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        """Start listening. With port 0 the chosen port is stored in `port`."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """Stop listening, disconnect all clients and wait for their handlers to finish."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in self._connections.values():
+            writer.close()
+        if self._connections:
+            await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def __aenter__(self) -> "ChunkServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def ensure_chunks(self, coords: Iterable[Tuple[int, int]]):
+        """Make sure the given chunks exist, generating missing ones once no matter how many requests want them."""
+        loop = asyncio.get_running_loop()
+        waiting = set()
+        to_generate = []
+        for coord in coords:
+            future = self._inflight.get(coord)
+            if future is not None:
+                waiting.add(future)
+                self.coalesced += 1
+            elif coord not in self.world.chunks:
+                to_generate.append(coord)
+
+        if to_generate:
+            future = loop.run_in_executor(None, self.world.get_chunks, to_generate)
+            for coord in to_generate:
+                self._inflight[coord] = future
+            future.add_done_callback(lambda done: self._finish(to_generate, done))
+            waiting.add(future)
+        if waiting:
+            await asyncio.gather(*waiting)
+
+    async def region_pieces(self, region: Range) -> AsyncIterator[Tuple[Range, np.ndarray]]:
+        """Yield (piece, terrain) for every piece of a chunk range, generating each piece just before it is yielded."""
+        loop = asyncio.get_running_loop()
+        chunk_size = self.world.chunk_size
+        for piece in split_range(region, self.piece_chunks):
+            chunk_x, chunk_z, count_x, count_z = piece
+            await self.ensure_chunks([
+                (x, z) for x in range(chunk_x, chunk_x + count_x) for z in range(chunk_z, chunk_z + count_z)
+            ])
+            terrain = await loop.run_in_executor(
+                None,
+                self.world.get_region,
+                chunk_x * chunk_size,
+                chunk_z * chunk_size,
+                count_x * chunk_size,
+                count_z * chunk_size,
+            )
+            yield piece, terrain
+
+    def _finish(self, coords: List[Tuple[int, int]], future: asyncio.Future):
+        for coord in coords:
+            if self._inflight.get(coord) is future:
+                del self._inflight[coord]
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = asyncio.current_task()
+        self._connections[connection] = writer
+        tasks = set()
+        try:
+            while True:
+                try:
+                    header = await reader.readexactly(REQUEST.size)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                kind, request_id, chunk_x, chunk_z, count_x, count_z = REQUEST.unpack(header)
+                # Requests on one connection are answered concurrently; each piece is written in a single call
+                task = asyncio.create_task(self._answer(writer, kind, request_id, (chunk_x, chunk_z, count_x, count_z)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            del self._connections[connection]
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _answer(self, writer: asyncio.StreamWriter, kind: int, request_id: int, region: Range):
+        chunk_x, chunk_z, count_x, count_z = region
+        if kind != KIND_REGION:
+            await self._send_error(writer, request_id, f"Unknown request kind {kind}")
+            return
+        if count_x * count_z > MAX_REQUEST_CHUNKS:
+            await self._send_error(writer, request_id, f"Requests are limited to {MAX_REQUEST_CHUNKS} chunks")
+            return
+        if count_x == 0 or count_z == 0:
+            writer.write(PIECE.pack(request_id, FLAG_LAST, chunk_x, chunk_z, 0, 0, self.world.chunk_size, 0))
+            await writer.drain()
+            self.requests += 1
+            return
+
+        remaining = -(-count_x // self.piece_chunks) * -(-count_z // self.piece_chunks)
+        try:
+            async for piece, terrain in self.region_pieces(region):
+                remaining -= 1
+                flags = 0 if remaining else FLAG_LAST
+                if self.packed and terrain.max(initial=0) <= PACKED_MAX_BLOCK:
+                    payload = pack_terrain(terrain).tobytes()
+                    flags |= FLAG_PACKED
+                else:
+                    payload = terrain.tobytes()
+                writer.write(PIECE.pack(request_id, flags, *piece, self.world.chunk_size, len(payload)) + payload)
+                await writer.drain()
+        except ConnectionError:
+            return
+        except Exception as e:
+            await self._send_error(writer, request_id, str(e))
+            return
+        self.requests += 1
+
+    async def _send_error(self, writer: asyncio.StreamWriter, request_id: int, message: str):
+        payload = message.encode()
+        writer.write(PIECE.pack(request_id, FLAG_ERROR | FLAG_LAST, 0, 0, 0, 0, self.world.chunk_size, len(payload)) + payload)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+class ChunkServerError(Exception):
+    """Raised by `ChunkClient` when the server answers a request with an error."""
+
+class ChunkClient:
+    """
+    asyncio client for `ChunkServer`. Requests may be issued concurrently over the one connection; a
+    reader task routes incoming pieces to the request they belong to.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._next_id = 0
+        self._reader_task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self._reader_task = asyncio.create_task(self._read_pieces())
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        if self._reader_task is not None:
+            await self._reader_task
+
+    async def __aenter__(self) -> "ChunkClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def stream_region(self, chunk_x: int, chunk_z: int, count_x: int, count_z: int) -> AsyncIterator[Tuple[Range, np.ndarray]]:
+        """Request a chunk range and yield (piece, terrain) as pieces arrive."""
+        request_id = self._next_id
+        self._next_id = (self._next_id + 1) & 0xFFFFFFFF
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues[request_id] = queue
+        self._writer.write(REQUEST.pack(KIND_REGION, request_id, chunk_x, chunk_z, count_x, count_z))
+        try:
+            await self._writer.drain()
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                flags, piece, terrain = item
+                if terrain.size:
+                    yield piece, terrain
+                if flags & FLAG_LAST:
+                    return
+        finally:
+            del self._queues[request_id]
+
+    async def get_region(self, chunk_x: int, chunk_z: int, count_x: int, count_z: int) -> np.ndarray:
+        """Request a chunk range and assemble it into one array, indexed [x, z] like `World.get_region`."""
+        region = None
+        async for (x, z, piece_x, piece_z), terrain in self.stream_region(chunk_x, chunk_z, count_x, count_z):
+            chunk_size = terrain.shape[0] // piece_x
+            if region is None:
+                region = np.empty((count_x * chunk_size, count_z * chunk_size), dtype=TERRAIN_DTYPE)
+            x0, z0 = (x - chunk_x) * chunk_size, (z - chunk_z) * chunk_size
+            region[x0:x0 + terrain.shape[0], z0:z0 + terrain.shape[1]] = terrain
+        return region if region is not None else np.empty((0, 0), dtype=TERRAIN_DTYPE)
+
+    async def _read_pieces(self):
+        try:
+            while True:
+                header = await self._reader.readexactly(PIECE.size)
+                request_id, flags, chunk_x, chunk_z, count_x, count_z, chunk_size, length = PIECE.unpack(header)
+                payload = await self._reader.readexactly(length)
+                queue = self._queues.get(request_id)
+                if queue is None:
+                    continue
+                if flags & FLAG_ERROR:
+                    queue.put_nowait(ChunkServerError(payload.decode()))
+                    continue
+                size_x, size_z = count_x * chunk_size, count_z * chunk_size
+                if flags & FLAG_PACKED:
+                    terrain = unpack_terrain(payload, size_x, size_z)
+                else:
+                    terrain = np.frombuffer(payload, dtype=TERRAIN_DTYPE).reshape(size_x, size_z)
+                queue.put_nowait((flags, (chunk_x, chunk_z, count_x, count_z), terrain))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for queue in self._queues.values():
+                queue.put_nowait(ConnectionError("Connection to the chunk server closed"))
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serve worldgen chunks to local clients.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--seed", type=int, help="world seed (default: the unseeded world)")
+    parser.add_argument("--store", help="directory of a persistent chunk store to load and save chunks")
+    parser.add_argument("--piece-chunks", type=int, default=16, help="chunks per side of a streamed piece")
+    args = parser.parse_args(argv)
+
+    settings: BuildSettings = DEFAULT_BUILD_SETTINGS._replace(seed=args.seed)
+    store = ChunkStore(args.store, settings) if args.store else None
+    world = World(settings, store=store)
+    server = ChunkServer(world, args.host, args.port, piece_chunks=args.piece_chunks)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        world.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+from .chunk import Chunk, BuildSettings, TERRAIN_DTYPE
+
+# Bump whenever the on-disk layout or the generation algorithm changes, so old stores are never reused.
+FORMAT_VERSION = 2
+
+# Marks chunks of a region file that have not been written yet. Generated terrain never contains it.
+EMPTY = 255
+
+def settings_key(settings: BuildSettings, chunk_size: int, world_height: int = 64) -> str:
+    """Stable hash of everything that determines generated terrain."""
+    identity = repr((FORMAT_VERSION, tuple(settings), chunk_size, world_height))
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+class ChunkStore:
+    """
+    Persistent chunk store backed by memory-mapped region files.
+
+    Chunks are grouped into square regions of `region_size` by `region_size` chunks, each stored as one
+    `.npy` file under a directory named after the `settings_key` of the world, so terrain generated with
+    different settings or chunk sizes is never served. An existing store keeps the region size it was
+    created with. Loaded chunks are read-only views into the mapped files, so loading does not copy
+    terrain; writes land in the page cache and reach disk on `flush`.
+    """
+    def __init__(
+        self,
+        root: str,
+        settings: BuildSettings,
+        chunk_size: int = 16,
+        world_height: int = 64,
+        region_size: int = 32,
+        max_open_regions: int = 64,
+    ):
+        self.settings = settings
+        self.chunk_size = chunk_size
+        self.world_height = world_height
+        self.region_size = region_size
+        self.max_open_regions = max_open_regions
+        self.key = settings_key(settings, chunk_size, world_height)
+        self.path = os.path.join(root, self.key)
+
+        self._regions: "OrderedDict[Tuple[int, int], np.memmap]" = OrderedDict()
+        os.makedirs(self.path, exist_ok=True)
+        self._load_metadata()
+
+    def region_of(self, x: int, z: int) -> Tuple[int, int]:
+        """Region coordinates containing the chunk at (x, z)."""
+        return x // self.region_size, z // self.region_size
+
+    def load(self, x: int, z: int) -> Optional[Chunk]:
+        """Load the chunk at (x, z), or return None if it has not been stored."""
+        region = self._open_region(self.region_of(x, z), create=False)
+        if region is None:
+            return None
+        terrain = region[self._block_slices(x, z)]
+        if terrain[0, 0] == EMPTY:
+            return None
+
+        terrain.flags.writeable = False
+        chunk = Chunk(x, z, self.chunk_size, self.world_height, settings=self.settings)
+        chunk.terrain = terrain
+        return chunk
+
+    def load_many(self, coords: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Chunk]:
+        """Load every stored chunk among the given coordinates."""
+        loaded = {}
+        for x, z in coords:
+            chunk = self.load(x, z)
+            if chunk is not None:
+                loaded[(x, z)] = chunk
+        return loaded
+
+    def save(self, chunk: Chunk):
+        """Write a chunk's terrain into its region file."""
+        region = self._open_region(self.region_of(chunk.x, chunk.z), create=True)
+        region[self._block_slices(chunk.x, chunk.z)] = chunk.terrain
+
+    def save_many(self, chunks: Iterable[Chunk]):
+        for chunk in chunks:
+            self.save(chunk)
+
+    def __contains__(self, coord: Tuple[int, int]) -> bool:
+        return self.load(*coord) is not None
+
+    def flush(self):
+        """Flush all open region files to disk."""
+        for region in self._regions.values():
+            region.flush()
+
+    def close(self):
+        """Flush and unmap all open region files. Chunks already loaded keep their mappings alive."""
+        self.flush()
+        self._regions.clear()
+
+    def _block_slices(self, x: int, z: int) -> Tuple[slice, slice]:
+        local_x = (x % self.region_size) * self.chunk_size
+        local_z = (z % self.region_size) * self.chunk_size
+        return slice(local_x, local_x + self.chunk_size), slice(local_z, local_z + self.chunk_size)
+
+    def _region_path(self, region: Tuple[int, int]) -> str:
+        return os.path.join(self.path, f"r.{region[0]}.{region[1]}.npy")
+
+    def _open_region(self, region: Tuple[int, int], create: bool) -> Optional[np.memmap]:
+        """Return the memory map of a region file, creating the file (filled with EMPTY) if asked to."""
+        mapped = self._regions.get(region)
+        if mapped is not None:
+            self._regions.move_to_end(region)
+            return mapped
+
+        path = self._region_path(region)
+        if os.path.exists(path):
+            mapped = np.load(path, mmap_mode="r+")
+        elif create:
+            size = self.region_size * self.chunk_size
+            # Write to a temporary name first so a crash never leaves a half-initialised region behind
+            temporary = path + ".tmp"
+            mapped = np.lib.format.open_memmap(temporary, mode="w+", dtype=TERRAIN_DTYPE, shape=(size, size))
+            mapped[:] = EMPTY
+            mapped.flush()
+            del mapped
+            os.replace(temporary, path)
+            mapped = np.load(path, mmap_mode="r+")
+        else:
+            return None
+
+        self._regions[region] = mapped
+        if len(self._regions) > self.max_open_regions:
+            _, evicted = self._regions.popitem(last=False)
+            evicted.flush()
+        return mapped
+
+    def _load_metadata(self):
+        """Adopt the layout of an existing store, or record the layout of a new one."""
+        path = os.path.join(self.path, "settings.json")
+        if os.path.exists(path):
+            with open(path) as f:
+                self.region_size = json.load(f)["region_size"]
+            return
+        metadata = {
+            "format_version": FORMAT_VERSION,
+            "settings": self.settings._asdict(),
+            "chunk_size": self.chunk_size,
+            "world_height": self.world_height,
+            "region_size": self.region_size,
+        }
+        with open(path, "w") as f:
+            json.dump(metadata, f, indent=2)
@@ -1,5 +1,13 @@
-from typing import Dict, Tuple
-from .chunk import Chunk, BuildSettings
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .cache import ChunkCache
+from .chunk import Chunk, BuildSettings, DEFAULT_BUILD_SETTINGS, TERRAIN_DTYPE
+from .index import MAX_INDEXED_CHUNKS, BiomeIndex
+from .lod import OverviewPyramid
+from .parallel import GenerationPool, Run, generate_run
+from .prefetch import Prefetcher
+from .store import ChunkStore, settings_key
 
 # Constants
 BLOCKS = {
@@ -8,28 +16,229 @@ BLOCKS = {
     2: "Grassland",
     3: "Mountain",
 }
+COLORS = {
+    0: (0, 0, 255),  # Ocean
+    1: (0, 0, 150),  # River
+    2: (34, 139, 34),  # Grass
+    3: (139, 69, 19),  # Mountain
+}
+
+# RGB lookup table indexed by block type; unknown block types map to black
+COLOR_TABLE = np.zeros((256, 3), dtype=np.uint8)
+for block_type, color in COLORS.items():
+    COLOR_TABLE[block_type] = color
+
+# Number of blocks evaluated per noise batch. Batches of this size keep the noise temporaries
+# cache-resident, which is measurably faster than evaluating very large grids in one go.
+BATCH_BLOCKS = 4096
 
 class World:
     """Class representing the game world, composed of multiple chunks. Handles chunk generation and block retrieval."""
-    def __init__(self, build_settings: BuildSettings, chunk_size: int = 16):
+    def __init__(
+        self,
+        build_settings: BuildSettings,
+        chunk_size: int = 16,
+        cache: Optional[ChunkCache] = None,
+        store: Optional[ChunkStore] = None,
+        packed: bool = False,
+        workers: int = 0,
+        index_chunks: Optional[int] = MAX_INDEXED_CHUNKS,
+    ):
         self.chunk_size = chunk_size
         self.build_settings = build_settings
+        self.packed = packed  # Keep cached chunks 2-bit packed
+
+        # Batches of missing chunks are generated on a process pool of this many workers when above 1
+        self.workers = workers
+        self._pool: Optional[GenerationPool] = None
+
+        # Generated chunks; unbounded unless a bounded cache is passed in
+        self.chunks: ChunkCache = cache if cache is not None else ChunkCache()
+
+        # Optional persistent store that chunks are loaded from before being generated
+        if store is not None and store.key != settings_key(self.settings, chunk_size):
+            raise ValueError("Chunk store was created for different build settings or chunk size")
+        self.store = store
+
+        # Background generation around focus points, created on the first `prefetch` call
+        self.prefetcher: Optional[Prefetcher] = None
+        self._lock = threading.RLock()  # Guards the cache and store against the prefetch thread
+
+        # Cached low-resolution tiles for zoomed-out views
+        self.overview = OverviewPyramid(self)
 
-        self.chunks: Dict[Tuple[int, int], Chunk] = {}  # Dictionary to store generated chunks
+        # Biome summaries of the most recently generated or loaded chunks, for spatial queries; None keeps all
+        self.index = BiomeIndex(self, len(BLOCKS), max_chunks=index_chunks)
+
+    @property
+    def settings(self) -> BuildSettings:
+        """The effective build settings, falling back to the chunk defaults when none were given."""
+        return self.build_settings if self.build_settings is not None else DEFAULT_BUILD_SETTINGS
 
     def get_chunk(self, x: int, z: int) -> Chunk:
         """Get or generate a chunk at the specified chunk coordinates."""
-        if (x, z) not in self.chunks:
-            self.generate_chunk(x, z)
-        return self.chunks[(x, z)]
+        with self._lock:
+            chunk = self.chunks.get((x, z))
+            if chunk is None and self.store is not None:
+                chunk = self.store.load(x, z)
+                if chunk is not None:
+                    self.chunks[(x, z)] = chunk
+                    self.index.add({(x, z): chunk})
+        if chunk is None:
+            chunk = self.generate_chunk(x, z)
+        return chunk
+
+    def get_chunks(self, coords: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Chunk]:
+        """Get the chunks at the given chunk coordinates, generating all missing ones in batches."""
+        found: Dict[Tuple[int, int], Chunk] = {}
+        missing = []
+        with self._lock:
+            for coord in coords:
+                if coord in found:
+                    continue
+                chunk = self.chunks.get(coord)
+                if chunk is None:
+                    missing.append(coord)
+                else:
+                    found[coord] = chunk
+            if missing and self.store is not None:
+                loaded = self.store.load_many(missing)
+                self.chunks.update(loaded)
+                self.index.add(loaded)
+                found.update(loaded)
+                missing = [coord for coord in missing if coord not in loaded]
+        found.update(self.generate_chunks(missing))
+        return found
 
-    def generate_chunk(self, x: int, z: int):
+    def generate_chunk(self, x: int, z: int) -> Chunk:
         """Generate a chunk at the specified chunk coordinates."""
-        chunk = Chunk(x, z)
-        if self.build_settings is not None:
-            chunk.build_settings(self.build_settings)
+        chunk = Chunk(x, z, self.chunk_size, settings=self.settings, packed=self.packed)
         chunk.generate()
-        self.chunks[(x, z)] = chunk
+        self._insert({(x, z): chunk})
+        return chunk
+
+    def generate_chunks(self, coords: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], Chunk]:
+        """
+        Generate every missing chunk among the given chunk coordinates and return the new chunks.
+
+        Missing chunks are grouped into runs of neighbouring chunks along the z axis and each run is
+        generated with a single noise evaluation over its combined block grid.
+        """
+        generated: Dict[Tuple[int, int], Chunk] = {}
+        with self._lock:
+            missing = sorted({coord for coord in coords if coord not in self.chunks})
+        if not missing:
+            return generated
+
+        settings = self.settings
+        run_length = max(1, BATCH_BLOCKS // (self.chunk_size * self.chunk_size))
+        runs = list(_runs(missing, run_length))
+        if self.workers > 1 and len(runs) > 1:
+            results = self._generation_pool().map(runs)
+        else:
+            results = ((run, generate_run(run, settings, self.chunk_size)) for run in runs)
+
+        for (chunk_x, start_z, count), terrain in results:
+            for i in range(count):
+                chunk = Chunk(chunk_x, start_z + i, self.chunk_size, settings=settings, packed=self.packed)
+                chunk.terrain = np.ascontiguousarray(terrain[:, i * self.chunk_size:(i + 1) * self.chunk_size])
+                generated[(chunk_x, start_z + i)] = chunk
+        self._insert(generated)
+        return generated
+
+    def _insert(self, chunks: Dict[Tuple[int, int], Chunk]):
+        """Add freshly generated chunks to the cache, the index and the store. Generation itself runs unlocked."""
+        with self._lock:
+            self.chunks.update(chunks)
+            self.index.add(chunks)
+            if self.store is not None:
+                self.store.save_many(chunks.values())
+
+    def prefetch(self, points: Iterable[Tuple[int, int]], radius: int = 4):
+        """
+        Load or generate chunks within `radius` chunks of the given block coordinates in the background, nearest first.
+
+        Each call replaces the previous focus, so requests for chunks the focus has moved away from are dropped.
+        """
+        if self.prefetcher is None:
+            self.prefetcher = Prefetcher(self, radius)
+        self.prefetcher.focus(points, radius)
+
+    def close(self):
+        """Stop background prefetching and the generation pool, if any, and flush the chunk store."""
+        if self.prefetcher is not None:
+            self.prefetcher.close()
+            self.prefetcher = None
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+        if self.store is not None:
+            with self._lock:
+                self.store.flush()
+
+    def _generation_pool(self) -> GenerationPool:
+        with self._lock:
+            if self._pool is None:
+                self._pool = GenerationPool(self.settings, self.chunk_size, workers=self.workers)
+            return self._pool
+
+    def get_region(self, world_x: int, world_z: int, size_x: int, size_z: int) -> np.ndarray:
+        """
+        Get the terrain of a rectangular block region as a single array.
+
+        The result has shape (size_x, size_z) and element [i, j] is the block at (world_x + i, world_z + j).
+        Chunks overlapping the region that have not been generated yet are generated in batches first.
+        """
+        if size_x < 0 or size_z < 0:
+            raise ValueError("Region size must not be negative")
+
+        region = np.empty((size_x, size_z), dtype=TERRAIN_DTYPE)
+        if size_x == 0 or size_z == 0:
+            return region
+
+        first_x, last_x = world_x // self.chunk_size, (world_x + size_x - 1) // self.chunk_size
+        first_z, last_z = world_z // self.chunk_size, (world_z + size_z - 1) // self.chunk_size
+        coords = [(x, z) for x in range(first_x, last_x + 1) for z in range(first_z, last_z + 1)]
+        chunks = self.get_chunks(coords)
+
+        for (chunk_x, chunk_z), chunk in chunks.items():
+            terrain = chunk.terrain
+            # Overlap of this chunk with the region, in world coordinates
+            x0 = max(world_x, chunk_x * self.chunk_size)
+            x1 = min(world_x + size_x, (chunk_x + 1) * self.chunk_size)
+            z0 = max(world_z, chunk_z * self.chunk_size)
+            z1 = min(world_z + size_z, (chunk_z + 1) * self.chunk_size)
+            region[x0 - world_x:x1 - world_x, z0 - world_z:z1 - world_z] = terrain[
+                x0 - chunk_x * self.chunk_size:x1 - chunk_x * self.chunk_size,
+                z0 - chunk_z * self.chunk_size:z1 - chunk_z * self.chunk_size,
+            ]
+        return region
+
+    def get_chunk_region(self, chunk_x: int, chunk_z: int, count_x: int, count_z: int) -> np.ndarray:
+        """Get the terrain of `count_x` by `count_z` chunks starting at the given chunk coordinates as a single array."""
+        return self.get_region(
+            chunk_x * self.chunk_size,
+            chunk_z * self.chunk_size,
+            count_x * self.chunk_size,
+            count_z * self.chunk_size,
+        )
+
+    def get_overview(self, world_x: int, world_z: int, size_x: int, size_z: int, level: int) -> np.ndarray:
+        """
+        Get a block region at reduced resolution, one block out of every 2**level along each axis.
+
+        Levels above 0 are sampled directly from the noise field and never generate full chunks.
+        See `OverviewPyramid.get_overview` for the exact sample positions.
+        """
+        return self.overview.get_overview(world_x, world_z, size_x, size_z, level)
+
+    def nearest_biome(self, biome: int, world_x: int, world_z: int, max_distance: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        """Nearest block of a biome among the generated chunks; see `BiomeIndex.nearest`."""
+        return self.index.nearest(biome, world_x, world_z, max_distance)
+
+    def biome_counts(self, world_x: int, world_z: int, size_x: int, size_z: int) -> np.ndarray:
+        """Number of blocks of each biome in a block region, indexed by biome id; see `BiomeIndex.counts`."""
+        return self.index.counts(world_x, world_z, size_x, size_z)
 
     def get_block(self, world_x: int, world_z: int) -> int:
         """Get the block type at a specific world coordinate."""
@@ -44,3 +253,16 @@ class World:
         """Get the prettified block type at a specific world coordinate (e.g. 'Ocean', 'River', 'Grassland', 'Mountain')"""
         block = self.get_block(world_x, world_z)
         return BLOCKS[block]
+
+def _runs(coords: List[Tuple[int, int]], max_length: int) -> Iterable[Run]:
+    """Split sorted chunk coordinates into (chunk_x, start_z, count) runs of consecutive z, at most `max_length` long."""
+    start = None
+    for chunk_x, chunk_z in coords:
+        if start is not None and chunk_x == start[0] and chunk_z == start[1] + count and count < max_length:
+            count += 1
+            continue
+        if start is not None:
+            yield start[0], start[1], count
+        start, count = (chunk_x, chunk_z), 1
+    if start is not None:
+        yield start[0], start[1], count